@@ -0,0 +1,76 @@
+"""
+Compare two benchmark result files
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json --threshold 0.10
+
+Exits with status 1 when any benchmark's median time regressed by more than
+the threshold, so it can gate a release.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare(baseline, candidate, threshold=0.10):
+    """
+    Compare the median times of benchmarks present in both result files
+
+    Returns:
+        list: Rows with 'name', 'baseline', 'candidate', 'change' and 'status'
+    """
+    rows = []
+    for name, result in candidate['results'].items():
+        base = baseline['results'].get(name)
+        if not base or 'median' not in base or 'median' not in result:
+            rows.append({'name': name, 'baseline': None, 'candidate': result.get('median'),
+                         'change': None, 'status': "n/a"})
+            continue
+
+        change = (result['median'] - base['median']) / base['median'] if base['median'] else 0.0
+        if change > threshold:
+            status = "regressed"
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "unchanged"
+        rows.append({'name': name, 'baseline': base['median'], 'candidate': result['median'],
+                     'change': change, 'status': status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two Clipify benchmark result files")
+    parser.add_argument('baseline', help="Results of the reference release")
+    parser.add_argument('candidate', help="Results of the release under test")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative median slowdown counted as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    print(f"Baseline:  {baseline['environment'].get('git_commit')} ({baseline['environment']['timestamp']})")
+    print(f"Candidate: {candidate['environment'].get('git_commit')} ({candidate['environment']['timestamp']})")
+    if baseline['settings'] != candidate['settings']:
+        print(f"Warning: Settings differ: {baseline['settings']} vs {candidate['settings']}")
+
+    rows = compare(baseline, candidate, args.threshold)
+    for row in rows:
+        if row['change'] is None:
+            print(f"{row['name']:24s} {'':>12s} {'':>12s} {'':>8s}  {row['status']}")
+            continue
+        print(f"{row['name']:24s} {row['baseline'] * 1000:10.1f}ms {row['candidate'] * 1000:10.1f}ms "
+              f"{row['change']:+7.1%}  {row['status']}")
+
+    if any(row['status'] == "regressed" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
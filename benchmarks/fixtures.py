@@ -0,0 +1,141 @@
+"""
+Synthetic media and transcript fixtures for the benchmarks
+
+Everything is generated locally with ffmpeg test sources, so the benchmarks
+need no real footage, speech or network access.
+"""
+
+import json
+import os
+import random
+import subprocess
+
+from moviepy.config import get_setting
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fixtures")
+
+# Fixture sizes: (width, height, fps, duration in seconds)
+SIZES = {
+    "quick": (640, 360, 25, 12),
+    "full": (1920, 1080, 30, 60),
+}
+
+# A 440 Hz tone gated off for 0.3s every 2s, like pauses between sentences
+GATED_TONE = "sine=frequency=440:duration={duration},volume='if(lt(mod(t,2),1.7),1,0)':eval=frame"
+
+VOCABULARY = (
+    "video creators share stories about travel food music science history sports design "
+    "people learn build grow change discover explain practice every morning together "
+    "city river mountain ocean forest kitchen studio workshop camera light sound rhythm "
+    "simple honest bright quiet strong patient curious careful wonderful important"
+).split()
+
+
+def ffmpeg_available():
+    """Whether the ffmpeg binary MoviePy uses can be run"""
+    try:
+        subprocess.run([get_setting("FFMPEG_BINARY"), "-version"], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        return True
+    except Exception:
+        return False
+
+
+def _run_ffmpeg(*args):
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", *args]
+    subprocess.run(command, check=True)
+
+
+def make_video(size="quick", audio="tone"):
+    """
+    Generate a test-pattern video with hard scene changes and an audio track
+
+    Args:
+        size (str): Key of SIZES
+        audio (str): "tone" for a sine with pauses every few seconds, or "noise"
+
+    Returns:
+        str: Path to the cached fixture video
+    """
+    width, height, fps, duration = SIZES[size]
+    path = os.path.join(FIXTURE_DIR, f"video_{size}_{audio}.mp4")
+    if os.path.exists(path):
+        return path
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    if audio == "noise":
+        audio_source = f"anoisesrc=color=pink:amplitude=0.3:duration={duration}"
+    else:
+        audio_source = GATED_TONE.format(duration=duration)
+
+    # Alternate between two test sources every 4 seconds so scene detection has cuts
+    _run_ffmpeg(
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", f"smptebars=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", audio_source,
+        "-filter_complex", "[0:v][1:v]blend=all_expr='if(lt(mod(T,8),4),A,B)',format=yuv420p[v]",
+        "-map", "[v]", "-map", "2:a",
+        "-c:v", "libx264", "-preset", "veryfast", "-g", str(fps * 2),
+        "-c:a", "aac", "-shortest",
+        path
+    )
+    return path
+
+
+def make_wav(size="quick"):
+    """Generate a 16-bit mono WAV with the same gated tone as make_video"""
+    duration = SIZES[size][3]
+    path = os.path.join(FIXTURE_DIR, f"audio_{size}.wav")
+    if os.path.exists(path):
+        return path
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    _run_ffmpeg(
+        "-f", "lavfi",
+        "-i", GATED_TONE.format(duration=duration),
+        "-ac", "1", "-ar", "16000", "-sample_fmt", "s16",
+        path
+    )
+    return path
+
+
+def make_transcript(duration=60.0, words_per_second=2.5, seed=7):
+    """
+    Build a deterministic transcript with word timings
+
+    Sentences end every 8-16 words, with a short pause after each.
+
+    Returns:
+        dict: 'transcript' text and 'word_timings' in the SpeechToText format
+    """
+    rng = random.Random(seed)
+    word_timings = []
+    time = 0.0
+    sentence_length = rng.randint(8, 16)
+    while time < duration:
+        text = rng.choice(VOCABULARY)
+        if sentence_length == 0:
+            text += "."
+            sentence_length = rng.randint(8, 16)
+        sentence_length -= 1
+        length = len(text) / (words_per_second * 6)
+        word_timings.append({'text': text, 'start': round(time, 3), 'end': round(time + length, 3)})
+        time += length + (0.35 if text.endswith(".") else 0.05)
+
+    # Capitalise sentence starts so the text reads like Whisper output
+    capitalise = True
+    for word in word_timings:
+        if capitalise:
+            word['text'] = word['text'].capitalize()
+        capitalise = word['text'].endswith(".")
+
+    return {
+        'transcript': " ".join(word['text'] for word in word_timings),
+        'word_timings': word_timings
+    }
+
+
+def write_transcript(path, duration=60.0):
+    """Write a transcript fixture in the ContentProcessor timings file format"""
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(make_transcript(duration), file, indent=2)
+    return path
@@ -0,0 +1,552 @@
+"""
+Clipify benchmark suite
+
+Measures the hot paths of the pipeline on synthetic fixtures and writes the
+results as JSON, so two releases can be compared with compare.py.
+
+Usage:
+    python benchmarks/run.py --size quick --output results.json
+    python benchmarks/run.py --only text,cut --repeat 5
+    python benchmarks/run.py --only transcription --speech sample.wav --repeat 1
+"""
+
+import argparse
+import difflib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime, timezone
+
+# Benchmark the working tree rather than an installed copy
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import fixtures  # noqa: E402
+
+BENCHMARKS = {}
+
+
+def benchmark(group, needs_ffmpeg=False, needs_speech=False):
+    """Register a benchmark function taking the shared context dict"""
+    def register(func):
+        BENCHMARKS[func.__name__] = {'func': func, 'group': group, 'needs_ffmpeg': needs_ffmpeg,
+                                     'needs_speech': needs_speech}
+        return func
+    return register
+
+
+def output_path(context, name):
+    """Fresh output path inside the run's scratch directory"""
+    path = os.path.join(context['work_dir'], name)
+    if os.path.exists(path):
+        os.remove(path)
+    return path
+
+
+def frames_of(path):
+    """Frame count of a rendered video"""
+    from clipify.core.instrumentation import count_frames
+    return count_frames([path])
+
+
+# --- Import -----------------------------------------------------------------
+
+@benchmark("import")
+def import_time(context):
+    """Cold import of the clipify package in a fresh interpreter"""
+    code = "import time; start = time.perf_counter(); import clipify; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+    return {'import_seconds': float(output.decode().strip().splitlines()[-1])}
+
+
+# --- Text -------------------------------------------------------------------
+
+@benchmark("text")
+def keyword_extraction(context):
+    from clipify.core.ai_providers import MockProvider
+    from clipify.core.text_processor import SmartTextProcessor
+    processor = SmartTextProcessor(MockProvider(target_words=150))
+    for _ in range(20):
+        processor.extract_keywords(context['transcript']['transcript'])
+    return {'calls': 20, 'words': len(context['transcript']['word_timings'])}
+
+
+@benchmark("text")
+def alignment(context):
+    """Map every segment's text back onto the word timings"""
+    from clipify.core.ai_providers import MockProvider
+    from clipify.core.text_processor import SmartTextProcessor
+    processor = SmartTextProcessor(MockProvider(target_words=150))
+    segments = processor.get_thematic_segments(context['transcript']['transcript'])['segments']
+    aligned = 0
+    for segment in segments:
+        timings = processor.get_segment_timings(segment['content'], context['transcript']['word_timings'])
+        aligned += timings['start'] is not None
+    return {'segments': len(segments), 'aligned': aligned}
+
+
+@benchmark("text")
+def segmentation(context):
+    """Full segment_by_theme with an instant mock provider"""
+    from clipify.core.ai_providers import MockProvider
+    from clipify.core.text_processor import SmartTextProcessor
+    processor = SmartTextProcessor(MockProvider(target_words=150))
+    result = processor.segment_by_theme(context['transcript']['transcript'], context['transcript'])
+    return {'segments': len(result['segments'])}
+
+
+@benchmark("text")
+def segmentation_streaming(context):
+    """Streamed segmentation from a mock generating 400 tokens/s; reports time to the first segment"""
+    from clipify.core.ai_providers import MockProvider
+    from clipify.core.text_processor import SmartTextProcessor
+    provider = MockProvider(latency=0.2, tokens_per_second=400, target_words=150)
+    processor = SmartTextProcessor(provider)
+    start = time.perf_counter()
+    first_segment = None
+    segments = 0
+    for _ in processor.iter_segment_by_theme(context['transcript']['transcript'], context['transcript']):
+        segments += 1
+        if first_segment is None:
+            first_segment = time.perf_counter() - start
+    return {'segments': segments, 'first_segment': first_segment}
+
+
+@benchmark("text")
+def provider_concurrency(context):
+    """32 segmentation requests from 8 threads against a flaky, fast mock provider"""
+    from concurrent.futures import ThreadPoolExecutor
+    from clipify.core.ai_providers import MockProvider
+    from clipify.core.resilience import ProviderError
+    provider = MockProvider(model="flaky", latency=0.02, jitter=0.02, tokens_per_second=None,
+                            retry_delay=0.01, seed=1)
+    text = context['transcript']['transcript']
+    prompts = [f"Text to analyze: {text} #{i}\nRequirements:" for i in range(32)]
+
+    def request(prompt):
+        try:
+            return provider.get_response(prompt, retry_count=5)
+        except ProviderError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(request, prompts))
+    return dict(provider.stats, failed=responses.count(None))
+
+
+@benchmark("text")
+def provider_hedging(context):
+    """40 sequential requests to a heavy-tailed mock, hedged with a second mock"""
+    from clipify.core.ai_providers import MockProvider, FailoverProvider
+    primary = MockProvider(latency=0.01, jitter=0.2, tokens_per_second=None, seed=2)
+    secondary = MockProvider(latency=0.03, jitter=0.01, tokens_per_second=None, seed=3)
+    provider = FailoverProvider([primary, secondary], hedge_percentile=0.75, hedge_delay=0.05)
+    text = context['transcript']['transcript']
+
+    latencies = []
+    for i in range(40):
+        start = time.perf_counter()
+        provider.get_response(f"Text to analyze: {text} #{i}\nRequirements:")
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return dict(p50=latencies[len(latencies) // 2], p95=latencies[int(len(latencies) * 0.95)],
+                **{name: stats['wins'] for name, stats in provider.stats.items()})
+
+
+@benchmark("io")
+def timing_json_io(context):
+    """Write and read a word timings file as ContentProcessor does"""
+    path = output_path(context, "timings.json")
+    for _ in range(10):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(context['transcript'], file, indent=2)
+        with open(path, 'r', encoding='utf-8') as file:
+            json.load(file)
+    return {'calls': 10, 'bytes': os.path.getsize(path)}
+
+
+@benchmark("io")
+def manifest_io(context):
+    """Record and check 100 stage outputs in a job manifest"""
+    from clipify.core.manifest import JobManifest
+    manifest = JobManifest(output_path(context, "manifest.json"))
+    stage_output = output_path(context, "stage_output.bin")
+    with open(stage_output, 'wb') as file:
+        file.write(b"\0" * 1024)
+    for i in range(100):
+        input_hash = JobManifest.compute_hash(i, 'cut', context['transcript']['word_timings'][:20])
+        manifest.record(i, 'cut', input_hash, stage_output)
+        manifest.is_fresh(i, 'cut', input_hash, stage_output)
+    return {'calls': 100}
+
+
+# --- Audio ------------------------------------------------------------------
+
+@benchmark("audio", needs_ffmpeg=True)
+def audio_envelope(context):
+    from clipify.audio.envelope import AudioEnvelope
+    envelope = AudioEnvelope.from_wav(context['wav'])
+    for i in range(1000):
+        envelope.refine(i % 10 + 0.5, i % 10 + 1.5)
+    return {'windows': len(envelope.rms)}
+
+
+# --- Transcription ----------------------------------------------------------
+
+def _speech_duration(context, word_timings):
+    """Duration of the speech sample in seconds"""
+    try:
+        with wave.open(context['speech']) as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        # Not a WAV file; the last word's end is a close lower bound
+        return word_timings[-1]['end'] if word_timings else 0.0
+
+
+def _normalized_words(word_timings):
+    return ["".join(c for c in word['text'].lower() if c.isalnum()) for word in word_timings]
+
+
+def _timing_error(word_timings, reference):
+    """Mean absolute start and end difference in seconds of the words matching the reference"""
+    matcher = difflib.SequenceMatcher(None, _normalized_words(reference), _normalized_words(word_timings),
+                                      autojunk=False)
+    errors = []
+    for block in matcher.get_matching_blocks():
+        for i in range(block.size):
+            expected, actual = reference[block.a + i], word_timings[block.b + i]
+            errors.append(abs(expected['start'] - actual['start']))
+            errors.append(abs(expected['end'] - actual['end']))
+    return {
+        'timing_error': statistics.mean(errors) if errors else None,
+        'matched_words': len(errors) // 2,
+        'reference_words': len(reference)
+    }
+
+
+def _speech_backend(context, backend, **options):
+    """Load each backend once so model load time is excluded"""
+    from clipify.audio.backends import get_transcription_backend
+    backends = context.setdefault('transcription_backends', {})
+    if backend not in backends:
+        backends[backend] = get_transcription_backend(backend, context['speech_model'], **options)
+    return backends[backend]
+
+
+def _transcribe_with(context, backend, **options):
+    """Transcribe the speech sample and compare its word timings with the reference"""
+    start = time.perf_counter()
+    result = _speech_backend(context, backend, **options).transcribe(context['speech'], context['speech_options'])
+    elapsed = time.perf_counter() - start
+
+    word_timings = result['word_timings']
+    context.setdefault('speech_results', {})[backend] = word_timings
+    # Without reference timings, faster-whisper is compared against openai-whisper
+    reference = context.get('speech_reference') or context['speech_results'].get('whisper')
+    stats = {'words': len(word_timings), 'rtf': elapsed / max(_speech_duration(context, word_timings), 1e-9)}
+    if reference is not None and reference is not word_timings:
+        stats.update(_timing_error(word_timings, reference))
+    return stats
+
+
+@benchmark("transcription", needs_speech=True)
+def transcribe_whisper(context):
+    return _transcribe_with(context, "whisper")
+
+
+@benchmark("transcription", needs_speech=True)
+def transcribe_faster_whisper(context):
+    return _transcribe_with(context, "faster-whisper", compute_type="int8")
+
+
+@benchmark("transcription", needs_speech=True)
+def transcribe_short_clips(context):
+    """Short clips cut from the speech sample, one call per clip against packed batches"""
+    from clipify.audio.backends import SAMPLE_RATE, load_wav
+    samples = load_wav(context['speech'])
+    clip_length = 6 * SAMPLE_RATE
+    clips = [samples[i:i + clip_length] for i in range(0, len(samples), clip_length)][:20]
+    backend = _speech_backend(context, "whisper")
+
+    start = time.perf_counter()
+    for clip in clips:
+        backend.transcribe(clip, context['speech_options'])
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = backend.transcribe_batch(clips, context['speech_options'])
+    batched = time.perf_counter() - start
+    return {
+        'clips': len(clips),
+        'words': sum(len(result['word_timings']) for result in results),
+        'single_seconds': single,
+        'batched_seconds': batched,
+        'speedup': single / max(batched, 1e-9)
+    }
+
+
+# --- Video ------------------------------------------------------------------
+
+@benchmark("video", needs_ffmpeg=True)
+def cut(context):
+    from clipify.video.cutter import VideoCutter
+    path = output_path(context, "cut.mp4")
+    assert VideoCutter(encoding_profile=context['profile']).cut_video(context['video'], path, 2.0, 10.0)
+    context['cut_video'] = path
+    return {'frames': frames_of(path)}
+
+
+def _cut_video(context):
+    if 'cut_video' not in context:
+        cut(context)
+    return context['cut_video']
+
+
+@benchmark("video", needs_ffmpeg=True)
+def scene_index(context):
+    from clipify.video.scene_index import SceneIndex
+    index = SceneIndex.build(context['video'])
+    return {'shots': len(index.shot_boundaries) + 1, 'keyframes': len(index.keyframes)}
+
+
+@benchmark("video", needs_ffmpeg=True)
+def convert_blur(context):
+    from clipify.video.converter import VideoConverter
+    path = output_path(context, "mobile.mp4")
+    assert VideoConverter(encoding_profile=context['profile']).convert_to_mobile(_cut_video(context), path)
+    context['mobile_video'] = path
+    return {'frames': frames_of(path)}
+
+
+@benchmark("video", needs_ffmpeg=True)
+def convert_multi(context):
+    """Three ratios from one decode"""
+    from clipify.video.converter import VideoConverter
+    outputs = {ratio: output_path(context, f"mobile_{ratio.replace(':', 'x')}.mp4") for ratio in ("9:16", "4:5", "1:1")}
+    assert VideoConverter(encoding_profile=context['profile']).convert_to_mobile_multi(_cut_video(context), outputs)
+    return {'frames': sum(frames_of(path) for path in outputs.values())}
+
+
+@benchmark("video", needs_ffmpeg=True)
+def convert_stretch(context):
+    from clipify.video.converterStretch import VideoConverterStretch
+    path = output_path(context, "stretch.mp4")
+    assert VideoConverterStretch(encoding_profile=context['profile']).convert_to_mobile(_cut_video(context), path)
+    return {'frames': frames_of(path)}
+
+
+@benchmark("video", needs_ffmpeg=True)
+def convert_smart_crop(context):
+    from clipify.video.converterStretch import VideoConverterStretch
+    from clipify.video.smart_crop import SmartCropAnalyzer
+    path = output_path(context, "smart.mp4")
+    converter = VideoConverterStretch(
+        encoding_profile=context['profile'],
+        crop_mode="smart",
+        analyzer=SmartCropAnalyzer(cache_dir=None)
+    )
+    assert converter.convert_to_mobile(_cut_video(context), path)
+    return {'frames': frames_of(path)}
+
+
+# --- Captions ---------------------------------------------------------------
+
+def _cut_word_timings(context):
+    """Fixture words inside the 2-10s cut, relative to the cut"""
+    return [
+        dict(word, start=word['start'] - 2.0, end=word['end'] - 2.0)
+        for word in context['transcript']['word_timings']
+        if 2.0 <= word['start'] and word['end'] <= 10.0
+    ]
+
+
+def _mobile_video(context):
+    if 'mobile_video' not in context:
+        convert_blur(context)
+    return context['mobile_video']
+
+
+@benchmark("captions", needs_ffmpeg=True)
+def caption_sprite(context):
+    from clipify.video.captions import CaptionRenderer, SpriteCache
+    path = output_path(context, "captioned_sprite.mp4")
+    renderer = CaptionRenderer(cache=SpriteCache(), encoding_profile=context['profile'])
+    assert renderer.burn(_mobile_video(context), path, _cut_word_timings(context))
+    return {'frames': frames_of(path), 'sprite_misses': renderer.cache.misses, 'sprite_hits': renderer.cache.hits}
+
+
+@benchmark("captions", needs_ffmpeg=True)
+def caption_libass(context):
+    from clipify.video.libass import LibassRenderer
+    path = output_path(context, "captioned_libass.mp4")
+    assert LibassRenderer(encoding_profile=context['profile']).burn(
+        _mobile_video(context), path, _cut_word_timings(context)
+    )
+    return {'frames': frames_of(path)}
+
+
+@benchmark("captions", needs_ffmpeg=True)
+def caption_libass_fused(context):
+    """Reframe and captions in one ffmpeg pass from the cut"""
+    from clipify.video.converter import VideoConverter
+    from clipify.video.libass import LibassRenderer
+    video_filter, output_size = VideoConverter().build_filtergraph(_cut_video(context), "9:16")
+    path = output_path(context, "captioned_fused.mp4")
+    assert LibassRenderer(encoding_profile=context['profile']).burn(
+        _cut_video(context), path, _cut_word_timings(context),
+        video_filter=video_filter, output_size=output_size
+    )
+    return {'frames': frames_of(path)}
+
+
+@benchmark("captions", needs_ffmpeg=True)
+def caption_export(context):
+    """Sidecar SRT and ASS files plus a stream-copied soft subtitle track"""
+    from clipify.video.subtitles import write_captions, mux_subtitles
+    word_timings = _cut_word_timings(context)
+    write_captions(word_timings, output_path(context, "captions.srt"))
+    ass_path = write_captions(word_timings, output_path(context, "captions.ass"))
+    assert mux_subtitles(_mobile_video(context), ass_path, output_path(context, "soft.mkv"))
+    return {'words': len(word_timings)}
+
+
+# --- Runner -----------------------------------------------------------------
+
+def environment():
+    """Machine and build details stored with every result file"""
+    def command_output(command):
+        try:
+            return subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, check=True).stdout.decode().strip()
+        except Exception:
+            return None
+
+    from moviepy.config import get_setting
+    ffmpeg_version = command_output([get_setting("FFMPEG_BINARY"), "-version"])
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_commit': command_output(["git", "rev-parse", "--short", "HEAD"]),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'ffmpeg': ffmpeg_version.splitlines()[0] if ffmpeg_version else None
+    }
+
+
+def run_benchmark(name, context, repeat):
+    """Run one benchmark repeat times and summarise its wall times"""
+    entry = BENCHMARKS[name]
+    times = []
+    extras = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extras = entry['func'](context) or {}
+        times.append(time.perf_counter() - start)
+
+    result = {
+        'group': entry['group'],
+        'repeat': repeat,
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        **extras
+    }
+    if extras.get('frames'):
+        result['fps'] = extras['frames'] / result['median']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Clipify benchmark suite")
+    parser.add_argument('--size', choices=sorted(fixtures.SIZES), default="quick", help="Fixture size")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark")
+    parser.add_argument('--only', help="Comma-separated benchmark or group names")
+    parser.add_argument('--profile', default="draft-fast", help="Encoding profile for rendered videos")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--speech', help="Speech recording for the transcription benchmarks")
+    parser.add_argument('--speech-timings', help="Reference word timings JSON (a list or a 'word_timings' key)")
+    parser.add_argument('--speech-model', default="base", help="Whisper model size for the transcription benchmarks")
+    parser.add_argument('--speech-options', default="default",
+                        help="Transcription profile for the transcription benchmarks (default, fast, accurate)")
+    args = parser.parse_args()
+
+    selected = list(BENCHMARKS)
+    if args.only:
+        wanted = set(args.only.split(","))
+        selected = [name for name in BENCHMARKS if name in wanted or BENCHMARKS[name]['group'] in wanted]
+
+    has_ffmpeg = fixtures.ffmpeg_available()
+    width, height, fps, duration = fixtures.SIZES[args.size]
+    work_dir = tempfile.mkdtemp(prefix="clipify_bench_")
+    context = {
+        'work_dir': work_dir,
+        'profile': args.profile,
+        'transcript': fixtures.make_transcript(duration=max(duration, 60))
+    }
+    if has_ffmpeg:
+        print(f"Preparing {args.size} fixtures ({width}x{height}, {fps} fps, {duration}s)...")
+        context['video'] = fixtures.make_video(args.size)
+        context['wav'] = fixtures.make_wav(args.size)
+    if args.speech:
+        context['speech'] = args.speech
+        context['speech_model'] = args.speech_model
+        context['speech_options'] = args.speech_options
+    if args.speech_timings:
+        with open(args.speech_timings, 'r', encoding='utf-8') as file:
+            reference = json.load(file)
+        context['speech_reference'] = reference['word_timings'] if isinstance(reference, dict) else reference
+
+    results = {}
+    try:
+        for name in selected:
+            if BENCHMARKS[name]['needs_ffmpeg'] and not has_ffmpeg:
+                results[name] = {'group': BENCHMARKS[name]['group'], 'skipped': "ffmpeg not available"}
+                print(f"{name:24s} skipped (ffmpeg not available)")
+                continue
+            if BENCHMARKS[name]['needs_speech'] and not args.speech:
+                results[name] = {'group': BENCHMARKS[name]['group'], 'skipped': "no --speech sample"}
+                print(f"{name:24s} skipped (no --speech sample)")
+                continue
+            try:
+                results[name] = run_benchmark(name, context, args.repeat)
+                summary = f"{results[name]['median'] * 1000:10.1f} ms"
+                if 'fps' in results[name]:
+                    summary += f"  {results[name]['fps']:8.1f} fps"
+                if 'rtf' in results[name]:
+                    summary += f"  {results[name]['rtf']:8.3f} rtf"
+                if results[name].get('timing_error') is not None:
+                    summary += f"  {results[name]['timing_error'] * 1000:6.0f} ms timing error"
+                print(f"{name:24s}{summary}")
+            except Exception as e:
+                results[name] = {'group': BENCHMARKS[name]['group'], 'error': str(e)}
+                print(f"{name:24s} failed: {e}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'environment': environment(),
+        'settings': {'size': args.size, 'repeat': args.repeat, 'profile': args.profile,
+                     'speech': args.speech, 'speech_model': args.speech_model,
+                     'speech_options': args.speech_options},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results saved to: {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,15 @@
 from clipify.core.processor import ContentProcessor
 from clipify.core.text_processor import SmartTextProcessor
-from clipify.core.ai_providers import HyperbolicAI, OpenAIProvider, AnthropicProvider ,OllamaProvider
+from clipify.core.ai_providers import HyperbolicAI, OpenAIProvider, AnthropicProvider ,OllamaProvider, FailoverProvider
 from clipify.core.clipify import Clipify
 from clipify.video.cutter import VideoCutter
 from clipify.video.converter import VideoConverter
 from clipify.video.processor import VideoProcessor
 from clipify.audio.extractor import AudioExtractor
 from clipify.audio.speech import SpeechToText
+from clipify.audio.options import TranscriptionOptions
 from clipify.video.converterStretch import VideoConverterStretch
+from clipify.video.encoding import EncodingProfile
 import warnings
 # Suppress specific Whisper warning about torch.load
 warnings.filterwarnings(
@@ -32,11 +34,14 @@ __all__ = [
     'OpenAIProvider',
     'AnthropicProvider',
     'OllamaProvider',
+    'FailoverProvider',
     'Clipify',
     'VideoCutter',
     'VideoConverter',
     'VideoProcessor',
     'AudioExtractor',
     'SpeechToText',
+    'TranscriptionOptions',
     'VideoConverterStretch',
+    'EncodingProfile',
 ] 
\ No newline at end of file
@@ -1,4 +1,9 @@
 from .extractor import AudioExtractor
 from .speech import SpeechToText
+from .backends import TranscriptionBackend, WhisperBackend, FasterWhisperBackend
+from .options import TranscriptionOptions, get_transcription_options
+from .service import TranscriptionServer, TranscriptionClient, start_server
 
-__all__ = ['AudioExtractor', 'SpeechToText'] 
\ No newline at end of file
+__all__ = ['AudioExtractor', 'SpeechToText', 'TranscriptionBackend', 'WhisperBackend', 'FasterWhisperBackend',
+           'TranscriptionOptions', 'get_transcription_options', 'TranscriptionServer', 'TranscriptionClient',
+           'start_server'] 
\ No newline at end of file
@@ -0,0 +1,367 @@
+from abc import ABC, abstractmethod
+import os
+import sys
+import wave
+import numpy as np
+from .options import get_transcription_options
+from .envelope import AudioEnvelope
+
+
+# Whisper models take 16 kHz mono audio in 30 second windows
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30.0
+
+
+def load_wav(audio_path, sample_rate=SAMPLE_RATE):
+    """
+    Read a PCM WAV file, such as the output of AudioExtractor, as Whisper input
+
+    Args:
+        audio_path (str): Path to the WAV file
+        sample_rate (int): Sample rate to resample to
+
+    Returns:
+        np.ndarray: Mono float32 samples in [-1, 1]
+    """
+    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+    with wave.open(audio_path, 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        if sample_width not in dtypes:
+            raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+        data = wav.readframes(wav.getnframes())
+
+    samples = np.frombuffer(data, dtype=dtypes[sample_width]).astype(np.float32)
+    if sample_width == 1:
+        samples -= 128.0
+    samples = samples.reshape(-1, channels).mean(axis=1) / float(2 ** (8 * sample_width - 1))
+    if rate != sample_rate and len(samples):
+        positions = np.arange(int(len(samples) * sample_rate / rate)) * (rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype(np.float32)
+
+
+def pack_windows(durations, window=WINDOW_SECONDS, gap=1.0):
+    """
+    Group clips in order into windows of at most window seconds, separated by gap seconds
+
+    Args:
+        durations (list): Clip durations in seconds
+        window (float): Window length in seconds
+        gap (float): Silence between clips in seconds
+
+    Returns:
+        list: Windows as lists of clip indices; a clip longer than a window is alone in its own
+    """
+    windows = []
+    current = []
+    length = 0.0
+    for index, duration in enumerate(durations):
+        needed = duration + (gap if current else 0.0)
+        if current and length + needed > window:
+            windows.append(current)
+            current = []
+            length = 0.0
+            needed = duration
+        current.append(index)
+        length += needed
+    if current:
+        windows.append(current)
+    return windows
+
+
+class TranscriptionBackend(ABC):
+    """Abstract base class for speech-to-text engines"""
+
+    @abstractmethod
+    def transcribe(self, audio_path, options=None):
+        """
+        Transcribe an audio file with word timestamps
+
+        Args:
+            audio_path: Path to audio file, or mono float32 samples at 16 kHz
+            options: TranscriptionOptions, profile name or dict of options; None for the defaults
+
+        Returns:
+            dict: 'text' and 'word_timings' (list of {'text', 'start', 'end'})
+        """
+        pass
+
+    @staticmethod
+    def word_timing(text, start, end):
+        """Word timing entry in the SpeechToText format"""
+        return {'text': text.strip(), 'start': float(start), 'end': float(end)}
+
+    @staticmethod
+    def decode_kwargs(options, names):
+        """
+        Keyword arguments for a backend's transcribe call
+
+        Args:
+            options (TranscriptionOptions): Resolved options
+            names (dict): Option name -> the backend's argument name
+
+        Returns:
+            dict: Arguments for the options that are set
+        """
+        values = options.to_dict()
+        return {argument: values[name] for name, argument in names.items() if values[name] is not None}
+
+    def transcribe_batch(self, audios, options=None, window=WINDOW_SECONDS, gap=1.0):
+        """
+        Transcribe many short clips, packing them into shared windows
+
+        Whisper pads every input to a 30 second window, so a 5 second clip costs
+        as much encoder work as a 30 second one. Clips are laid out one after
+        another, separated by gap seconds of silence, until a window is full.
+        Each window is transcribed in one call, and the words are split back per
+        clip by their position. Clips longer than a window are transcribed alone.
+
+        Args:
+            audios (list): Mono float32 sample arrays at 16 kHz
+            options: TranscriptionOptions, profile name or dict of options; set a fixed
+                language, as one window may hold several clips
+            window (float): Window length in seconds
+            gap (float): Silence between clips in seconds
+
+        Returns:
+            list: One {'text', 'word_timings'} dict per clip, in input order, with
+                timings relative to the clip's start
+        """
+        options = get_transcription_options(options)
+        audios = [np.asarray(audio, dtype=np.float32) for audio in audios]
+        durations = [len(audio) / SAMPLE_RATE for audio in audios]
+        silence = np.zeros(int(gap * SAMPLE_RATE), dtype=np.float32)
+        results = [None] * len(audios)
+
+        for indices in pack_windows(durations, window, gap):
+            if len(indices) == 1:
+                results[indices[0]] = self.transcribe(audios[indices[0]], options)
+                continue
+
+            parts = []
+            offsets = []
+            for index in indices:
+                if parts:
+                    parts.append(silence)
+                offsets.append(sum(len(part) for part in parts) / SAMPLE_RATE)
+                parts.append(audios[index])
+            packed = self.transcribe(np.concatenate(parts), options)
+
+            # A word belongs to the clip its midpoint falls in, or the gap after it
+            words = [[] for _ in indices]
+            for word in packed['word_timings']:
+                middle = (word['start'] + word['end']) / 2
+                position = max(0, int(np.searchsorted(offsets, middle, side='right')) - 1)
+                offset = offsets[position]
+                duration = durations[indices[position]]
+                words[position].append(self.word_timing(
+                    word['text'],
+                    min(max(word['start'] - offset, 0.0), duration),
+                    min(max(word['end'] - offset, 0.0), duration)
+                ))
+            for position, index in enumerate(indices):
+                results[index] = {
+                    'text': " ".join(word['text'] for word in words[position]),
+                    'word_timings': words[position]
+                }
+        return results
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper (PyTorch) backend"""
+
+    OPTION_NAMES = {
+        'language': 'language',
+        'beam_size': 'beam_size',
+        'temperature': 'temperature',
+        'no_speech_threshold': 'no_speech_threshold',
+        'log_prob_threshold': 'logprob_threshold',
+        'compression_ratio_threshold': 'compression_ratio_threshold',
+        'condition_on_previous_text': 'condition_on_previous_text'
+    }
+
+    def __init__(self, model_size="base", device=None):
+        """
+        Args:
+            model_size (str): Whisper model size ("tiny", "base", "small", "medium", "large")
+            device (str): Torch device; None lets Whisper choose
+        """
+        import whisper
+
+        # Determine the base path
+        if getattr(sys, 'frozen', False):  # If running as PyInstaller .exe
+            base_path = sys._MEIPASS
+        else:
+            base_path = os.path.dirname(os.path.abspath(__file__))
+
+        # Set Whisper’s asset directory
+        whisper.utils.ASSET_DIR = os.path.join(base_path, "whisper/assets")
+        self.model = whisper.load_model(model_size, device=device)
+
+    @staticmethod
+    def speech_regions(audio_path, options):
+        """
+        Speech regions of a WAV file
+
+        openai-whisper has no VAD of its own, so quiet gaps are found with the
+        audio's RMS envelope and only the regions between them are decoded.
+
+        Returns:
+            list: (start, end) tuples in seconds, or None to decode everything
+        """
+        try:
+            envelope = AudioEnvelope.from_wav(audio_path)
+        except (wave.Error, EOFError, ValueError) as e:
+            print(f"Warning: VAD skipped, audio is not a readable WAV file: {e}")
+            return None
+
+        regions = envelope.speech_regions(options.vad_min_silence, options.vad_padding)
+        duration = len(envelope.rms) * envelope.window
+        if len(regions) == 1 and regions[0][1] - regions[0][0] >= duration - 0.01:
+            return None
+        skipped = duration - sum(end - start for start, end in regions)
+        print(f"VAD: decoding {len(regions)} speech regions, skipping {skipped:.1f}s of {duration:.1f}s")
+        return regions
+
+    def _transcribe_audio(self, audio, kwargs, offset=0.0):
+        """Run Whisper on a file or sample array, shifting the word timings by offset seconds"""
+        result = self.model.transcribe(audio, word_timestamps=True, **kwargs)
+
+        if not result or 'text' not in result:
+            raise Exception("Whisper transcription failed to return valid result")
+
+        # Process word-level timestamps
+        word_timings = []
+        for segment in result['segments']:
+            if 'words' not in segment:
+                continue
+
+            for word_data in segment['words']:
+                # Check if word_data has the required fields
+                if isinstance(word_data, dict) and 'word' in word_data and 'start' in word_data and 'end' in word_data:
+                    word_timings.append(self.word_timing(word_data['word'], word_data['start'] + offset,
+                                                         word_data['end'] + offset))
+                else:
+                    print(f"Warning: Skipping malformed word data: {word_data}")
+
+        return result['text'], word_timings
+
+    def transcribe(self, audio_path, options=None):
+        """Transcribe with openai-whisper"""
+        options = get_transcription_options(options)
+        kwargs = self.decode_kwargs(options, self.OPTION_NAMES)
+
+        # Sample arrays come from transcribe_batch, whose clips are already short
+        regions = None
+        if options.vad and isinstance(audio_path, str):
+            regions = self.speech_regions(audio_path, options)
+            if regions == []:
+                print("VAD: no speech found")
+                return {'text': "", 'word_timings': []}
+
+        print("Running Whisper transcription with word timestamps...")
+        if not regions:
+            text, word_timings = self._transcribe_audio(audio_path, kwargs)
+            return {'text': text, 'word_timings': word_timings}
+
+        # The pinned openai-whisper has no clip_timestamps, so decode each region's samples
+        samples = load_wav(audio_path)
+        texts = []
+        word_timings = []
+        for start, end in regions:
+            audio = samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            text, words = self._transcribe_audio(audio, kwargs, offset=start)
+            texts.append(text.strip())
+            word_timings.extend(words)
+
+        return {
+            'text': " ".join(text for text in texts if text),
+            'word_timings': word_timings
+        }
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2) backend, int8 on CPU by default"""
+
+    OPTION_NAMES = {
+        'language': 'language',
+        'beam_size': 'beam_size',
+        'temperature': 'temperature',
+        'no_speech_threshold': 'no_speech_threshold',
+        'log_prob_threshold': 'log_prob_threshold',
+        'compression_ratio_threshold': 'compression_ratio_threshold',
+        'condition_on_previous_text': 'condition_on_previous_text'
+    }
+
+    def __init__(self, model_size="base", device="cpu", compute_type="int8", cpu_threads=0, beam_size=5):
+        """
+        Args:
+            model_size (str): Whisper model size or a path to a converted CTranslate2 model
+            device (str): "cpu", "cuda" or "auto"
+            compute_type (str): Weight quantization, e.g. "int8", "int8_float16", "float16", "float32"
+            cpu_threads (int): Threads per transcription; 0 uses CTranslate2's default
+            beam_size (int): Beam search width unless the transcription options set one
+        """
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError("faster-whisper package not installed. Install with: pip install faster-whisper")
+
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        self.beam_size = beam_size
+
+    def transcribe(self, audio_path, options=None):
+        """Transcribe with faster-whisper"""
+        options = get_transcription_options(options)
+        kwargs = dict({'beam_size': self.beam_size}, **self.decode_kwargs(options, self.OPTION_NAMES))
+        if options.vad:
+            # faster-whisper's Silero VAD also skips music and noise, not only silence
+            kwargs['vad_filter'] = True
+            kwargs['vad_parameters'] = {
+                'min_silence_duration_ms': int(options.vad_min_silence * 1000),
+                'speech_pad_ms': int(options.vad_padding * 1000)
+            }
+
+        print("Running faster-whisper transcription with word timestamps...")
+        segments, _ = self.model.transcribe(audio_path, word_timestamps=True, **kwargs)
+
+        # Segments are generated lazily while iterating
+        texts = []
+        word_timings = []
+        for segment in segments:
+            texts.append(segment.text)
+            for word in segment.words or []:
+                word_timings.append(self.word_timing(word.word, word.start, word.end))
+
+        return {
+            'text': "".join(texts),
+            'word_timings': word_timings
+        }
+
+
+# Backend name -> class
+TRANSCRIPTION_BACKENDS = {
+    "whisper": WhisperBackend,
+    "faster-whisper": FasterWhisperBackend
+}
+
+
+def get_transcription_backend(backend="whisper", model_size="base", **options):
+    """
+    Factory function to get a transcription backend
+
+    Args:
+        backend: Backend name ('whisper' or 'faster-whisper') or a TranscriptionBackend instance
+        model_size: Whisper model size
+        **options: Backend-specific options (device, compute_type, cpu_threads, beam_size)
+    """
+    if isinstance(backend, TranscriptionBackend):
+        return backend
+
+    backend_class = TRANSCRIPTION_BACKENDS.get(backend.lower())
+    if not backend_class:
+        raise ValueError(f"Unknown transcription backend: {backend}. "
+                         f"Available backends: {', '.join(TRANSCRIPTION_BACKENDS.keys())}")
+    return backend_class(model_size, **options)
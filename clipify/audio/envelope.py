@@ -0,0 +1,134 @@
+import wave
+import numpy as np
+
+
+class AudioEnvelope:
+    """Downsampled RMS envelope of an audio file, used to find quiet gaps between words"""
+
+    def __init__(self, rms, window=0.01, threshold_db=-20.0, floor_db=-50.0):
+        """
+        Initialize the envelope
+
+        Args:
+            rms (np.ndarray): RMS level of each window, relative to full scale
+            window (float): Window length in seconds (default: 0.01)
+            threshold_db (float): Level relative to the median RMS below which a window
+                counts as quiet (default: -20.0)
+            floor_db (float): Level in dBFS below which a window always counts as quiet, so
+                audio that is mostly silence or noise still has a usable threshold (default: -50.0)
+        """
+        self.rms = np.asarray(rms, dtype=np.float32)
+        self.window = window
+        median = float(np.median(self.rms)) if len(self.rms) else 0.0
+        self.threshold = max(10 ** (floor_db / 20), median * 10 ** (threshold_db / 20))
+        self.quiet = self.rms <= self.threshold
+
+    @classmethod
+    def from_wav(cls, audio_path, window=0.01, threshold_db=-20.0, chunk_seconds=60, floor_db=-50.0):
+        """
+        Compute the envelope of a PCM WAV file, such as the output of AudioExtractor
+
+        The file is read in chunks so long videos never need their full PCM in memory.
+
+        Args:
+            audio_path (str): Path to the WAV file
+            window (float): Window length in seconds
+            threshold_db (float): Quiet threshold relative to the median level
+            chunk_seconds (int): Amount of audio read per chunk
+            floor_db (float): Level in dBFS below which a window always counts as quiet
+        """
+        dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+        with wave.open(audio_path, 'rb') as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            if sample_width not in dtypes:
+                raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+
+            hop = max(1, int(wav.getframerate() * window))
+            frames_per_chunk = hop * max(1, int(chunk_seconds / window))
+            scale = float(2 ** (8 * sample_width - 1))
+
+            levels = []
+            while True:
+                data = wav.readframes(frames_per_chunk)
+                if not data:
+                    break
+                samples = np.frombuffer(data, dtype=dtypes[sample_width]).astype(np.float32)
+                if sample_width == 1:
+                    samples -= 128.0
+                samples = samples.reshape(-1, channels).mean(axis=1) / scale
+
+                count = len(samples) // hop
+                if count == 0:
+                    break
+                blocks = samples[:count * hop].reshape(count, hop)
+                levels.append(np.sqrt(np.mean(blocks * blocks, axis=1)))
+
+        rms = np.concatenate(levels) if levels else np.zeros(0, dtype=np.float32)
+        return cls(rms, window=window, threshold_db=threshold_db, floor_db=floor_db)
+
+    def snap_start(self, start, tolerance=0.3):
+        """Move a start time back to the nearest quiet window within the tolerance"""
+        first = max(0, int((start - tolerance) / self.window))
+        last = min(len(self.quiet), int(start / self.window) + 1)
+        quiet = np.flatnonzero(self.quiet[first:last])
+        if not len(quiet):
+            return start
+        return float(min(start, (first + quiet[-1]) * self.window))
+
+    def snap_end(self, end, tolerance=0.3):
+        """Move an end time forward to the nearest quiet window within the tolerance"""
+        first = int(end / self.window)
+        last = min(len(self.quiet), int((end + tolerance) / self.window) + 1)
+        quiet = np.flatnonzero(self.quiet[first:last])
+        if not len(quiet):
+            return end
+        return float(max(end, (first + quiet[0] + 1) * self.window))
+
+    def refine(self, start, end, tolerance=0.3):
+        """
+        Snap segment boundaries outward to the nearest quiet gaps
+
+        Boundaries only ever move outward, so words are never cut short.
+
+        Returns:
+            tuple: (start, end) in seconds
+        """
+        return self.snap_start(start, tolerance), self.snap_end(end, tolerance)
+
+    def speech_regions(self, min_silence=1.0, padding=0.3):
+        """
+        Find the regions between long quiet gaps, such as silent intros, outros and pauses
+
+        Args:
+            min_silence (float): Shortest quiet gap in seconds that separates regions
+            padding (float): Seconds kept on both sides of every region
+
+        Returns:
+            list: (start, end) tuples in seconds; empty if the audio is quiet throughout
+        """
+        duration = len(self.rms) * self.window
+        edges = np.diff(np.concatenate(([0], self.quiet.astype(np.int8), [0])))
+        gap_starts = np.flatnonzero(edges == 1) * self.window
+        gap_ends = np.flatnonzero(edges == -1) * self.window
+
+        regions = []
+        position = 0.0
+        for gap_start, gap_end in zip(gap_starts, gap_ends):
+            if gap_end - gap_start < min_silence:
+                continue
+            if gap_start > position:
+                regions.append((max(0.0, position - padding), min(duration, gap_start + padding)))
+            position = gap_end
+        if position < duration:
+            regions.append((max(0.0, position - padding), duration))
+
+        # Padding can make neighbouring regions overlap
+        merged = []
+        for start, end in regions:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((float(start), float(end)))
+        return merged
@@ -1,4 +1,5 @@
 from pydub import AudioSegment
+import numpy as np
 import os
 from shutil import which
 
@@ -62,4 +63,23 @@ class AudioExtractor:
             print(f"Error extracting audio: {str(e)}")
             import traceback
             print(traceback.format_exc())
+            return None
+
+    def extract_samples(self, video_path, sample_rate=16000):
+        """
+        Extract audio from a video file as Whisper input, without writing a WAV file
+        :param video_path: Path to input video file
+        :param sample_rate: Sample rate of the returned samples
+        :return: Mono float32 numpy array in [-1, 1], or None on failure
+        """
+        try:
+            if not os.path.exists(video_path):
+                raise FileNotFoundError(f"Video file not found: {video_path}")
+
+            audio = AudioSegment.from_file(video_path)
+            audio = audio.set_channels(1).set_sample_width(2).set_frame_rate(sample_rate)
+            return np.array(audio.get_array_of_samples(), dtype=np.float32) / 32768.0
+
+        except Exception as e:
+            print(f"Error extracting audio: {str(e)}")
             return None 
\ No newline at end of file
@@ -0,0 +1,103 @@
+class TranscriptionOptions:
+    """Decoding settings shared by every transcription backend"""
+
+    def __init__(self,
+                 name: str = "custom",
+                 language: str = None,
+                 beam_size: int = None,
+                 temperature=None,
+                 no_speech_threshold: float = None,
+                 log_prob_threshold: float = None,
+                 compression_ratio_threshold: float = None,
+                 condition_on_previous_text: bool = None,
+                 vad: bool = False,
+                 vad_min_silence: float = 1.0,
+                 vad_padding: float = 0.3):
+        """
+        Initialize transcription options
+
+        None leaves a setting at the backend's default.
+
+        Args:
+            name (str): Profile name, used in logs
+            language (str): Spoken language code, e.g. "en"; None detects it on every file
+            beam_size (int): Beam search width; 1 decodes greedily
+            temperature: Sampling temperature or tuple of fallback temperatures; 0.0
+                disables the re-decoding of segments that fail the thresholds below
+            no_speech_threshold (float): Skip segments whose no-speech probability is above this
+            log_prob_threshold (float): Re-decode segments whose average log probability is below this
+            compression_ratio_threshold (float): Re-decode segments whose gzip ratio is above this
+                (repetition loops)
+            condition_on_previous_text (bool): Feed the previous segment's text as the prompt
+            vad (bool): Skip non-speech regions before decoding, such as silent intros and outros
+            vad_min_silence (float): Shortest non-speech gap in seconds that is skipped
+            vad_padding (float): Seconds of audio kept around every speech region
+        """
+        self.name = name
+        self.language = language
+        self.beam_size = beam_size
+        self.temperature = temperature
+        self.no_speech_threshold = no_speech_threshold
+        self.log_prob_threshold = log_prob_threshold
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.condition_on_previous_text = condition_on_previous_text
+        self.vad = vad
+        self.vad_min_silence = vad_min_silence
+        self.vad_padding = vad_padding
+
+    def to_dict(self):
+        """Return the options as a plain dictionary"""
+        return dict(vars(self))
+
+    def replace(self, **changes):
+        """Copy of the options with some settings changed, e.g. profile.replace(language="en")"""
+        return TranscriptionOptions(**dict(self.to_dict(), **changes))
+
+    def __repr__(self):
+        return f"TranscriptionOptions({self.to_dict()})"
+
+
+TRANSCRIPTION_PROFILES = {
+    "default": TranscriptionOptions(name="default"),
+    # Greedy decoding without temperature fallback, skipping silence
+    "fast": TranscriptionOptions(
+        name="fast",
+        beam_size=1,
+        temperature=0.0,
+        no_speech_threshold=0.6,
+        condition_on_previous_text=False,
+        vad=True
+    ),
+    # Beam search with fallback, skipping silence only
+    "accurate": TranscriptionOptions(
+        name="accurate",
+        beam_size=5,
+        temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        no_speech_threshold=0.6,
+        vad=True
+    ),
+}
+
+
+def get_transcription_options(options=None) -> TranscriptionOptions:
+    """
+    Resolve transcription options
+
+    Args:
+        options: None for the backend defaults, the name of a built-in profile
+            ("default", "fast", "accurate"), a dict of TranscriptionOptions
+            arguments, or a TranscriptionOptions instance
+    """
+    if options is None:
+        return TRANSCRIPTION_PROFILES["default"]
+    if isinstance(options, TranscriptionOptions):
+        return options
+    if isinstance(options, dict):
+        return TranscriptionOptions(**options)
+
+    profile = TRANSCRIPTION_PROFILES.get(str(options).lower())
+    if not profile:
+        raise ValueError(
+            f"Unknown transcription profile: {options}. Available profiles: {', '.join(TRANSCRIPTION_PROFILES.keys())}"
+        )
+    return profile
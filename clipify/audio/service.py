@@ -0,0 +1,412 @@
+import argparse
+import os
+import queue
+import secrets
+import stat
+import tempfile
+import threading
+import wave
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import Client, Listener
+from .backends import SAMPLE_RATE, WINDOW_SECONDS, get_transcription_backend, load_wav
+from .options import get_transcription_options
+
+
+# SpeechToText uses the service at this socket path when the variable is set
+SERVICE_ENV = "CLIPIFY_TRANSCRIPTION_SOCKET"
+# Shared secret of server and clients; overrides the key file when set
+AUTHKEY_ENV = "CLIPIFY_TRANSCRIPTION_AUTHKEY"
+
+
+def _check_private(path, kind):
+    """Raise unless a path is a directory or file of this user that others cannot access"""
+    info = os.lstat(path)
+    is_kind = stat.S_ISDIR(info.st_mode) if kind == "directory" else stat.S_ISREG(info.st_mode)
+    if not is_kind or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} must be a {kind} owned by the current user with no access "
+                           f"for others (mode {'0700' if kind == 'directory' else '0600'})")
+
+
+def runtime_dir():
+    """
+    Private directory for the socket and key file, created with mode 0700
+
+    Uses $XDG_RUNTIME_DIR/clipify, or clipify-<uid> in the temporary directory.
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    path = os.path.join(base, "clipify") if base else os.path.join(tempfile.gettempdir(), f"clipify-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    # Someone else may have created the directory first in a shared temporary directory
+    _check_private(path, "directory")
+    return path
+
+
+def default_address():
+    """Unix socket path of the transcription server in the private runtime directory"""
+    return os.path.join(runtime_dir(), "transcription.sock")
+
+
+def default_key_file():
+    """Key file of the transcription server in the private runtime directory"""
+    return os.path.join(runtime_dir(), "transcription.key")
+
+
+def load_authkey(key_file=None, create=False):
+    """
+    Read the shared secret from CLIPIFY_TRANSCRIPTION_AUTHKEY or a key file
+
+    Args:
+        key_file (str): Path of the key file (default: transcription.key in the runtime directory)
+        create (bool): Generate a random key into a new key file, mode 0600, if there is none
+
+    Returns:
+        bytes: The key, or None if there is none
+
+    Raises:
+        RuntimeError: If the key file can be read or written by other users
+    """
+    if os.environ.get(AUTHKEY_ENV):
+        return os.environ[AUTHKEY_ENV].encode('utf-8')
+
+    key_file = key_file or default_key_file()
+    if create and not os.path.exists(key_file):
+        try:
+            descriptor = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(descriptor, 'w') as file:
+                file.write(secrets.token_hex(32))
+    if not os.path.exists(key_file):
+        return None
+
+    _check_private(key_file, "file")
+    with open(key_file, 'r') as file:
+        return file.read().strip().encode('utf-8') or None
+
+
+class TranscriptionServer:
+    """Long-lived process holding loaded transcription models and serving jobs over a socket"""
+
+    def __init__(self, address=None, model_size="base", backend="whisper", workers=1,
+                 authkey=None, key_file=None, batch_seconds=10.0, **backend_options):
+        """
+        Initialize the server; models are loaded by serve_forever
+
+        Every worker holds one model, so memory stays the same however many
+        clients are connected. Jobs from all clients wait in one queue.
+
+        Short WAV files sent by different clients at the same time share a
+        30 second window: a worker takes the queued transcribe jobs with the same
+        options along with its own and runs them through one transcribe_batch call.
+        Only jobs with a fixed language are combined, as Whisper detects the
+        language once per window.
+
+        Clients must present the shared key. Without authkey, it is read from
+        CLIPIFY_TRANSCRIPTION_AUTHKEY or the key file; for a Unix socket a key
+        file is generated if there is none.
+
+        Args:
+            address: Unix socket path, or a (host, port) tuple for TCP (default:
+                transcription.sock in the private runtime directory)
+            model_size (str): Whisper model size
+            backend (str): Transcription backend name ('whisper' or 'faster-whisper')
+            workers (int): Models loaded, i.e. jobs transcribed at the same time
+            authkey (bytes): Shared secret clients must present
+            key_file (str): Key file read, or created, when no authkey is given
+            batch_seconds (float): Longest file combined with other jobs; 0 transcribes every job alone
+            **backend_options: Backend-specific options (device, compute_type, cpu_threads, beam_size)
+
+        Raises:
+            ValueError: For a TCP address without a key
+        """
+        self.address = address or default_address()
+        self.model_size = model_size
+        self.backend = backend
+        self.workers = workers
+        self.authkey = authkey or load_authkey(key_file, create=isinstance(self.address, str))
+        if self.authkey is None:
+            raise ValueError(f"A TCP transcription server needs an authkey, {AUTHKEY_ENV} or an existing key file")
+        self.batch_seconds = batch_seconds
+        self.backend_options = backend_options
+        self.jobs = queue.Queue()
+        self.listener = None
+        self.stopped = threading.Event()
+
+    def info(self):
+        """Backend and model served, checked by clients before they use the service"""
+        return {'backend': self.backend, 'model_size': self.model_size, 'workers': self.workers,
+                'pid': os.getpid(), 'queued': self.jobs.qsize()}
+
+    def _short_clip(self, request):
+        """Duration of a transcribe job's WAV file if it may share a window with other jobs, else None"""
+        if request.get('op') != 'transcribe' or not self.batch_seconds:
+            return None
+        if not get_transcription_options(request.get('options')).language:
+            return None
+        try:
+            with wave.open(request['audio_path'], 'rb') as wav:
+                duration = wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError, OSError):
+            return None
+        return duration if duration <= self.batch_seconds else None
+
+    def _take_batch(self, request, reply, gap=1.0):
+        """
+        Queued transcribe jobs that can share a window with a job
+
+        Returns:
+            tuple: (list of (request, reply) jobs to batch, the first queued job that
+                could not join, or None)
+        """
+        batch = [(request, reply)]
+        length = self._short_clip(request)
+        if length is None:
+            return batch, None
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                return batch, None
+            duration = self._short_clip(job[0])
+            if (duration is None or job[0].get('options') != request.get('options')
+                    or length + gap + duration > WINDOW_SECONDS):
+                return batch, job
+            batch.append(job)
+            length += gap + duration
+
+    def _run(self, backend, request, reply):
+        """Run one job and send its result or error to its caller"""
+        try:
+            options = get_transcription_options(request.get('options'))
+            if request['op'] == 'transcribe_batch':
+                audios = [load_wav(audio) if isinstance(audio, str) else audio for audio in request['audios']]
+                result = backend.transcribe_batch(audios, options)
+            else:
+                result = backend.transcribe(request['audio_path'], options)
+            reply.put({'result': result})
+        except Exception as e:
+            reply.put({'error': f"{type(e).__name__}: {e}"})
+
+    def _run_batch(self, backend, batch):
+        """Transcribe the files of several transcribe jobs together, replying to each caller"""
+        try:
+            options = get_transcription_options(batch[0][0].get('options'))
+            audios = [load_wav(request['audio_path'], SAMPLE_RATE) for request, _ in batch]
+            results = backend.transcribe_batch(audios, options)
+        except Exception as e:
+            for _, reply in batch:
+                reply.put({'error': f"{type(e).__name__}: {e}"})
+            return
+        for (_, reply), result in zip(batch, results):
+            reply.put({'result': result})
+
+    def _work(self, backend):
+        carried = None
+        while not self.stopped.is_set():
+            if carried is not None:
+                (request, reply), carried = carried, None
+            else:
+                try:
+                    request, reply = self.jobs.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+            batch, carried = self._take_batch(request, reply)
+            if len(batch) > 1:
+                self._run_batch(backend, batch)
+            else:
+                self._run(backend, request, reply)
+
+    def _serve_connection(self, connection):
+        try:
+            while True:
+                try:
+                    request = connection.recv()
+                except EOFError:
+                    break
+
+                if request.get('op') == 'info':
+                    connection.send({'result': self.info()})
+                elif request.get('op') in ('transcribe', 'transcribe_batch'):
+                    reply = queue.Queue(maxsize=1)
+                    self.jobs.put((request, reply))
+                    connection.send(reply.get())
+                else:
+                    connection.send({'error': f"Unknown operation: {request.get('op')}"})
+        except (OSError, EOFError):
+            pass
+        finally:
+            connection.close()
+
+    def _remove_stale_socket(self):
+        if not isinstance(self.address, str) or not os.path.exists(self.address):
+            return
+        if TranscriptionClient(self.address, self.authkey).info() is not None:
+            raise RuntimeError(f"A transcription server is already running at {self.address}")
+        os.remove(self.address)
+
+    def serve_forever(self):
+        """Load the models and serve until shutdown is called"""
+        self._remove_stale_socket()
+        print(f"Loading {self.workers} {self.backend} model(s) ({self.model_size})...")
+        for _ in range(self.workers):
+            backend = get_transcription_backend(self.backend, self.model_size, **self.backend_options)
+            threading.Thread(target=self._work, args=(backend,), daemon=True).start()
+
+        self.listener = Listener(self.address, authkey=self.authkey)
+        print(f"Transcription server listening on {self.address}")
+        try:
+            while not self.stopped.is_set():
+                try:
+                    connection = self.listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    # A client failed authentication or hung up during the handshake
+                    continue
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+        finally:
+            self.stopped.set()
+            self.listener.close()
+
+    def shutdown(self):
+        """Stop serving; serve_forever returns and removes the socket"""
+        self.stopped.set()
+        # accept() does not return when the listener is closed from another thread, so connect once
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError, AuthenticationError):
+            pass
+
+
+def start_server(address=None, model_size="base", backend="whisper", workers=1, authkey=None, key_file=None,
+                 batch_seconds=10.0, **backend_options):
+    """
+    Run a TranscriptionServer in a background process
+
+    Returns:
+        multiprocessing.Process: The server process; terminate() stops it
+    """
+    server = TranscriptionServer(address, model_size, backend, workers, authkey, key_file, batch_seconds,
+                                 **backend_options)
+    process = Process(target=server.serve_forever, name="clipify-transcription", daemon=True)
+    process.start()
+    return process
+
+
+class TranscriptionClient:
+    """Client of a TranscriptionServer; safe to share between threads"""
+
+    def __init__(self, address=None, authkey=None, key_file=None):
+        """
+        Args:
+            address: Unix socket path, or a (host, port) tuple for TCP (default:
+                transcription.sock in the private runtime directory)
+            authkey (bytes): Shared secret of the server; None reads it from
+                CLIPIFY_TRANSCRIPTION_AUTHKEY or the key file
+            key_file (str): Key file of the server
+
+        Raises:
+            ValueError: If there is no key; replies are unpickled, so only an
+                authenticated server is ever talked to
+        """
+        self.address = address or default_address()
+        self.authkey = authkey or load_authkey(key_file)
+        if self.authkey is None:
+            raise ValueError(f"No transcription server key: set {AUTHKEY_ENV} or pass authkey or key_file")
+
+    def _call(self, request):
+        # One connection per call; connecting to a local socket is cheap next to transcribing
+        with Client(self.address, authkey=self.authkey) as connection:
+            connection.send(request)
+            reply = connection.recv()
+        if 'error' in reply:
+            raise RuntimeError(f"Transcription server error: {reply['error']}")
+        return reply['result']
+
+    def info(self):
+        """Server details, or None if no server answers"""
+        try:
+            return self._call({'op': 'info'})
+        except (OSError, EOFError, RuntimeError, AuthenticationError):
+            return None
+
+    def transcribe(self, audio_path, options=None):
+        """
+        Transcribe an audio file on the server
+
+        The server reads the file itself, so the path must be visible to it.
+
+        Args:
+            audio_path (str): Path to audio file
+            options: TranscriptionOptions, profile name or dict of options
+
+        Returns:
+            dict: 'text' and 'word_timings', as returned by the server's backend
+
+        Raises:
+            ConnectionError: If the server cannot be reached
+            RuntimeError: If the transcription failed on the server
+        """
+        request = {
+            'op': 'transcribe',
+            'audio_path': os.path.abspath(audio_path),
+            'options': get_transcription_options(options).to_dict()
+        }
+        try:
+            return self._call(request)
+        except (OSError, EOFError) as e:
+            raise ConnectionError(f"Transcription server at {self.address} unavailable: {e}")
+
+    def transcribe_batch(self, audios, options=None):
+        """
+        Transcribe many short clips on the server, packed into shared windows
+
+        Args:
+            audios (list): WAV file paths or mono float32 sample arrays at 16 kHz
+            options: TranscriptionOptions, profile name or dict of options
+
+        Returns:
+            list: One {'text', 'word_timings'} dict per clip, in input order
+
+        Raises:
+            ConnectionError: If the server cannot be reached
+            RuntimeError: If the transcription failed on the server
+        """
+        request = {
+            'op': 'transcribe_batch',
+            'audios': [os.path.abspath(audio) if isinstance(audio, str) else audio for audio in audios],
+            'options': get_transcription_options(options).to_dict()
+        }
+        try:
+            return self._call(request)
+        except (OSError, EOFError) as e:
+            raise ConnectionError(f"Transcription server at {self.address} unavailable: {e}")
+
+
+def main():
+    """Run a transcription server from the command line"""
+    parser = argparse.ArgumentParser(description="Serve Whisper transcription to SpeechToText clients")
+    parser.add_argument('--socket', default=os.environ.get(SERVICE_ENV), help="Unix socket path "
+                        "(default: transcription.sock in $XDG_RUNTIME_DIR/clipify or /tmp/clipify-<uid>)")
+    parser.add_argument('--model', default="base", help="Whisper model size")
+    parser.add_argument('--backend', default="whisper", help="Transcription backend: whisper or faster-whisper")
+    parser.add_argument('--workers', type=int, default=1, help="Models loaded, i.e. concurrent transcriptions")
+    parser.add_argument('--authkey-file', help="File with the key clients must present, created with mode 0600 "
+                        f"if missing (default: transcription.key next to the default socket; {AUTHKEY_ENV} "
+                        "overrides it)")
+    parser.add_argument('--batch-seconds', type=float, default=10.0,
+                        help="Longest WAV file transcribed together with other queued jobs; 0 disables batching")
+    args = parser.parse_args()
+
+    server = TranscriptionServer(args.socket, args.model, args.backend, args.workers, key_file=args.authkey_file,
+                                 batch_seconds=args.batch_seconds)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Transcription server stopped")
+
+
+if __name__ == "__main__":
+    main()
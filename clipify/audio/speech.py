@@ -1,34 +1,101 @@
-import whisper
 from typing import Optional, Dict, Any
 import os
-import sys
+import threading
+from .backends import TranscriptionBackend, get_transcription_backend, load_wav
+from .options import get_transcription_options
+from .service import SERVICE_ENV, TranscriptionClient
 
 
 
 class SpeechToText:
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", backend="whisper", options=None, service=None, **backend_options):
         """
         Initialize speech to text converter
         
         Args:
             model_size (str): Whisper model size ("tiny", "base", "small", "medium", "large")
+            backend: Transcription backend: 'whisper' (openai-whisper, PyTorch), 'faster-whisper'
+                (CTranslate2, int8 on CPU by default) or a TranscriptionBackend instance
+            options: TranscriptionOptions, profile name ("default", "fast", "accurate") or dict
+                of decoding options (language, beam_size, temperature, no-speech threshold, VAD)
+            service: Socket path of a TranscriptionServer to transcribe on instead of loading a
+                model; defaults to the CLIPIFY_TRANSCRIPTION_SOCKET environment variable. Used only
+                if a server answers with the same backend and model size. Its key is read from
+                CLIPIFY_TRANSCRIPTION_AUTHKEY or the server's default key file.
+            **backend_options: Backend-specific options (device, compute_type, cpu_threads, beam_size)
         """
-        # Determine the base path
-        if getattr(sys, 'frozen', False):  # If running as PyInstaller .exe
-            base_path = sys._MEIPASS
-        else:
-            base_path = os.path.dirname(os.path.abspath(__file__))
+        self.model_size = model_size
+        self.backend_name = backend
+        self.backend_options = backend_options
+        self.options = get_transcription_options(options)
+        self.client = None
+        self.backend = None
+        self.model = None
+        self.lock = threading.Lock()
 
-        # Set Whisper’s asset directory
-        whisper.utils.ASSET_DIR = os.path.join(base_path, "whisper/assets")
-        self.model = whisper.load_model(model_size,)
+        address = service or os.environ.get(SERVICE_ENV)
+        if address and not isinstance(backend, TranscriptionBackend):
+            self.client = self.connect(address, backend, model_size)
+        if self.client is None:
+            self.load_backend()
 
-    def convert_to_text(self, audio_path):
+    @staticmethod
+    def connect(address, backend, model_size, authkey=None):
+        """
+        Client of the server at an address if it serves the backend and model, else None
+
+        Args:
+            address: Socket path of the server
+            backend (str): Transcription backend name the server must serve
+            model_size (str): Model size the server must serve
+            authkey (bytes): Shared secret of the server; None reads CLIPIFY_TRANSCRIPTION_AUTHKEY
+                or the server's default key file
+        """
+        try:
+            client = TranscriptionClient(address, authkey)
+        except (ValueError, RuntimeError, OSError) as e:
+            print(f"Cannot authenticate to the transcription server at {address} ({e}); "
+                  f"loading the model locally")
+            return None
+        info = client.info()
+        if info is None:
+            print(f"Transcription server at {address} not available, loading the model locally")
+            return None
+        if info['backend'] != backend or info['model_size'] != model_size:
+            print(f"Transcription server at {address} serves {info['backend']} {info['model_size']}, "
+                  f"not {backend} {model_size}; loading the model locally")
+            return None
+        print(f"Using transcription server at {address} ({info['backend']} {info['model_size']})")
+        return client
+
+    def settings(self):
+        """
+        Backend, model and decoding options that determine a transcript
+
+        Returns:
+            dict: 'backend', 'model_size' and 'options' (without the profile name, which
+                only appears in logs)
+        """
+        backend = self.backend_name if isinstance(self.backend_name, str) else type(self.backend_name).__name__
+        options = self.options.to_dict()
+        options.pop('name', None)
+        return {'backend': backend, 'model_size': self.model_size, 'options': options}
+
+    def load_backend(self):
+        """Load the transcription model in this process"""
+        with self.lock:
+            if self.backend is not None:
+                return
+            self.backend = get_transcription_backend(self.backend_name, self.model_size, **self.backend_options)
+            self.model = getattr(self.backend, 'model', None)
+
+    def convert_to_text(self, audio_path, options=None):
         """
         Convert audio to text with timing information
         
         Args:
             audio_path (str): Path to audio file
+            options: Transcription options for this file; None uses the converter's options
             
         Returns:
             dict: Transcription results including text and word timings
@@ -39,39 +106,62 @@ class SpeechToText:
             if not os.path.exists(audio_path):
                 raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-            # Transcribe audio with word timestamps
-            print("Running Whisper transcription with word timestamps...")
-            result = self.model.transcribe(audio_path, word_timestamps=True)
-            
-            if not result or 'text' not in result:
-                raise Exception("Whisper transcription failed to return valid result")
-            
+            options = get_transcription_options(options or self.options)
+            result = None
+            if self.client is not None:
+                try:
+                    result = self.client.transcribe(audio_path, options)
+                except ConnectionError as e:
+                    print(f"Warning: {e}; loading the model locally")
+                    self.client = None
+            if result is None:
+                self.load_backend()
+                result = self.backend.transcribe(audio_path, options)
             print("Transcription completed successfully")
             
-            # Process word-level timestamps
-            word_timings = []
-            for segment in result['segments']:
-                if 'words' not in segment:
-                    continue
-                    
-                for word_data in segment['words']:
-                    # Check if word_data has the required fields
-                    if isinstance(word_data, dict) and 'word' in word_data and 'start' in word_data and 'end' in word_data:
-                        word_timings.append({
-                            'text': word_data['word'].strip(),
-                            'start': word_data['start'],
-                            'end': word_data['end']
-                        })
-                    else:
-                        print(f"Warning: Skipping malformed word data: {word_data}")
-            
-            if not word_timings:
+            if not result['word_timings']:
                 print("Warning: No valid word timings found in transcription")
             
-            return {
-                'text': result['text'],
-                'word_timings': word_timings
-            }
+            return result
+
+        except Exception as e:
+            print(f"Error converting speech to text: {e}")
+            import traceback
+            print(traceback.format_exc())
+            return None
+
+    def convert_batch(self, audios, options=None):
+        """
+        Convert many short clips to text, packing them into shared 30 second windows
+
+        Much faster than one convert_to_text call per clip for clips well under
+        30 seconds. Use a fixed language in the options when clips share a window.
+
+        Args:
+            audios (list): WAV file paths (e.g. from AudioExtractor) or mono float32
+                sample arrays at 16 kHz (e.g. from AudioExtractor.extract_samples)
+            options: Transcription options; None uses the converter's options
+
+        Returns:
+            list: One {'text', 'word_timings'} dict per clip in input order, timings
+                relative to each clip's start; None if the batch failed
+        """
+        try:
+            print(f"Starting batch transcription of {len(audios)} clips")
+            options = get_transcription_options(options or self.options)
+            results = None
+            if self.client is not None:
+                try:
+                    results = self.client.transcribe_batch(audios, options)
+                except ConnectionError as e:
+                    print(f"Warning: {e}; loading the model locally")
+                    self.client = None
+            if results is None:
+                self.load_backend()
+                samples = [load_wav(audio) if isinstance(audio, str) else audio for audio in audios]
+                results = self.backend.transcribe_batch(samples, options)
+            print("Batch transcription completed successfully")
+            return results
 
         except Exception as e:
             print(f"Error converting speech to text: {e}")
@@ -1,14 +1,19 @@
 from .processor import ContentProcessor
+from .async_processor import AsyncContentProcessor
 from .text_processor import SmartTextProcessor
-from .ai_providers import HyperbolicAI, OpenAIProvider, AnthropicProvider, OllamaProvider
+from .ai_providers import HyperbolicAI, OpenAIProvider, AnthropicProvider, OllamaProvider, FailoverProvider
 from .clipify import Clipify
+from .instrumentation import Instrumentation
 
 __all__ = [
     'ContentProcessor',
+    'AsyncContentProcessor',
     'SmartTextProcessor',
     'HyperbolicAI',
     'OpenAIProvider', 
     'AnthropicProvider',
     'OllamaProvider',
-    'Clipify'
+    'FailoverProvider',
+    'Clipify',
+    'Instrumentation'
 ] 
\ No newline at end of file
@@ -1,19 +1,172 @@
 from abc import ABC, abstractmethod
+from collections import Counter
 import requests
 import time
 import os
+import json
+import random
+import re
+import threading
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .resilience import ResiliencePolicy, ProviderError, check_response, check_status, cancel_scope
+from .tokens import UsageMeter, record_usage, current_meter, use_meter
+
+
+def iter_sse_events(response):
+    """Yield the decoded JSON payload of each server-sent event of a streamed requests response"""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+
+def iter_ndjson(response):
+    """Yield each JSON object of a streamed newline-delimited JSON requests response"""
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            yield json.loads(line)
+
 
 class AIProvider(ABC):
     """Abstract base class for AI providers"""
     
+    # Whether the provider needs an API key to be passed or set in the environment
+    requires_api_key = True
+    
+    # Whether the provider can be asked for a JSON-only answer (json_mode)
+    supports_json_mode = False
+    
+    # Whether requests are billed per token (local and offline providers are free)
+    charges_per_token = True
+    
+    def resilience_key(self):
+        """Identity whose rate limit and circuit breaker are shared across instances"""
+        api_key = getattr(self, 'api_key', None)
+        return f"{type(self).__name__}:{api_key}" if api_key else None
+    
+    def configure_resilience(self, **options):
+        """
+        Set the timeout, backoff, rate limit and circuit breaker options of this provider
+        
+        Args:
+            **options: ResiliencePolicy arguments (timeout, base_delay, max_delay,
+                rate_limit, burst, failure_threshold, recovery_timeout)
+        """
+        options.setdefault('key', self.resilience_key())
+        self.resilience = ResiliencePolicy(**options)
+    
+    def _call(self, method, prompt, retry_count, json_mode):
+        """Run _request or _stream under the resilience policy, dropping JSON mode if the API rejects it"""
+        if getattr(self, 'resilience', None) is None:
+            self.configure_resilience()
+        json_mode = json_mode and self.supports_json_mode
+        try:
+            return self.resilience.call(lambda timeout: method(prompt, timeout, json_mode), retry_count)
+        except ProviderError as e:
+            if not json_mode or e.status_code not in (400, 422):
+                raise
+            print(f"{type(self).__name__} rejected JSON mode ({e}); retrying without it")
+            self.supports_json_mode = False
+            return self.resilience.call(lambda timeout: method(prompt, timeout, False), retry_count)
+    
+    def get_response(self, prompt, retry_count=3, json_mode=False):
+        """
+        Get response from AI provider with caching, timeouts, backoff and a circuit breaker
+        
+        Args:
+            prompt (str): Prompt text
+            retry_count (int): Maximum number of attempts
+            json_mode (bool): Ask for a JSON-only answer where the provider's API supports it
+        """
+        if prompt in self.cache:
+            return self.cache[prompt]
+        
+        result = self._call(self._request, prompt, retry_count, json_mode)
+        self._record_usage(prompt, result.get('usage'), result['choices'][0]['message']['content'])
+        self.cache[prompt] = result
+        return result
+    
+    def _record_usage(self, prompt, usage, content):
+        """Add a request's token usage to this provider's meter and the thread's active meter"""
+        if getattr(self, 'usage', None) is None:
+            self.usage = UsageMeter()
+        record_usage(self, usage, prompt, content)
+    
+    def stream_response(self, prompt, retry_count=3, json_mode=False):
+        """
+        Yield the response text in chunks while the provider is still generating it
+        
+        Failed attempts are retried until the stream is open; an error in the middle
+        of the stream is raised to the caller. The complete response is cached for
+        get_response.
+        
+        Args:
+            prompt (str): Prompt text
+            retry_count (int): Maximum number of attempts to open the stream
+            json_mode (bool): Ask for a JSON-only answer where the provider's API supports it
+        """
+        if prompt in self.cache:
+            yield self.cache[prompt]['choices'][0]['message']['content']
+            return
+        
+        chunks = self._call(self._stream, prompt, retry_count, json_mode)
+        
+        content = []
+        usage = None
+        for chunk in chunks:
+            if isinstance(chunk, dict):
+                usage = chunk['usage']
+            elif chunk:
+                content.append(chunk)
+                yield chunk
+        self._record_usage(prompt, usage, "".join(content))
+        self.cache[prompt] = {"choices": [{"message": {"content": "".join(content)}}], "usage": usage}
+    
+    def _stream(self, prompt, timeout, json_mode=False):
+        """
+        Open a streaming request
+        
+        Providers without streaming support answer with the complete response as a single chunk.
+        
+        Returns:
+            iterator: Text chunks of the response, optionally followed by a
+                {'usage': {'prompt_tokens', 'completion_tokens'}} dict
+        """
+        result = self._request(prompt, timeout, json_mode)
+        chunks = [result['choices'][0]['message']['content']]
+        if result.get('usage'):
+            chunks.append({'usage': result['usage']})
+        return iter(chunks)
+    
     @abstractmethod
-    def get_response(self, prompt, retry_count=3):
-        """Get response from AI provider"""
+    def _request(self, prompt, timeout, json_mode=False):
+        """
+        Send a single request
+        
+        Args:
+            prompt (str): Prompt text
+            timeout (float): Seconds allowed for the request
+            json_mode (bool): Ask for a JSON-only answer (only set when supports_json_mode is true)
+        
+        Returns:
+            dict: Response in the chat completions format ({'choices': [{'message': {'content'}}]}),
+                with 'usage' ({'prompt_tokens', 'completion_tokens'}) when the provider reports it
+        
+        Raises:
+            ProviderError, or the HTTP client's/SDK's own exception, on failure
+        """
         pass
 
 class HyperbolicAI(AIProvider):
     """Hyperbolic AI provider implementation"""
     
+    supports_json_mode = True
+    
     AVAILABLE_MODELS = {
         "deepseek-v3": "deepseek-ai/DeepSeek-V3",
         "deepseek-v2": "deepseek-ai/DeepSeek-V2",
@@ -22,6 +175,7 @@ class HyperbolicAI(AIProvider):
     
     def __init__(self, api_key, model="default", max_tokens=5012, temperature=0.7):
         self.url = "https://api.hyperbolic.xyz/v1/chat/completions"
+        self.api_key = api_key
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}"
@@ -31,39 +185,50 @@ class HyperbolicAI(AIProvider):
         self.temperature = temperature
         self.cache = {}
 
-    def get_response(self, prompt, retry_count=3):
-        """Get response from Hyperbolic AI with retry mechanism and caching"""
-        if prompt in self.cache:
-            return self.cache[prompt]
-            
-        for attempt in range(retry_count):
-            try:
-                data = {
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "model": self.model,
-                    "max_tokens": self.max_tokens,
-                    "temperature": self.temperature,
-                    "top_p": 0.9
+    def _payload(self, prompt, stream=False, json_mode=False):
+        data = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
                 }
-                
-                response = requests.post(self.url, headers=self.headers, json=data)
-                result = response.json()
-                
-                if 'choices' in result:
-                    self.cache[prompt] = result
-                    return result
-                    
-            except Exception as e:
-                if attempt == retry_count - 1:
-                    raise e
-                time.sleep(1)
-                
-        return None
+            ],
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "top_p": 0.9,
+            "stream": stream
+        }
+        if stream:
+            data["stream_options"] = {"include_usage": True}
+        if json_mode:
+            data["response_format"] = {"type": "json_object"}
+        return data
+    
+    def _request(self, prompt, timeout, json_mode=False):
+        """Send a single request to Hyperbolic AI"""
+        response = requests.post(self.url, headers=self.headers, json=self._payload(prompt, json_mode=json_mode),
+                                 timeout=timeout)
+        result = check_response(response)
+        
+        if 'choices' not in result:
+            raise ProviderError(f"Response has no choices: {str(result)[:200]}")
+        return result
+    
+    def _stream(self, prompt, timeout, json_mode=False):
+        """Stream a response from Hyperbolic AI as server-sent events"""
+        response = requests.post(self.url, headers=self.headers,
+                                 json=self._payload(prompt, stream=True, json_mode=json_mode),
+                                 timeout=timeout, stream=True)
+        check_status(response)
+        
+        def chunks():
+            for event in iter_sse_events(response):
+                if event.get('choices'):
+                    yield event['choices'][0].get('delta', {}).get('content') or ""
+                if event.get('usage'):
+                    yield {'usage': event['usage']}
+        return chunks()
 
 class OpenAIProvider(AIProvider):
     """OpenAI provider implementation"""
@@ -75,56 +240,78 @@ class OpenAIProvider(AIProvider):
         "default": "gpt-4"
     }
     
+    # Models accepting response_format={"type": "json_object"}
+    JSON_MODE_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-4o", "gpt-3.5-turbo")
+    
     def __init__(self, api_key, model="default", max_tokens=2048, temperature=0.7):
         try:
             import openai
-            self.openai = openai
-            self.openai.api_key = api_key
+            # Retries are left to the resilience policy
+            self.client = openai.OpenAI(api_key=api_key, max_retries=0)
         except ImportError:
             raise ImportError("OpenAI package not installed. Install with: pip install openai")
+        self.api_key = api_key
+        self.supports_json_mode = self.AVAILABLE_MODELS.get(model, model).startswith(self.JSON_MODE_MODELS)
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.cache = {}
 
-    def get_response(self, prompt, retry_count=3):
-        """Get response from OpenAI with retry mechanism and caching"""
-        if prompt in self.cache:
-            return self.cache[prompt]
-            
-        for attempt in range(retry_count):
-            try:
-                response = self.openai.ChatCompletion.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=self.temperature,
-                    max_tokens=self.max_tokens
-                )
-                
-                # Convert OpenAI response format to match Hyperbolic format
-                result = {
-                    "choices": [{
-                        "message": {
-                            "content": response.choices[0].message.content
-                        }
-                    }]
+    def _options(self, json_mode):
+        return {"response_format": {"type": "json_object"}} if json_mode else {}
+    
+    def _create(self, prompt, timeout, json_mode, **options):
+        """Create a chat completion with the openai>=1.0 client"""
+        return self.client.chat.completions.create(
+            model=self.AVAILABLE_MODELS.get(self.model, self.model),
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            timeout=timeout,
+            **self._options(json_mode),
+            **options
+        )
+    
+    def _request(self, prompt, timeout, json_mode=False):
+        """Send a single request to OpenAI"""
+        response = self._create(prompt, timeout, json_mode)
+        
+        # Convert OpenAI response format to match Hyperbolic format
+        usage = getattr(response, "usage", None)
+        return {
+            "choices": [{
+                "message": {
+                    "content": response.choices[0].message.content
                 }
-                
-                self.cache[prompt] = result
-                return result
-                
-            except Exception as e:
-                if attempt == retry_count - 1:
-                    raise e
-                time.sleep(1)
-                
-        return None
+            }],
+            "usage": {
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens
+            } if usage else None
+        }
+    
+    def _stream(self, prompt, timeout, json_mode=False):
+        """Stream a response from OpenAI as server-sent events"""
+        events = self._create(prompt, timeout, json_mode, stream=True, stream_options={"include_usage": True})
+        
+        def chunks():
+            for chunk in events:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                # The last chunk has no choices, only the usage of the whole request
+                if getattr(chunk, "usage", None):
+                    yield {"usage": {"prompt_tokens": chunk.usage.prompt_tokens,
+                                     "completion_tokens": chunk.usage.completion_tokens}}
+        return chunks()
 
 class AnthropicProvider(AIProvider):
     """Anthropic (Claude) provider implementation"""
     
+    # No native JSON mode; the answer is prefilled with "{" instead
+    supports_json_mode = True
+    
     AVAILABLE_MODELS = {
         "claude-3-opus": "claude-3-opus-20240229",
         "claude-3-sonnet": "claude-3-sonnet-20240229",
@@ -138,49 +325,70 @@ class AnthropicProvider(AIProvider):
             self.client = anthropic.Anthropic(api_key=api_key)
         except ImportError:
             raise ImportError("Anthropic package not installed. Install with: pip install anthropic")
+        self.api_key = api_key
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.cache = {}
 
-    def get_response(self, prompt, retry_count=3):
-        """Get response from Claude with retry mechanism and caching"""
-        if prompt in self.cache:
-            return self.cache[prompt]
-            
-        for attempt in range(retry_count):
-            try:
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                
-                # Convert Anthropic response format to match Hyperbolic format
-                result = {
-                    "choices": [{
-                        "message": {
-                            "content": response.content[0].text
-                        }
-                    }]
+    @staticmethod
+    def _messages(prompt, json_mode):
+        messages = [{"role": "user", "content": prompt}]
+        if json_mode:
+            messages.append({"role": "assistant", "content": "{"})
+        return messages
+    
+    def _request(self, prompt, timeout, json_mode=False):
+        """Send a single request to Claude"""
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            messages=self._messages(prompt, json_mode),
+            timeout=timeout
+        )
+        
+        # Convert Anthropic response format to match Hyperbolic format
+        return {
+            "choices": [{
+                "message": {
+                    "content": ("{" if json_mode else "") + response.content[0].text
                 }
-                
-                self.cache[prompt] = result
-                return result
-                
-            except Exception as e:
-                if attempt == retry_count - 1:
-                    raise e
-                time.sleep(1)
-                
-        return None
+            }],
+            "usage": {
+                "prompt_tokens": response.usage.input_tokens,
+                "completion_tokens": response.usage.output_tokens
+            }
+        }
+    
+    def _stream(self, prompt, timeout, json_mode=False):
+        """Stream a response from Claude as server-sent events"""
+        events = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            messages=self._messages(prompt, json_mode),
+            timeout=timeout,
+            stream=True
+        )
+        
+        def chunks():
+            usage = {"prompt_tokens": 0, "completion_tokens": 0}
+            for event in events:
+                if event.type == "message_start":
+                    usage["prompt_tokens"] = event.message.usage.input_tokens
+                elif event.type == "content_block_delta" and hasattr(event.delta, "text"):
+                    yield event.delta.text
+                elif event.type == "message_delta":
+                    usage["completion_tokens"] = event.usage.output_tokens
+            yield {"usage": usage}
+        return itertools.chain(["{"], chunks()) if json_mode else chunks()
 
 class OllamaProvider(AIProvider):
     """Ollama local AI provider implementation"""
     
+    charges_per_token = False
+    
     AVAILABLE_MODELS = {
         "llama2": "llama2",
         "mistral": "mistral",
@@ -188,6 +396,9 @@ class OllamaProvider(AIProvider):
         "default": "llama2"
     }
     
+    requires_api_key = False
+    supports_json_mode = True
+    
     def __init__(self, api_key, model="default", max_tokens=2048, temperature=0.7):
         """Initialize Ollama provider
         
@@ -199,83 +410,512 @@ class OllamaProvider(AIProvider):
         self.temperature = temperature
         self.cache = {}
 
-    def get_response(self, prompt, retry_count=3):
-        """Get response from Ollama with retry mechanism and caching"""
+    def resilience_key(self):
+        """Requests to the same Ollama server share a circuit breaker"""
+        return f"{type(self).__name__}:{self.url}"
+    
+    def _payload(self, prompt, stream=False, json_mode=False):
+        data = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "stream": stream,
+            "options": {
+                "temperature": self.temperature,
+                "num_predict": self.max_tokens
+            }
+        }
+        if json_mode:
+            data["format"] = "json"
+        return data
+    
+    def _request(self, prompt, timeout, json_mode=False):
+        """Send a single request to the local Ollama server"""
+        response = requests.post(self.url, json=self._payload(prompt, json_mode=json_mode), timeout=timeout)
+        response_json = check_response(response)
+        
+        # Convert Ollama response format to match Hyperbolic format
+        return {
+            "choices": [{
+                "message": {
+                    "content": response_json.get("message", {}).get("content", "")
+                }
+            }],
+            "usage": self._usage(response_json)
+        }
+    
+    @staticmethod
+    def _usage(message):
+        if "eval_count" not in message:
+            return None
+        return {"prompt_tokens": message.get("prompt_eval_count", 0), "completion_tokens": message["eval_count"]}
+    
+    def _stream(self, prompt, timeout, json_mode=False):
+        """Stream a response from the local Ollama server as newline-delimited JSON"""
+        response = requests.post(self.url, json=self._payload(prompt, stream=True, json_mode=json_mode),
+                                 timeout=timeout, stream=True)
+        check_status(response)
+        
+        def chunks():
+            for message in iter_ndjson(response):
+                yield message.get("message", {}).get("content", "")
+                if message.get("done") and self._usage(message):
+                    yield {"usage": self._usage(message)}
+        return chunks()
+
+class MockProvider(AIProvider):
+    """Offline provider answering segmentation prompts from the transcript's own sentences"""
+    
+    charges_per_token = False
+    
+    # Behaviour profiles, selected through the model name
+    PROFILES = {
+        "instant": {'latency': 0.0, 'jitter': 0.0, 'error_rate': 0.0, 'tokens_per_second': None},
+        "realistic": {'latency': 0.8, 'jitter': 0.4, 'error_rate': 0.02, 'tokens_per_second': 60},
+        "flaky": {'latency': 0.3, 'jitter': 0.3, 'error_rate': 0.25, 'tokens_per_second': 120},
+        "slow": {'latency': 3.0, 'jitter': 1.0, 'error_rate': 0.0, 'tokens_per_second': 25},
+    }
+    
+    AVAILABLE_MODELS = {
+        "instant": "instant",
+        "realistic": "realistic",
+        "flaky": "flaky",
+        "slow": "slow",
+        "default": "instant"
+    }
+    
+    requires_api_key = False
+    
+    def __init__(self, api_key=None, model="default", max_tokens=5048, temperature=0.7,
+                 latency=None, jitter=None, error_rate=None, tokens_per_second=None,
+                 target_words=200, retry_delay=0.1, seed=None):
+        """
+        Initialize the mock provider
+        
+        Profile values can be overridden individually.
+        
+        Args:
+            api_key: Ignored
+            model: Behaviour profile: "instant" (default), "realistic", "flaky" or "slow"
+            max_tokens: Responses are truncated to roughly this many tokens, like a real model
+            temperature: Ignored
+            latency (float): Seconds before the first token
+            jitter (float): Random extra latency of up to this many seconds
+            error_rate (float): Probability (0-1) that an attempt fails
+            tokens_per_second (float): Simulated generation speed; None returns at once
+            target_words (int): Words per returned segment, split at sentence boundaries
+            retry_delay (float): Base backoff between failed attempts
+            seed (int): Seed for reproducible latency and failures
+        """
+        profile_name = self.AVAILABLE_MODELS.get(model, model)
+        if profile_name not in self.PROFILES:
+            raise ValueError(f"Unknown mock profile: {model}. Available profiles: {', '.join(self.PROFILES)}")
+        profile = self.PROFILES[profile_name]
+        
+        self.model = profile_name
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.latency = profile['latency'] if latency is None else latency
+        self.jitter = profile['jitter'] if jitter is None else jitter
+        self.error_rate = profile['error_rate'] if error_rate is None else error_rate
+        self.tokens_per_second = profile['tokens_per_second'] if tokens_per_second is None else tokens_per_second
+        self.target_words = target_words
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.cache = {}
+        self.stats = {'requests': 0, 'attempts': 0, 'errors': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        self.configure_resilience(base_delay=retry_delay, max_delay=max(1.0, retry_delay * 10))
+    
+    @staticmethod
+    def estimate_tokens(text):
+        """Rough token count (about four characters per token)"""
+        return max(1, len(text) // 4)
+    
+    def build_segments(self, text):
+        """Group the sentences of a text into segments of about target_words words"""
+        sentences = [sentence for sentence in re.split(r'(?<=[.!?])\s+', text.strip()) if sentence]
+        groups = [[]]
+        words = 0
+        for sentence in sentences:
+            if groups[-1] and words >= self.target_words:
+                groups.append([])
+                words = 0
+            groups[-1].append(sentence)
+            words += len(sentence.split())
+        
+        segments = []
+        for group in groups:
+            content = " ".join(group)
+            tokens = [word.strip('.,!?;:"\'').lower() for word in content.split()]
+            keywords = [word for word, _ in Counter(word for word in tokens if len(word) > 3).most_common(5)]
+            title = " ".join(content.split()[:6]).strip('.,!?;:').title()
+            segments.append({'title': title or "Untitled Segment", 'content': content, 'keywords': keywords})
+        return segments
+    
+    def get_response(self, prompt, retry_count=3, json_mode=False):
+        """Answer a prompt after the simulated latency, failing at the configured rate"""
+        if prompt not in self.cache:
+            with self.lock:
+                self.stats['requests'] += 1
+                self.stats['prompt_tokens'] += self.estimate_tokens(prompt)
+        return super().get_response(prompt, retry_count, json_mode)
+    
+    def stream_response(self, prompt, retry_count=3, json_mode=False):
+        """Stream the answer to a prompt at tokens_per_second"""
+        if prompt not in self.cache:
+            with self.lock:
+                self.stats['requests'] += 1
+                self.stats['prompt_tokens'] += self.estimate_tokens(prompt)
+        return super().stream_response(prompt, retry_count, json_mode)
+    
+    def _start(self, prompt, timeout):
+        """
+        Simulate a request up to its first token
+        
+        Returns:
+            tuple: (content, seconds needed to generate the content, usage)
+        """
+        match = re.search(r'Text to analyze:\s*(.*?)\n\s*Requirements:', prompt, re.DOTALL)
+        text = match.group(1) if match else prompt
+        content = json.dumps({'segments': self.build_segments(text)})
+        completion_tokens = self.estimate_tokens(content)
+        if completion_tokens > self.max_tokens:
+            # Cut off mid-answer as a real model would at its token limit
+            content = content[:self.max_tokens * 4]
+            completion_tokens = self.max_tokens
+        
+        with self.lock:
+            self.stats['attempts'] += 1
+            first_token = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+        generation = completion_tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+        delay = first_token + generation
+        
+        if failed or delay > timeout:
+            with self.lock:
+                self.stats['errors'] += 1
+            if failed:
+                # Fail part-way through the latency, like a dropped connection
+                time.sleep(min(delay / 2, timeout))
+                raise ProviderError("Mock provider error", status_code=503)
+            time.sleep(timeout)
+            raise ProviderError(f"Mock request timed out after {timeout}s")
+        
+        time.sleep(first_token)
+        with self.lock:
+            self.stats['completion_tokens'] += completion_tokens
+        usage = {"prompt_tokens": self.estimate_tokens(prompt), "completion_tokens": completion_tokens}
+        return content, generation, usage
+    
+    def _request(self, prompt, timeout, json_mode=False):
+        """Simulate a single request"""
+        content, generation, usage = self._start(prompt, timeout)
+        time.sleep(generation)
+        return {
+            "choices": [{
+                "message": {
+                    "content": content
+                }
+            }],
+            "usage": usage
+        }
+    
+    def _stream(self, prompt, timeout, json_mode=False):
+        """Simulate a streamed request, producing the content at tokens_per_second"""
+        content, generation, usage = self._start(prompt, timeout)
+        return self._chunks(content, generation, usage)
+    
+    @staticmethod
+    def _chunks(content, generation, usage, size=16):
+        pieces = [content[i:i + size] for i in range(0, len(content), size)]
+        for piece in pieces:
+            time.sleep(generation / len(pieces))
+            yield piece
+        yield {"usage": usage}
+
+def is_valid_segmentation(response):
+    """Whether a chat completions response holds segmentation JSON with a 'segments' list"""
+    try:
+        text = response['choices'][0]['message']['content'].strip()
+    except (KeyError, IndexError, TypeError):
+        return False
+    
+    # Same extraction as SmartTextProcessor.parse_segments
+    match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
+    if match:
+        text = match.group(1)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(data, dict) and isinstance(data.get('segments'), list)
+
+class _HedgeMeter:
+    """Forward usage to a meter until the request it belongs to has lost its hedge"""
+
+    def __init__(self, meter, cancelled):
+        self.meter = meter
+        self.cancelled = cancelled
+
+    def record(self, *args, **kwargs):
+        if not self.cancelled.is_set():
+            self.meter.record(*args, **kwargs)
+
+
+class FailoverProvider(AIProvider):
+    """Route requests across several providers with hedging and failover"""
+    
+    requires_api_key = False
+    
+    def __init__(self, providers, hedge_percentile=0.95, hedge_delay=10.0, min_samples=5,
+                 window=100, validate=is_valid_segmentation, max_workers=None):
+        """
+        Initialize the composite provider
+        
+        Each request goes to the provider with the lowest recent median latency
+        (weighted by its error rate). If no valid answer arrives within that
+        provider's hedge_percentile latency, the same request is also sent to
+        the next provider and the first valid answer wins. Errors and invalid
+        answers fail over to the next provider right away.
+        
+        Once a request is answered, the requests that lost stop retrying, and
+        whatever they still receive is not recorded in the caller's usage meter
+        (the providers' own meters still count it). Call close(), or use the
+        provider as a context manager, to stop its worker threads.
+        
+        Args:
+            providers (list): AIProvider instances, in order of preference
+            hedge_percentile (float): Latency percentile (0-1) after which a hedged request is sent;
+                None disables hedging
+            hedge_delay (float): Hedge threshold until a provider has min_samples latencies;
+                None waits for such a provider to answer or fail
+            min_samples (int): Latencies needed before a provider's own percentile and median are used
+            window (int): Number of recent latencies and outcomes kept per provider
+            validate (callable): Returns whether a response is usable; invalid responses count as errors
+            max_workers (int): Threads for concurrent requests (default: 8 per provider)
+        """
+        if not providers:
+            raise ValueError("FailoverProvider needs at least one provider")
+        
+        self.providers = list(providers)
+        self.names = []
+        for provider in self.providers:
+            name = f"{type(provider).__name__}:{getattr(provider, 'model', 'default')}"
+            if name in self.names:
+                name = f"{name}#{len(self.names)}"
+            self.names.append(name)
+        
+        # Windows must fit the smallest response limit among the providers
+        self.max_tokens = min(getattr(provider, 'max_tokens', None) or 4096 for provider in self.providers)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self.validate = validate
+        self.latencies = [deque(maxlen=window) for _ in self.providers]
+        self.outcomes = [deque(maxlen=window) for _ in self.providers]
+        self.stats = {name: {'requests': 0, 'errors': 0, 'wins': 0, 'hedges': 0} for name in self.names}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or 8 * len(self.providers),
+                                           thread_name_prefix="clipify-ai")
+        self.active = set()
+        self.cache = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Cancel the requests in flight and shut down the worker threads"""
+        with self.lock:
+            active = list(self.active)
+        for cancelled in active:
+            cancelled.set()
+        self.executor.shutdown(wait=False)
+    
+    @staticmethod
+    def percentile(values, percentile):
+        """Nearest-rank percentile of a sequence of numbers"""
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+    
+    def _score(self, index):
+        """Routing score of a provider; lower is better"""
+        breaker = getattr(getattr(self.providers[index], 'resilience', None), 'breaker', None)
+        if breaker is not None and breaker.state == "open":
+            return float('inf')
+        with self.lock:
+            latencies = list(self.latencies[index])
+            outcomes = list(self.outcomes[index])
+        if len(latencies) < self.min_samples:
+            # Unmeasured providers are tried in preference order until they have enough samples
+            return 0.0
+        error_rate = outcomes.count(False) / len(outcomes)
+        return self.percentile(latencies, 0.5) * (1 + 4 * error_rate)
+    
+    def route(self):
+        """Provider indices in the order they should be tried"""
+        return sorted(range(len(self.providers)), key=lambda index: (self._score(index), index))
+    
+    def hedge_threshold(self, index):
+        """Seconds to wait for a provider before sending a hedged request, or None"""
+        if self.hedge_percentile is None:
+            return None
+        with self.lock:
+            latencies = list(self.latencies[index])
+        if len(latencies) < self.min_samples:
+            return self.hedge_delay
+        return self.percentile(latencies, self.hedge_percentile)
+    
+    def _attempt(self, index, prompt, retry_count, json_mode=False, meter=None, cancelled=None):
+        """Call one provider, recording its latency and outcome"""
+        cancelled = cancelled or threading.Event()
+        if meter is not None:
+            meter = _HedgeMeter(meter, cancelled)
+        with use_meter(meter), cancel_scope(cancelled):
+            return self._timed_attempt(index, prompt, retry_count, json_mode, cancelled)
+    
+    def _timed_attempt(self, index, prompt, retry_count, json_mode, cancelled):
+        name = self.names[index]
+        with self.lock:
+            self.stats[name]['requests'] += 1
+        
+        start = time.perf_counter()
+        try:
+            response = self.providers[index].get_response(prompt, retry_count, json_mode)
+            if not self.validate(response):
+                raise ProviderError(f"{name} returned an invalid response")
+            error = None
+        except Exception as e:
+            response, error = None, e
+        elapsed = time.perf_counter() - start
+        
+        if error is not None and cancelled.is_set():
+            # Stopped because another provider won; says nothing about this one
+            return response, error
+        with self.lock:
+            self.outcomes[index].append(error is None)
+            if error is None:
+                self.latencies[index].append(elapsed)
+            else:
+                self.stats[name]['errors'] += 1
+        return response, error
+    
+    def get_response(self, prompt, retry_count=3, json_mode=False):
+        """Get the first valid response from the routed providers"""
         if prompt in self.cache:
             return self.cache[prompt]
+        
+        order = self.route()
+        pending = {}
+        errors = []
+        cancelled = threading.Event()
+        with self.lock:
+            self.active.add(cancelled)
+        
+        def launch():
+            index = order.pop(0)
+            pending[self.executor.submit(self._attempt, index, prompt, retry_count, json_mode,
+                                         current_meter(), cancelled)] = index
+            return self.hedge_threshold(index)
+        
+        try:
+            return self._first_response(prompt, order, pending, errors, launch)
+        finally:
+            # Stop the requests that lost: queued ones never start, running ones stop retrying
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+            with self.lock:
+                self.active.discard(cancelled)
+    
+    def _first_response(self, prompt, order, pending, errors, launch):
+        """Wait for the first valid response, hedging and failing over as needed"""
+        timeout = launch()
+        while pending:
+            done, _ = wait(pending, timeout=timeout if order else None, return_when=FIRST_COMPLETED)
+            if not done:
+                # The running requests are slower than usual: hedge with the next provider
+                index = order[0]
+                with self.lock:
+                    self.stats[self.names[index]]['hedges'] += 1
+                timeout = launch()
+                continue
             
-        for attempt in range(retry_count):
-            try:
-                data = {
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "stream": False,
-                    "options": {
-                        "temperature": self.temperature,
-                        "num_predict": self.max_tokens
-                    }
-                }
-                
-                response = requests.post(self.url, json=data)
-                response_json = response.json()
-                
-                # Convert Ollama response format to match Hyperbolic format
-                result = {
-                    "choices": [{
-                        "message": {
-                            "content": response_json.get("message", {}).get("content", "")
-                        }
-                    }]
-                }
-                
-                self.cache[prompt] = result
-                return result
-                
-            except Exception as e:
-                if attempt == retry_count - 1:
-                    raise e
-                time.sleep(1)
-                
-        return None
+            for future in done:
+                index = pending.pop(future)
+                response, error = future.result()
+                if error is None:
+                    with self.lock:
+                        self.stats[self.names[index]]['wins'] += 1
+                    self.cache[prompt] = response
+                    return response
+                errors.append(f"{self.names[index]}: {error}")
+            
+            # Fail over right away instead of waiting for the hedge threshold
+            if order and not pending:
+                timeout = launch()
+        
+        raise ProviderError(f"All AI providers failed ({'; '.join(errors)})")
+    
+    def stream_response(self, prompt, retry_count=3, json_mode=False):
+        """
+        Yield the routed response as a single chunk
+        
+        Hedging compares complete, validated responses, so the composite does not stream.
+        """
+        yield self.get_response(prompt, retry_count, json_mode)['choices'][0]['message']['content']
+    
+    def _request(self, prompt, timeout, json_mode=False):
+        """Single routed request without retries on the underlying providers"""
+        return self.get_response(prompt, retry_count=1, json_mode=json_mode)
+
+# Provider name -> (class, default max_tokens, default temperature)
+AI_PROVIDERS = {
+    "hyperbolic": (HyperbolicAI, 5012, 0.7),
+    "openai": (OpenAIProvider, 5048, 0.7),
+    "anthropic": (AnthropicProvider, 5048, 0.7),
+    "ollama": (OllamaProvider, 2048, 0.7),
+    "mock": (MockProvider, 5048, 0.7)
+}
 
 def get_ai_provider(
     provider_name: str, 
     api_key: str, 
     model: str = "default",
     max_tokens: int = None,
-    temperature: float = None
+    temperature: float = None,
+    resilience: dict = None
 ) -> AIProvider:
     """
     Factory function to get AI provider instance
     
     Args:
         provider_name: Name of the AI provider
-        api_key: API key for the provider (not needed for Ollama)
+        api_key: API key for the provider (not needed for Ollama or the mock provider)
         model: Model name to use (provider-specific)
         max_tokens: Maximum number of tokens in response (optional)
         temperature: Temperature for response generation (optional)
+        resilience: ResiliencePolicy options (timeout, base_delay, max_delay, rate_limit,
+            burst, failure_threshold, recovery_timeout) (optional)
     """
-    providers = {
-        "hyperbolic": (HyperbolicAI, 5012, 0.7),
-        "openai": (OpenAIProvider, 5048, 0.7),
-        "anthropic": (AnthropicProvider, 5048, 0.7),
-        "ollama": (OllamaProvider, 2048, 0.7)
-    }
-    
-    provider_info = providers.get(provider_name.lower())
+    provider_info = AI_PROVIDERS.get(provider_name.lower())
     if not provider_info:
-        raise ValueError(f"Unknown AI provider: {provider_name}. Available providers: {', '.join(providers.keys())}")
+        raise ValueError(f"Unknown AI provider: {provider_name}. Available providers: {', '.join(AI_PROVIDERS.keys())}")
     
     provider_class, default_max_tokens, default_temp = provider_info
     
-    return provider_class(
+    provider = provider_class(
         api_key, 
         model,
         max_tokens=max_tokens if max_tokens is not None else default_max_tokens,
         temperature=temperature if temperature is not None else default_temp
-    ) 
\ No newline at end of file
+    )
+    if resilience:
+        provider.configure_resilience(**resilience)
+    return provider
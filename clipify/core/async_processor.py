@@ -0,0 +1,163 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .processor import ContentProcessor
+from .instrumentation import span
+
+
+class AsyncContentProcessor(ContentProcessor):
+    """
+    ContentProcessor with asyncio coroutines aprocess_video and aprocess_videos
+
+    The inherited process_video stays synchronous. Use the processor as an
+    async (or plain) context manager, or call close(), to shut down its executors.
+    """
+
+    def __init__(self, ai_provider, transcribe_workers=1, segment_concurrency=4, transcription_backend="whisper",
+                 transcription_options=None):
+        """
+        Initialize with an AI provider instance
+
+        Whisper runs on a small executor of its own, so it never waits behind AI
+        requests. AI requests run on a separate, larger executor because the
+        providers' HTTP clients block. While one video is being segmented, the
+        next one is already transcribing.
+
+        Args:
+            ai_provider: Instance of AIProvider class
+            transcribe_workers (int): Videos transcribed at the same time
+            segment_concurrency (int): AI segmentation requests in flight at the same time
+            transcription_backend: 'whisper', 'faster-whisper' or a TranscriptionBackend instance
+            transcription_options: TranscriptionOptions, profile name or dict of decoding options
+        """
+        super().__init__(ai_provider, transcription_backend, transcription_options)
+        self.transcribe_workers = transcribe_workers
+        self.segment_concurrency = segment_concurrency
+        self.transcribe_executor = ThreadPoolExecutor(max_workers=transcribe_workers,
+                                                      thread_name_prefix="clipify-transcribe")
+        self.segment_executor = ThreadPoolExecutor(max_workers=segment_concurrency,
+                                                   thread_name_prefix="clipify-segment")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _transcribe(self, video_path, instrumentation=None):
+        with span(instrumentation, 'transcribe', video_name=Path(video_path).stem):
+            return self.load_transcript(video_path)
+
+    def _segment(self, job, instrumentation=None):
+        with span(instrumentation, 'segment', video_name=job['video_name']):
+            return self.segment_transcript(job['video_name'], job['transcript_text'], job['word_timings'])
+
+    async def transcribe(self, video_path, instrumentation=None):
+        """Load or create the transcript of a video on the transcription executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.transcribe_executor, self._transcribe, video_path, instrumentation)
+
+    async def segment(self, job, instrumentation=None):
+        """Segment a transcribed job on the AI request executor"""
+        if 'processed' in job:
+            return job['processed']
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.segment_executor, self._segment, job, instrumentation)
+
+    async def aprocess_video(self, video_path, instrumentation=None):
+        """
+        Process video content, checking for existing files
+
+        Args:
+            video_path: Path to the input video file
+            instrumentation: Optional Instrumentation recording 'transcribe' and 'segment' spans
+        """
+        try:
+            job = await self.transcribe(video_path, instrumentation)
+            if not job:
+                return None
+            return await self.segment(job, instrumentation)
+
+        except Exception as e:
+            print(f"Error in aprocess_video: {str(e)}")
+            import traceback
+            print(traceback.format_exc())
+            return None
+
+    async def iter_videos(self, video_paths, queue_size=2, instrumentation=None):
+        """
+        Process several videos, yielding each one as soon as it is segmented
+
+        Transcription runs in video order; segmentation starts on each transcript
+        as soon as it is ready, with up to segment_concurrency requests at once.
+
+        Args:
+            video_paths: List of paths to input video files
+            queue_size: Maximum number of transcripts waiting for segmentation
+            instrumentation: Optional Instrumentation recording 'transcribe' and 'segment' spans
+
+        Yields:
+            tuple: (video path, processed content or None on failure), in completion order
+        """
+        transcripts = asyncio.Queue(maxsize=queue_size)
+        results = asyncio.Queue()
+        paths = list(video_paths)
+        next_path = iter(paths)
+
+        async def transcriber():
+            for video_path in next_path:
+                try:
+                    job = await self.transcribe(video_path, instrumentation)
+                except Exception as e:
+                    print(f"Error transcribing {video_path}: {str(e)}")
+                    job = None
+                await transcripts.put((video_path, job))
+
+        async def segmenter():
+            while True:
+                video_path, job = await transcripts.get()
+                try:
+                    processed = await self.segment(job, instrumentation) if job else None
+                except Exception as e:
+                    print(f"Error segmenting {video_path}: {str(e)}")
+                    processed = None
+                await results.put((video_path, processed))
+
+        # Transcribers share one path iterator, so every video is transcribed once
+        tasks = [asyncio.ensure_future(transcriber()) for _ in range(self.transcribe_workers)]
+        tasks += [asyncio.ensure_future(segmenter()) for _ in range(self.segment_concurrency)]
+        try:
+            for _ in paths:
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def aprocess_videos(self, video_paths, queue_size=2, instrumentation=None):
+        """
+        Process several videos, overlapping transcription with AI segmentation
+
+        Args:
+            video_paths: List of paths to input video files
+            queue_size: Maximum number of transcripts waiting for segmentation
+            instrumentation: Optional Instrumentation recording 'transcribe' and 'segment' spans
+
+        Returns:
+            dict: Mapping of video path to processed content (None on failure)
+        """
+        results = {video_path: None for video_path in video_paths}
+        async for video_path, processed in self.iter_videos(video_paths, queue_size, instrumentation):
+            results[video_path] = processed
+        return results
+
+    def close(self):
+        """Shut down the transcription and AI request executors"""
+        self.transcribe_executor.shutdown(wait=False)
+        self.segment_executor.shutdown(wait=False)
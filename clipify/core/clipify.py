@@ -1,10 +1,16 @@
 from pathlib import Path
 import os
+import time
 from .processor import ContentProcessor
-from .ai_providers import get_ai_provider
+from .ai_providers import get_ai_provider, AI_PROVIDERS
+from .pipeline import Pipeline, Stage
+from .manifest import JobManifest
+from .instrumentation import Instrumentation, span, file_size, count_frames
 from ..video.cutter import VideoCutter
 from ..video.processor import VideoProcessor
 from ..video.converter import VideoConverter
+from ..video.converterStretch import VideoConverterStretch
+from ..video.encoding import get_encoding_profile
 
 class Clipify:
     """Main interface for Clipify video processing"""
@@ -17,53 +23,125 @@ class Clipify:
         convert_to_mobile=True,
         add_captions=True,
         mobile_ratio="9:16",
+        crop_mode="blur",
         caption_options=None,
         max_tokens=5048,
-        temperature=0.7
+        temperature=0.7,
+        pipeline_workers=None,
+        queue_size=4,
+        resume=True,
+        progress_callback=None,
+        encoding_profile=None,
+        boundary_tolerance=None,
+        snap_to_shots=False,
+        tracer=None,
+        profile_stages=None,
+        resilience=None,
+        ai_provider=None,
+        stream_segments=False,
+        transcription_backend="whisper",
+        transcription_options=None
     ):
         """
         Initialize Clipify with processing options
         
         Args:
-            provider_name: Name of AI provider ('hyperbolic', 'openai', or 'anthropic')
+            provider_name: Name of AI provider ('hyperbolic', 'openai', 'anthropic', 'ollama',
+                or 'mock' for offline testing; the model name selects the mock's latency profile)
             api_key: API key for the chosen provider
             model: Model name to use (provider-specific, defaults to provider's default model)
             convert_to_mobile: Whether to convert segments to mobile format
             add_captions: Whether to add captions to segments
-            mobile_ratio: Aspect ratio for mobile conversion
-            caption_options: Dictionary of caption styling options (font_size, font_color, etc.)
+            mobile_ratio: Aspect ratio for mobile conversion, or a list of ratios to render
+                every segment in several formats from a single decode
+            crop_mode: How segments are reframed for mobile: 'blur' keeps the full frame on a
+                blurred background, 'center' crops the middle of the frame, and 'smart' crops
+                around the detected speaker, following them per shot
+            caption_options: Dictionary of caption styling options (font_size, font_color, etc.);
+                set 'renderer' to 'sprite' to caption from the segment's word timings with cached sprites,
+                or to 'ffmpeg' to burn them with libass in the same ffmpeg pass as the mobile reframe
             max_tokens: Maximum number of tokens in response (optional)
             temperature: Temperature for response generation (optional)
+            pipeline_workers: Dictionary of worker counts per stage ('cut', 'mobile', 'caption');
+                stages default to one worker each
+            queue_size: Maximum number of segments waiting in front of each stage
+            resume: Whether to reuse segment outputs recorded in the video's job manifest
+                when their inputs and options are unchanged
+            progress_callback: Optional callable receiving structured progress event dicts
+                ('event', 'timestamp' and event-specific fields); called from worker threads
+            encoding_profile: Encoder settings for written videos: a profile name ('default',
+                'draft-fast', 'publish-quality'), a dict of settings or an EncodingProfile
+            boundary_tolerance: Seconds a segment's start/end may move outward to land in a
+                quiet gap of the audio (None disables boundary refinement)
+            snap_to_shots: Also move boundaries onto a nearby shot cut of the source video
+                (requires boundary_tolerance)
+            tracer: Optional OpenTelemetry tracer receiving a span per stage and segment
+            profile_stages: Stage names ('transcribe', 'segment', 'cut', 'mobile', 'caption', ...)
+                to run under cProfile, or True for all; stats are written to processed_content/profiles
+            resilience: Dictionary of AI request options: 'timeout' per attempt, 'base_delay' and
+                'max_delay' of the jittered backoff, 'rate_limit' (requests per second per API key)
+                and 'burst', and the circuit breaker's 'failure_threshold' and 'recovery_timeout'
+            ai_provider: Ready-made AIProvider instance, such as a FailoverProvider wrapping several
+                providers; when given, provider_name, api_key, model, max_tokens, temperature and
+                resilience are ignored
+            stream_segments: Stream the AI provider's response and start cutting and rendering
+                each segment as soon as the provider has finished writing it
+            transcription_backend: Speech-to-text engine: 'whisper' (openai-whisper), 'faster-whisper'
+                (CTranslate2 int8, much faster on CPU) or a TranscriptionBackend instance
+            transcription_options: Decoding options: a profile name ("default", "fast", "accurate"),
+                a dict such as {"language": "en", "beam_size": 1, "temperature": 0.0, "vad": True},
+                or a TranscriptionOptions instance
         """
         # Store configuration
         self.convert_to_mobile = convert_to_mobile
         self.add_captions = add_captions
         self.mobile_ratio = mobile_ratio
+        self.mobile_ratios = [mobile_ratio] if isinstance(mobile_ratio, str) else list(mobile_ratio)
+        if crop_mode not in ("blur", "center", "smart"):
+            raise ValueError(f"Unsupported crop mode: {crop_mode}. Use 'blur', 'center' or 'smart'")
+        self.crop_mode = crop_mode
+        self.pipeline_workers = pipeline_workers or {}
+        self.queue_size = queue_size
+        self.resume = resume
+        self.progress_callback = progress_callback
+        self.encoding_profile = get_encoding_profile(encoding_profile)
+        self.boundary_tolerance = boundary_tolerance
+        self.snap_to_shots = snap_to_shots
+        self.tracer = tracer
+        self.profile_stages = profile_stages
+        self.stream_segments = stream_segments
+        self.caption_options = caption_options or {}
         
         # Get API key from environment if not provided
-        if api_key is None:
+        provider_info = AI_PROVIDERS.get(provider_name.lower())
+        if api_key is None and ai_provider is None:
             api_key = os.getenv(f"{provider_name.upper()}_API_KEY")
-            if not api_key:
+            if not api_key and (provider_info is None or provider_info[0].requires_api_key):
                 raise ValueError(
                     f"No API key provided for {provider_name}. "
                     f"Set {provider_name.upper()}_API_KEY environment variable or pass api_key parameter."
                 )
         
         # Initialize AI provider and processor
-        self.ai_provider = get_ai_provider(provider_name, api_key, model, max_tokens, temperature)
-        self.processor = ContentProcessor(self.ai_provider)
+        self.ai_provider = ai_provider or get_ai_provider(provider_name, api_key, model, max_tokens,
+                                                          temperature, resilience=resilience)
+        self.processor = ContentProcessor(self.ai_provider, transcription_backend, transcription_options)
         
         # Initialize video components only if needed
-        self.video_cutter = VideoCutter()
+        self.video_cutter = VideoCutter(encoding_profile=self.encoding_profile)
         
         # Initialize VideoProcessor with custom caption options if provided
         if add_captions:
-            caption_options = caption_options or {}
-            self.video_processor = VideoProcessor(**caption_options)
+            self.video_processor = VideoProcessor(**dict({'encoding_profile': self.encoding_profile}, **self.caption_options))
         else:
             self.video_processor = None
         
-        self.video_converter = VideoConverter() if convert_to_mobile else None
+        if not convert_to_mobile:
+            self.video_converter = None
+        elif crop_mode == "blur":
+            self.video_converter = VideoConverter(encoding_profile=self.encoding_profile)
+        else:
+            self.video_converter = VideoConverterStretch(encoding_profile=self.encoding_profile, crop_mode=crop_mode)
         
         # Ensure directories exist
         self.ensure_directories()
@@ -75,16 +153,368 @@ class Clipify:
         for directory in base_directories:
             Path(directory).mkdir(parents=True, exist_ok=True)
     
-    def process_video(self, video_path):
+    def build_pipeline(self):
+        """Build the per-segment pipeline: cut, then mobile conversion and captions if enabled"""
+        def stage(name, func, requires, provides):
+            def run_stage(job):
+                fields = {'stage': name, 'video_name': job['video_name'], 'segment_number': job['segment_number']}
+                self._emit('stage_started', **fields)
+                with span(job.get('instrumentation'), name, video_name=job['video_name'],
+                          segment_number=job['segment_number']) as record:
+                    result = func(job)
+                if result is not None:
+                    self._measure_stage(name, result, record)
+                self._emit('stage_failed' if result is None else 'stage_completed', **fields)
+                return result
+            
+            return Stage(
+                name,
+                run_stage,
+                requires=requires,
+                provides=provides,
+                workers=self.pipeline_workers.get(name, 1),
+                queue_size=self.queue_size
+            )
+        
+        stages = []
+        if self.boundary_tolerance:
+            stages.append(stage('refine', self._refine_segment, ('segment',), ('start_time', 'end_time')))
+        
+        cut_inputs = ('segment', 'video_path')
+        if self.boundary_tolerance:
+            cut_inputs += ('start_time', 'end_time')
+        stages.append(stage('cut', self._cut_segment, cut_inputs, ('cut_video',)))
+        current_output = 'cut_video'
+        
+        if self.convert_to_mobile:
+            stages.append(stage('mobile', self._convert_segment, (current_output,), ('mobile_video',)))
+            current_output = 'mobile_video'
+        
+        if self.add_captions:
+            stages.append(stage('caption', self._caption_segment, (current_output,), ('captioned_video',)))
+        
+        return Pipeline(stages)
+    
+    def _is_fresh(self, job, stage, output_path, *inputs):
         """
-        Process a video file with the configured options
+        Hash a stage's inputs for a job and check the manifest for a finished output
         
-        Args:
-            video_path: Path to the input video file
+        The hash is chained through the job, so changing an upstream stage also
+        invalidates every stage after it.
+        """
+        job['input_hash'] = JobManifest.compute_hash(job.get('input_hash'), stage, output_path, *inputs)
+        manifest = job.get('manifest')
+        if manifest and manifest.is_fresh(job['segment_number'], stage, job['input_hash'], output_path):
+            print(f"Reusing {stage} output for segment #{job['segment_number']}: {output_path}")
+            job.setdefault('reused_stages', set()).add(stage)
+            return True
+        return False
+    
+    def _record(self, job, stage, output_path):
+        """Record a finished stage output in the job manifest"""
+        manifest = job.get('manifest')
+        if manifest:
+            manifest.record(job['segment_number'], stage, job['input_hash'], output_path)
+    
+    @staticmethod
+    def _stage_files(name, job):
+        """Files a finished stage read and wrote, as (inputs, outputs)"""
+        info = job.get('segment_info', {})
+        if name == 'cut':
+            return [], [job['cut_video']]
+        if name == 'mobile':
+            if job.get('reframe_ratios'):
+                return [], []
+            return [job['cut_video']], list(job['mobile_videos'].values())
+        if name == 'caption':
+            inputs = [job['cut_video']] if job.get('reframe_ratios') else \
+                list((job.get('mobile_videos') or {None: job['cut_video']}).values())
+            for key in ('captioned_video', 'caption_file'):
+                if key in info:
+                    return inputs, list(info.get(f"{key}s", {}).values()) or [info[key]]
+        return [], []
+    
+    def _measure_stage(self, name, job, record):
+        """Add the bytes and frames a stage processed to its instrumentation record"""
+        if job.get('instrumentation') is None:
+            return
+        inputs, outputs = self._stage_files(name, job)
+        record['reused'] = name in job.get('reused_stages', ())
+        record['bytes_read'] = file_size(inputs)
+        record['bytes_written'] = file_size(outputs)
+        if outputs and not record['reused']:
+            record['frames'] = count_frames(outputs)
+    
+    def _segment_path(self, job, directory, suffix, ratio=None):
+        """Output path for a segment file; ratio-specific when several ratios are rendered"""
+        name = f"segment_{job['segment_number']}_{job['clean_title']}_{suffix}"
+        if ratio and len(self.mobile_ratios) > 1:
+            name += "_" + ratio.replace(":", "x")
+        return str(job['video_dirs'][directory] / f"{name}.mp4")
+    
+    def _refine_segment(self, job):
+        """Pipeline stage: snap segment boundaries to quiet gaps and, optionally, shot cuts"""
+        segment = job['segment']
+        if segment.get('start_time') is None or segment.get('end_time') is None:
+            # Let the cut stage report the missing timing information
+            return job
         
-        Returns:
-            dict: Processing results including paths to generated files
+        start_time = float(segment['start_time'])
+        end_time = float(segment['end_time'])
+        
+        envelope = job.get('audio_envelope')
+        if envelope is not None:
+            start_time, end_time = envelope.refine(start_time, end_time, self.boundary_tolerance)
+        
+        scene_index = job.get('scene_index')
+        if scene_index is not None and self.snap_to_shots:
+            # Only move outward onto a cut so speech is never clipped
+            cut = scene_index.nearest_cut(start_time, self.boundary_tolerance)
+            if cut is not None and cut <= start_time:
+                start_time = cut
+            cut = scene_index.nearest_cut(end_time, self.boundary_tolerance)
+            if cut is not None and cut >= end_time:
+                end_time = cut
+        
+        job['start_time'] = start_time
+        job['end_time'] = end_time
+        return job
+    
+    def _cut_segment(self, job):
+        """Pipeline stage: cut a segment out of the source video"""
+        i = job['segment_number']
+        segment = job['segment']
+        try:
+            if 'start_time' not in segment or 'end_time' not in segment:
+                print(f"Warning: Segment {i} missing timing information")
+                return None
+            
+            # Clean the title for filename
+            clean_title = "".join(c for c in segment['title'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            job['clean_title'] = clean_title
+            job['segment_info'] = {
+                'title': segment['title'],
+                'segment_number': i
+            }
+            
+            # Cut the segment
+            output_segment = str(job['video_dirs']['segmented'] / f"segment_{i}_{clean_title}.mp4")
+            start_time = float(job.get('start_time', segment['start_time']))
+            end_time = float(job.get('end_time', segment['end_time']))
+            job['segment_info']['start_time'] = start_time
+            job['segment_info']['end_time'] = end_time
+            
+            if not self._is_fresh(job, 'cut', output_segment,
+                                  JobManifest.file_fingerprint(job['video_path']), start_time, end_time,
+                                  self.encoding_profile.to_dict()):
+                cut_result = self.video_cutter.cut_video(
+                    job['video_path'],
+                    output_segment,
+                    start_time,
+                    end_time
+                )
+                
+                if not cut_result:
+                    print(f"Failed to cut segment #{i}")
+                    return None
+                
+                print(f"Successfully cut segment #{i}: {segment['title']}")
+                self._record(job, 'cut', output_segment)
+            
+            job['segment_info']['cut_video'] = output_segment
+            job['cut_video'] = output_segment
+            return job
+        
+        except Exception as e:
+            print(f"Error processing segment #{i}: {str(e)}")
+            return None
+    
+    def _convert_segment(self, job):
+        """Pipeline stage: convert a cut segment to mobile format"""
+        if self._fuses_reframe(job):
+            # The ffmpeg caption pass reframes the cut itself; no intermediate is written
+            job['reframe_ratios'] = self.mobile_ratios
+            return job
+        return self._convert_to_mobile(job)
+    
+    def _convert_to_mobile(self, job):
+        """Write the mobile format files of a cut segment"""
+        i = job['segment_number']
+        try:
+            print(f"Converting segment #{i} to mobile format...")
+            mobile_segments = {
+                ratio: self._segment_path(job, 'segmented', 'mobile', ratio)
+                for ratio in self.mobile_ratios
+            }
+            output_paths = list(mobile_segments.values())
+            
+            if not self._is_fresh(job, 'mobile', output_paths, self.mobile_ratios,
+                                  self.encoding_profile.to_dict(), self.crop_mode):
+                if self.crop_mode != "blur":
+                    shot_boundaries = self._shot_boundaries(job)
+                    conversion_result = all(
+                        self.video_converter.convert_to_mobile(job['cut_video'], path, target_ratio=ratio,
+                                                               shot_boundaries=shot_boundaries)
+                        for ratio, path in mobile_segments.items()
+                    )
+                elif len(mobile_segments) == 1:
+                    conversion_result = self.video_converter.convert_to_mobile(
+                        job['cut_video'],
+                        output_paths[0],
+                        target_ratio=self.mobile_ratios[0]
+                    )
+                else:
+                    # Decode the segment once for all requested ratios
+                    conversion_result = self.video_converter.convert_to_mobile_multi(
+                        job['cut_video'],
+                        mobile_segments
+                    )
+                
+                if not conversion_result:
+                    print(f"Failed to convert segment #{i} to mobile format")
+                    return None
+                
+                print(f"Successfully converted segment #{i} to mobile format")
+                self._record(job, 'mobile', output_paths)
+            
+            job['segment_info']['mobile_video'] = output_paths[0]
+            job['mobile_video'] = output_paths[0]
+            if len(mobile_segments) > 1:
+                job['segment_info']['mobile_videos'] = mobile_segments
+            job['mobile_videos'] = mobile_segments
+            return job
+        
+        except Exception as e:
+            print(f"Error processing segment #{i}: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _shot_boundaries(job):
+        """Shot cuts inside a segment's cut, relative to its start, or None if the source was not indexed"""
+        scene_index = job.get('scene_index')
+        if scene_index is None:
+            return None
+        start_time = job['segment_info'].get('start_time', 0.0)
+        end_time = job['segment_info'].get('end_time', scene_index.duration)
+        return scene_index.boundaries_between(start_time, end_time)
+    
+    def _fuses_reframe(self, job):
+        """Whether a segment's mobile conversion can run inside its ffmpeg caption pass"""
+        return bool(
+            self.video_converter
+            and self.crop_mode == "blur"
+            and self.video_processor
+            and self.video_processor.renderer == "ffmpeg"
+            and self.video_processor.caption_mode == "burn"
+            and job['segment'].get('word_timings')
+        )
+    
+    @staticmethod
+    def _relative_word_timings(job):
+        """Word timings of a segment, shifted to start at the beginning of its cut"""
+        start_time = job['segment_info'].get('start_time', 0.0)
+        return [
+            {
+                'text': word['text'],
+                'start': max(0.0, word['start'] - start_time),
+                'end': max(0.0, word['end'] - start_time)
+            }
+            for word in job['segment'].get('word_timings') or []
+        ]
+    
+    def _caption_segment(self, job):
+        """
+        Pipeline stage: add captions to the latest output of a segment
+        
+        When the caption pass also reframes the cut, its outputs are the segment's
+        mobile videos. If that pass fails, the cut is converted to mobile format
+        without captions instead, so the segment keeps its mobile outputs.
         """
+        i = job['segment_number']
+        upstream_hash = job.get('input_hash')
+        process_result = False
+        try:
+            print(f"Processing segment #{i} with captions...")
+            # Caption every mobile format, or the cut itself when not converting
+            reframe_ratios = job.get('reframe_ratios')
+            if reframe_ratios:
+                current_outputs = {ratio: job['cut_video'] for ratio in reframe_ratios}
+            else:
+                current_outputs = job.get('mobile_videos') or {None: job['cut_video']}
+            captioned = {
+                ratio: self._segment_path(job, 'processed', 'captioned', ratio)
+                for ratio in current_outputs
+            }
+            # Caption export modes write a sidecar file instead of a video
+            written = {
+                ratio: self.video_processor.get_output_path(path)
+                for ratio, path in captioned.items()
+            }
+            output_paths = list(written.values())
+            
+            if self._is_fresh(job, 'caption', output_paths, self.caption_options,
+                              self.encoding_profile.to_dict(), reframe_ratios):
+                process_result = True
+            else:
+                word_timings = self._relative_word_timings(job)
+                results = []
+                for ratio, output_processed in captioned.items():
+                    video_filter, output_size = None, None
+                    if reframe_ratios:
+                        video_filter, output_size = self.video_converter.build_filtergraph(
+                            current_outputs[ratio], ratio
+                        )
+                    results.append(self.video_processor.process_video(
+                        input_video=current_outputs[ratio],
+                        output_video=output_processed,
+                        word_timings=word_timings,
+                        video_filter=video_filter,
+                        output_size=output_size
+                    ))
+                process_result = all(results)
+                if process_result:
+                    print(f"Successfully added captions to segment #{i}")
+                    self._record(job, 'caption', output_paths)
+            
+            if process_result:
+                key = 'caption_file' if written != captioned else 'captioned_video'
+                job['segment_info'][key] = output_paths[0]
+                job[key] = output_paths[0]
+                if len(written) > 1:
+                    job['segment_info'][f"{key}s"] = written
+                if reframe_ratios:
+                    job['segment_info']['mobile_video'] = output_paths[0]
+                    job['mobile_video'] = output_paths[0]
+                    if len(written) > 1:
+                        job['segment_info']['mobile_videos'] = written
+                    job['mobile_videos'] = written
+            else:
+                print(f"Failed to add captions to segment #{i}")
+        
+        except Exception as e:
+            print(f"Error processing segment #{i}: {str(e)}")
+        
+        if not process_result and job.get('reframe_ratios'):
+            print(f"Converting segment #{i} to mobile format without captions instead")
+            del job['reframe_ratios']
+            # Hash the mobile stage as if it had run on its own
+            job['input_hash'] = upstream_hash
+            return self._convert_to_mobile(job)
+        
+        # Captioning failures keep the segment in the results
+        return job
+    
+    def _emit(self, event, **fields):
+        """Send a structured progress event to the progress callback, if any"""
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback({'event': event, 'timestamp': time.time(), **fields})
+        except Exception as e:
+            print(f"Error in progress callback: {str(e)}")
+    
+    def _prepare_video(self, video_path, instrumentation=None):
+        """Create output directories and run content processing for a video"""
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
         
@@ -101,88 +531,150 @@ class Clipify:
         for dir_path in video_dirs.values():
             dir_path.mkdir(parents=True, exist_ok=True)
         
+        self._emit('video_started', video_path=video_path, video_name=video_name)
+        
         # Process video content
-        result = self.processor.process_video(video_path)
+        if self.stream_segments:
+            result = self.processor.stream_video(video_path, instrumentation=instrumentation)
+        else:
+            result = self.processor.process_video(video_path, instrumentation=instrumentation)
         
         if not result:
             print("No content was processed")
-            return None
+            self._emit('video_failed', video_path=video_path, video_name=video_name)
+            return video_name, video_dirs, None
+        
+        if self.stream_segments:
+            print(f"Streaming segments of {result['video_name']} from the AI provider")
+            result['segments'] = self._announce_segments(video_path, video_name, result)
+            return video_name, video_dirs, result
         
         print("\n=== Processing Results ===\n")
         print(f"Video: {result['video_name']}")
         print(f"Total Segments: {result['metadata']['total_segments']}")
         
-        processed_segments = []
+        self._emit(
+            'content_processed',
+            video_path=video_path,
+            video_name=video_name,
+            total_segments=result['metadata']['total_segments']
+        )
+        return video_name, video_dirs, result
+    
+    def _announce_segments(self, video_path, video_name, result):
+        """Pass streamed segments through, emitting 'content_processed' once all have arrived"""
+        yield from result['segments']
+        print(f"Total Segments: {result['metadata'].get('total_segments', 0)}")
+        self._emit(
+            'content_processed',
+            video_path=video_path,
+            video_name=video_name,
+            total_segments=result['metadata'].get('total_segments', 0)
+        )
+    
+    def _new_instrumentation(self):
+        """Create the instrumentation recording one video's run"""
+        return Instrumentation(
+            tracer=self.tracer,
+            profile_stages=self.profile_stages,
+            profile_dir=os.path.join(self.processor.processed_dir, "profiles")
+        )
+    
+    def _iter_segments(self, video_path, video_name, video_dirs, segments, instrumentation=None):
+        """Run segments through the pipeline, yielding each segment_info as it finishes"""
         print("\n=== Processing Video Segments ===\n")
         
-        for i, segment in enumerate(result['segments'], 1):
-            try:
-                if 'start_time' not in segment or 'end_time' not in segment:
-                    print(f"Warning: Segment {i} missing timing information")
-                    continue
-                
-                # Clean the title for filename
-                clean_title = "".join(c for c in segment['title'] if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                
-                segment_info = {
-                    'title': segment['title'],
-                    'segment_number': i
-                }
-                
-                # Cut the segment
-                output_segment = str(video_dirs['segmented'] / f"segment_{i}_{clean_title}.mp4")
-                cut_result = self.video_cutter.cut_video(
-                    video_path,
-                    output_segment,
-                    float(segment['start_time']),
-                    float(segment['end_time'])
-                )
-                
-                if cut_result:
-                    print(f"Successfully cut segment #{i}: {segment['title']}")
-                    segment_info['cut_video'] = output_segment
-                    current_output = output_segment
-                    
-                    # Convert to mobile if requested
-                    if self.convert_to_mobile:
-                        print(f"Converting segment #{i} to mobile format...")
-                        mobile_segment = str(video_dirs['segmented'] / f"segment_{i}_{clean_title}_mobile.mp4")
-                        conversion_result = self.video_converter.convert_to_mobile(
-                            output_segment,
-                            mobile_segment,
-                            target_ratio=self.mobile_ratio
-                        )
-                        
-                        if conversion_result:
-                            print(f"Successfully converted segment #{i} to mobile format")
-                            segment_info['mobile_video'] = mobile_segment
-                            current_output = mobile_segment
-                        else:
-                            print(f"Failed to convert segment #{i} to mobile format")
-                            continue
-                    
-                    # Add captions if requested
-                    if self.add_captions:
-                        print(f"Processing segment #{i} with captions...")
-                        output_processed = str(video_dirs['processed'] / f"segment_{i}_{clean_title}_captioned.mp4")
-                        process_result = self.video_processor.process_video(
-                            input_video=current_output,
-                            output_video=output_processed
-                        )
-                        
-                        if process_result:
-                            print(f"Successfully added captions to segment #{i}")
-                            segment_info['captioned_video'] = output_processed
-                        else:
-                            print(f"Failed to add captions to segment #{i}")
-                    
-                    processed_segments.append(segment_info)
-                else:
-                    print(f"Failed to cut segment #{i}")
-                
-            except Exception as e:
-                print(f"Error processing segment #{i}: {str(e)}")
-                continue
+        manifest = None
+        if self.resume:
+            manifest = JobManifest(Path(self.processor.processed_dir) / f"{video_name}_manifest.json")
+        
+        # Analyse the source once for every segment's boundary refinement
+        audio_envelope = None
+        scene_index = None
+        if self.boundary_tolerance:
+            with span(instrumentation, 'audio_envelope', video_name=video_name):
+                audio_envelope = self.processor.get_audio_envelope(video_path)
+        # Smart crop follows the speaker per shot, so it reuses the same shot index
+        if (self.boundary_tolerance and self.snap_to_shots) or (self.convert_to_mobile and self.crop_mode == "smart"):
+            with span(instrumentation, 'scene_index', video_name=video_name):
+                scene_index = self.processor.get_scene_index(video_path)
+        
+        jobs = (
+            {
+                'segment_number': i,
+                'segment': segment,
+                'video_path': video_path,
+                'video_name': video_name,
+                'video_dirs': video_dirs,
+                'manifest': manifest,
+                'audio_envelope': audio_envelope,
+                'scene_index': scene_index,
+                'instrumentation': instrumentation
+            }
+            for i, segment in enumerate(segments, 1)
+        )
+        
+        completed = 0
+        for job in self.build_pipeline().run(jobs, priority=lambda job: job['segment_number']):
+            completed += 1
+            self._emit(
+                'segment_completed',
+                video_name=video_name,
+                segment_number=job['segment_number'],
+                segment_info=job['segment_info']
+            )
+            yield job['segment_info']
+        
+        self._emit(
+            'video_completed',
+            video_path=video_path,
+            video_name=video_name,
+            completed_segments=completed,
+            timings=instrumentation.report() if instrumentation else None
+        )
+    
+    def iter_process_video(self, video_path):
+        """
+        Process a video file, yielding each segment as soon as it is finished
+        
+        Segments are yielded in completion order while later segments are still
+        being rendered. Progress events are sent to ``progress_callback``; the
+        'video_completed' event carries the timing report.
+        
+        Args:
+            video_path: Path to the input video file
+        
+        Yields:
+            dict: segment_info for each successfully processed segment
+        """
+        instrumentation = self._new_instrumentation()
+        video_name, video_dirs, result = self._prepare_video(video_path, instrumentation)
+        if not result:
+            return
+        
+        yield from self._iter_segments(video_path, video_name, video_dirs, result['segments'], instrumentation)
+    
+    def process_video(self, video_path):
+        """
+        Process a video file with the configured options
+        
+        Args:
+            video_path: Path to the input video file
+        
+        Returns:
+            dict: Processing results including paths to generated files and a
+                'timings' report of wall time, CPU time, peak RSS, frames per second
+                and bytes per stage and segment
+        """
+        instrumentation = self._new_instrumentation()
+        video_name, video_dirs, result = self._prepare_video(video_path, instrumentation)
+        if not result:
+            return None
+        
+        processed_segments = list(
+            self._iter_segments(video_path, video_name, video_dirs, result['segments'], instrumentation)
+        )
+        processed_segments.sort(key=lambda info: info['segment_number'])
         
         return {
             'video_path': video_path,
@@ -192,5 +684,6 @@ class Clipify:
                 'processed': str(video_dirs['processed'])
             },
             'segments': processed_segments,
-            'metadata': result['metadata']
-        } 
\ No newline at end of file
+            'metadata': result['metadata'],
+            'timings': instrumentation.report()
+        }
@@ -0,0 +1,190 @@
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb():
+    """Peak resident set size of the process so far, in megabytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def _children_cpu_time():
+    """CPU time of finished child processes such as ffmpeg, in seconds"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def file_size(paths):
+    """Total size in bytes of the existing files among paths"""
+    return sum(os.path.getsize(path) for path in paths if path and os.path.isfile(path))
+
+
+def count_frames(paths):
+    """Total number of video frames in the existing video files among paths"""
+    frames = 0
+    for path in paths:
+        if not path or not os.path.isfile(path):
+            continue
+        try:
+            frames += ffmpeg_parse_infos(path).get('video_nframes') or 0
+        except Exception:
+            # Not a video, e.g. a sidecar caption file
+            continue
+    return frames
+
+
+class Instrumentation:
+    """Collect timing spans for stages and segments of a processing run"""
+
+    def __init__(self, tracer=None, profile_stages=None, profile_dir=os.path.join("processed_content", "profiles")):
+        """
+        Initialize the instrumentation
+
+        Args:
+            tracer: Optional OpenTelemetry tracer (anything with start_as_current_span);
+                every span is mirrored to it with its measurements as attributes
+            profile_stages: Stage names to run under cProfile, or True for every stage
+            profile_dir (str): Directory for the .prof files written for profiled stages
+        """
+        self.tracer = tracer
+        self.profile_stages = profile_stages
+        self.profile_dir = profile_dir
+        self.spans = []
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def should_profile(self, name):
+        """Whether a stage runs under cProfile"""
+        if self.profile_stages is True:
+            return True
+        return bool(self.profile_stages) and name in self.profile_stages
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Measure a block of work
+
+        The yielded record can be filled in by the caller, during or after the
+        span, with 'frames', 'bytes_read' and 'bytes_written'; the report derives
+        fps from 'frames'.
+
+        CPU time counts the calling thread plus child processes (ffmpeg) that
+        finished during the span; with concurrent stages the child share is
+        attributed to whichever span observes it.
+
+        Args:
+            name (str): Stage or step name
+            **attributes: Extra fields such as video_name and segment_number
+        """
+        record = {'name': name, **attributes}
+        tracer_span = self.tracer.start_as_current_span(name) if self.tracer else nullcontext()
+        profiler = cProfile.Profile() if self.should_profile(name) else None
+
+        with tracer_span as otel_span:
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            children_start = _children_cpu_time()
+            if profiler:
+                try:
+                    profiler.enable()
+                except ValueError as e:
+                    # Only one profiler can be active at a time on newer Pythons
+                    print(f"Warning: Not profiling {name}: {e}")
+                    profiler = None
+            try:
+                yield record
+            except Exception as e:
+                record['error'] = str(e)
+                raise
+            finally:
+                if profiler:
+                    profiler.disable()
+                record['start'] = wall_start - self.started
+                record['wall_time'] = time.perf_counter() - wall_start
+                record['cpu_time'] = time.thread_time() - cpu_start
+                record['child_cpu_time'] = _children_cpu_time() - children_start
+                record['peak_rss_mb'] = _peak_rss_mb()
+                if profiler:
+                    record['profile'] = self._dump_profile(profiler, record)
+
+                if otel_span is not None:
+                    for key, value in record.items():
+                        if isinstance(value, (str, bool, int, float)):
+                            otel_span.set_attribute(f"clipify.{key}", value)
+
+                with self.lock:
+                    self.spans.append(record)
+
+    def _dump_profile(self, profiler, record):
+        """Write a stage's cProfile stats, readable with pstats or snakeviz"""
+        try:
+            Path(self.profile_dir).mkdir(parents=True, exist_ok=True)
+            parts = [record['name'], record.get('video_name'), record.get('segment_number')]
+            profile_path = os.path.join(
+                self.profile_dir,
+                "_".join(str(part) for part in parts if part is not None) + ".prof"
+            )
+            profiler.dump_stats(profile_path)
+            return profile_path
+        except Exception as e:
+            print(f"Error saving profile: {e}")
+            return None
+
+    def report(self):
+        """
+        Summarize the recorded spans
+
+        Returns:
+            dict: 'total_wall_time', 'peak_rss_mb', per-stage totals under 'stages'
+                and every individual span under 'spans'
+        """
+        with self.lock:
+            spans = sorted(self.spans, key=lambda record: record['start'])
+
+        stages = {}
+        for record in spans:
+            if record.get('frames') and record['wall_time'] > 0:
+                record['fps'] = record['frames'] / record['wall_time']
+            totals = stages.setdefault(record['name'], {
+                'count': 0, 'errors': 0, 'wall_time': 0.0, 'cpu_time': 0.0, 'child_cpu_time': 0.0,
+                'frames': 0, 'bytes_read': 0, 'bytes_written': 0
+            })
+            totals['count'] += 1
+            totals['errors'] += 1 if 'error' in record else 0
+            for key in ('wall_time', 'cpu_time', 'child_cpu_time', 'frames', 'bytes_read', 'bytes_written'):
+                totals[key] += record.get(key) or 0
+
+        for totals in stages.values():
+            totals['mean_wall_time'] = totals['wall_time'] / totals['count']
+            if totals['frames'] and totals['wall_time'] > 0:
+                totals['fps'] = totals['frames'] / totals['wall_time']
+
+        return {
+            'total_wall_time': time.perf_counter() - self.started,
+            'peak_rss_mb': _peak_rss_mb(),
+            'stages': stages,
+            'spans': spans
+        }
+
+
+def span(instrumentation, name, **attributes):
+    """Span of an optional Instrumentation; a no-op record when instrumentation is None"""
+    if instrumentation is None:
+        return nullcontext({})
+    return instrumentation.span(name, **attributes)
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class JobManifest:
+    """Per-video record of finished stage outputs, used to resume interrupted jobs"""
+
+    def __init__(self, manifest_path):
+        """
+        Initialize the manifest, loading any existing entries
+
+        Args:
+            manifest_path (str): Path of the JSON manifest file
+        """
+        self.manifest_path = str(manifest_path)
+        self.lock = threading.Lock()
+        self.data = {'segments': {}}
+
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                    self.data = json.load(file)
+                self.data.setdefault('segments', {})
+            except Exception as e:
+                print(f"Error reading job manifest, starting fresh: {e}")
+
+    @staticmethod
+    def compute_hash(*parts):
+        """Hash stage inputs and options into a stable hex digest"""
+        payload = json.dumps(parts, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def file_fingerprint(path):
+        """Cheap identity of a file's contents: path, size and modification time"""
+        stat = os.stat(path)
+        return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+    def is_fresh(self, segment_number, stage, input_hash, output_path):
+        """
+        Check whether a stage output exists and was produced from the same inputs
+        
+        Args:
+            output_path: Output file path, or a list of paths for multi-output stages
+        """
+        with self.lock:
+            entry = self.data['segments'].get(str(segment_number), {}).get(stage)
+        output_paths = output_path if isinstance(output_path, list) else [output_path]
+        return (
+            entry is not None
+            and entry.get('hash') == input_hash
+            and entry.get('output') == output_path
+            and all(os.path.exists(path) for path in output_paths)
+        )
+
+    def record(self, segment_number, stage, input_hash, output_path):
+        """Record a finished stage output and persist the manifest"""
+        with self.lock:
+            segment = self.data['segments'].setdefault(str(segment_number), {})
+            segment[stage] = {'hash': input_hash, 'output': output_path}
+            self._save()
+
+    def _save(self):
+        """Write the manifest atomically so a crash never leaves it half-written"""
+        temp_path = f"{self.manifest_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.data, file, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except Exception as e:
+            print(f"Error saving job manifest: {e}")
@@ -0,0 +1,207 @@
+import itertools
+import queue
+import threading
+
+
+# Sentinel placed on a stage queue once every upstream worker has finished
+_STOP = object()
+
+
+class Stage:
+    """A single step of a processing pipeline"""
+
+    def __init__(self, name, func, requires=(), provides=(), workers=1, queue_size=4):
+        """
+        Initialize a pipeline stage
+
+        Args:
+            name (str): Unique stage name
+            func (callable): Called with the job dict; returns the (updated) job to
+                pass downstream, or None to drop the job
+            requires (tuple): Job keys this stage reads
+            provides (tuple): Job keys this stage writes
+            workers (int): Number of worker threads running this stage
+            queue_size (int): Maximum number of jobs waiting for this stage;
+                upstream stages block when it is full (backpressure)
+        """
+        if workers < 1:
+            raise ValueError(f"Stage '{name}' needs at least one worker")
+        if queue_size < 1:
+            raise ValueError(f"Stage '{name}' needs a queue size of at least 1")
+
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.provides = tuple(provides)
+        self.workers = workers
+        self.queue_size = queue_size
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, requires={self.requires}, provides={self.provides})"
+
+
+class Pipeline:
+    """Run jobs through a chain of stages with per-stage worker pools and bounded queues"""
+
+    def __init__(self, stages, poll_interval=0.1):
+        """
+        Initialize the pipeline
+
+        Stages run as a linear chain: every job passes through every stage, one
+        after another. The order of the chain is derived from the keys each stage
+        requires and provides, so stages may be declared in any order; keys not
+        provided by any stage must be present on the source jobs. Independent
+        stages are not run side by side (no fan-out or fan-in); parallelism comes
+        from several jobs being in different stages at once and from each
+        stage's workers.
+
+        Args:
+            stages (list): List of Stage instances
+            poll_interval (float): Seconds between cancellation checks while blocked
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+
+        self.stages = self._order_stages(stages)
+        self.poll_interval = poll_interval
+
+    @staticmethod
+    def _order_stages(stages):
+        """Topologically sort stages by their required and provided keys into a chain"""
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names: {names}")
+
+        providers = {}
+        for stage in stages:
+            for key in stage.provides:
+                if key in providers:
+                    raise ValueError(
+                        f"Key '{key}' is provided by both '{providers[key].name}' and '{stage.name}'"
+                    )
+                providers[key] = stage
+
+        dependencies = {
+            stage.name: {providers[key].name for key in stage.requires
+                         if key in providers and providers[key] is not stage}
+            for stage in stages
+        }
+
+        ordered = []
+        remaining = list(stages)
+        while remaining:
+            ready = [stage for stage in remaining
+                     if dependencies[stage.name].issubset(s.name for s in ordered)]
+            if not ready:
+                raise ValueError(f"Stage dependencies contain a cycle: {remaining}")
+            # Keep the declared order among stages that are ready together
+            ordered.append(ready[0])
+            remaining.remove(ready[0])
+
+        return ordered
+
+    def run(self, jobs, priority=None):
+        """
+        Run jobs through all stages
+
+        Jobs are fed from a background thread, so ``jobs`` may be a lazy iterator
+        whose items arrive over time; downstream stages start on the first job as
+        soon as it is available.
+
+        Args:
+            jobs: Iterable of job dicts
+            priority (callable): Optional function returning a sort key for a job;
+                lower keys are processed first when several jobs are waiting
+
+        Yields:
+            dict: Each job that made it through every stage, in completion order
+        """
+        cancelled = threading.Event()
+        sequence = itertools.count()
+        queues = [queue.PriorityQueue(maxsize=stage.queue_size) for stage in self.stages]
+        results = queue.Queue()
+        errors = []
+
+        def put(target, job):
+            key = priority(job) if priority else 0
+            entry = (0, key, next(sequence), job)
+            while not cancelled.is_set():
+                try:
+                    target.put(entry, timeout=self.poll_interval)
+                    return
+                except queue.Full:
+                    continue
+
+        def put_stop(target):
+            # Stop entries sort after every job already queued
+            target.put((1, 0, next(sequence), _STOP))
+
+        def feed():
+            try:
+                for job in jobs:
+                    if cancelled.is_set():
+                        break
+                    put(queues[0], job)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    put_stop(queues[0])
+
+        def work(index, finished):
+            stage = self.stages[index]
+            source = queues[index]
+            while True:
+                entry = source.get()
+                job = entry[-1]
+                if job is _STOP:
+                    break
+                if cancelled.is_set():
+                    continue
+                try:
+                    job = stage.func(job)
+                except Exception as e:
+                    print(f"Error in pipeline stage '{stage.name}': {str(e)}")
+                    job = None
+                if job is None:
+                    continue
+                if index + 1 < len(self.stages):
+                    put(queues[index + 1], job)
+                else:
+                    results.put(job)
+
+            with finished['lock']:
+                finished['count'] += 1
+                last_worker = finished['count'] == stage.workers
+            if last_worker:
+                if index + 1 < len(self.stages):
+                    for _ in range(self.stages[index + 1].workers):
+                        put_stop(queues[index + 1])
+                else:
+                    results.put(_STOP)
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for index, stage in enumerate(self.stages):
+            finished = {'count': 0, 'lock': threading.Lock()}
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=work,
+                    args=(index, finished),
+                    name=f"clipify-{stage.name}-{worker}",
+                    daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                job = results.get()
+                if job is _STOP:
+                    break
+                yield job
+        finally:
+            cancelled.set()
+
+        if errors:
+            raise errors[0]
@@ -1,21 +1,27 @@
 import os
 import json
 from .text_processor import SmartTextProcessor
+from .instrumentation import span
+from .tokens import track_usage
 from pathlib import Path
 from ..audio.extractor import AudioExtractor
 from ..audio.speech import SpeechToText
+from ..audio.envelope import AudioEnvelope
 from ..video.cutter import VideoCutter
 from ..video.processor import VideoProcessor
 from ..video.converter import VideoConverter
+from ..video.scene_index import SceneIndex
 
 
 class ContentProcessor:
-    def __init__(self, ai_provider):
+    def __init__(self, ai_provider, transcription_backend="whisper", transcription_options=None):
         """
         Initialize with an AI provider instance
         
         Args:
             ai_provider: Instance of AIProvider class
+            transcription_backend: 'whisper', 'faster-whisper' or a TranscriptionBackend instance
+            transcription_options: TranscriptionOptions, profile name or dict of decoding options
         """
         # Initialize components
         self.processor = SmartTextProcessor(ai_provider)
@@ -23,7 +29,7 @@ class ContentProcessor:
         self.video_converter = VideoConverter()
         self.video_cutter = VideoCutter()
         self.audio_extractor = AudioExtractor()
-        self.speech_to_text = SpeechToText()
+        self.speech_to_text = SpeechToText(backend=transcription_backend, options=transcription_options)
         
 
         
@@ -46,6 +52,27 @@ class ContentProcessor:
         base_name = Path(video_name).stem
         return os.path.join(self.processed_dir, f"{base_name}_processed.json")
     
+    def get_scene_index(self, video_path):
+        """Get the shot boundary and keyframe index of a video, stored next to its transcript"""
+        try:
+            return SceneIndex.load_or_build(video_path, cache_dir=self.transcripts_dir)
+        except Exception as e:
+            print(f"Error building scene index: {e}")
+            return None
+    
+    def get_audio_envelope(self, video_path):
+        """Get the RMS envelope of a video's audio, extracting the audio first if needed"""
+        try:
+            audio_path = os.path.splitext(video_path)[0] + '.wav'
+            if not os.path.exists(audio_path):
+                audio_path = self.audio_extractor.extract_audio(video_path)
+            if not audio_path:
+                return None
+            return AudioEnvelope.from_wav(audio_path)
+        except Exception as e:
+            print(f"Error computing audio envelope: {e}")
+            return None
+    
     def read_transcript(self, transcript_path):
         """Read transcript from file"""
         try:
@@ -86,7 +113,7 @@ class ContentProcessor:
             # Use video name without directory for saving transcript
             video_name = Path(video_path).stem
             transcript_path = self.get_transcript_path(video_name)
-            timing_path = os.path.join(self.transcripts_dir, f"{video_name}_timings.json")
+            timing_path = self.get_timing_path(video_name)
             
             try:
                 os.makedirs(os.path.dirname(transcript_path), exist_ok=True)
@@ -97,11 +124,12 @@ class ContentProcessor:
                     f.write(transcript_text)
                 print(f"Transcript saved to: {transcript_path}")
                 
-                # Save word timings
+                # Save word timings, with the settings that produced them
                 with open(timing_path, 'w', encoding='utf-8') as f:
                     json.dump({
                         'transcript': transcript_text,
-                        'word_timings': result['word_timings']
+                        'word_timings': result['word_timings'],
+                        'transcription': self.speech_to_text.settings()
                     }, f, indent=2)
                 print(f"Word timings saved to: {timing_path}")
                 
@@ -114,83 +142,213 @@ class ContentProcessor:
             print("Failed to convert speech to text")
             return None
     
-    def process_video(self, video_path):
-        """Process video content, checking for existing files"""
+    def get_timing_path(self, video_name):
+        """Get the path for word timings file"""
+        return os.path.join(self.transcripts_dir, f"{video_name}_timings.json")
+    
+    def is_transcript_current(self, timing_path):
+        """
+        Whether a cached transcript was made with the current backend, model and options
+        
+        Transcripts saved without their settings (by older versions, or written by
+        hand) are reused as before.
+        """
         try:
-            self.ensure_directories()
-            
-            # Get base name without directory and extension
-            video_name = Path(video_path).stem
+            with open(timing_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f).get('transcription')
+        except Exception:
+            return True
+        # Round-trip through JSON so tuples compare equal to the saved lists
+        return saved is None or saved == json.loads(json.dumps(self.speech_to_text.settings()))
+    
+    def load_transcript(self, video_path):
+        """
+        Load cached results for a video, transcribing it if needed
+        
+        Cached results made with other transcription settings are discarded and
+        the video is transcribed again.
+        
+        Returns:
+            dict: Job with 'video_name' and either 'processed' (cached processed
+                content) or 'transcript_text' and 'word_timings'; None on failure
+        """
+        self.ensure_directories()
+        
+        # Get base name without directory and extension
+        video_name = Path(video_path).stem
+        
+        transcript_path = self.get_transcript_path(video_name)
+        processed_path = self.get_processed_path(video_name)
+        timing_path = self.get_timing_path(video_name)
+        
+        current = not os.path.exists(timing_path) or self.is_transcript_current(timing_path)
+        if not current:
+            print(f"Existing transcript for {video_name} was made with other transcription settings")
+            # Content segmented from the old transcript is stale too
+            if os.path.exists(processed_path):
+                os.remove(processed_path)
+        
+        # Check if already processed
+        if os.path.exists(processed_path):
+            print(f"Found existing processed content for {video_name}")
+            try:
+                with open(processed_path, 'r', encoding='utf-8') as file:
+                    return {'video_name': video_name, 'processed': json.load(file)}
+            except Exception as e:
+                print(f"Error reading existing processed content: {e}")
+        
+        # Check for existing transcript
+        if current and os.path.exists(transcript_path):
+            print(f"Found existing transcript for {video_name}")
+            transcript_text = self.read_transcript(transcript_path)
+        else:
+            if current:
+                print(f"No transcript found for {video_name}")
+            print("Attempting to create transcript from video...")
+            # Pass the full video path for transcription
+            transcript_text = self.extract_and_transcribe(video_path)
+        
+        if not transcript_text:
+            return None
+        
+        # Read word timings if available
+        word_timings = None
+        if os.path.exists(timing_path):
+            with open(timing_path, 'r', encoding='utf-8') as f:
+                word_timings = json.load(f)
+        
+        return {
+            'video_name': video_name,
+            'transcript_text': transcript_text,
+            'word_timings': word_timings
+        }
+    
+    @staticmethod
+    def build_processed_content(video_name, segments, word_timings=None, usage=None):
+        """Wrap segments (which include timing data) with metadata about the source and AI usage"""
+        processed_content = {
+            'video_name': video_name,
+            'segments': segments,
+            'metadata': {
+                'total_segments': len(segments),
+                'total_characters': sum(len(seg['content']) for seg in segments),
+                'has_timing_data': word_timings is not None
+            }
+        }
+        if usage is not None:
+            processed_content['metadata']['ai_usage'] = usage
+        return processed_content
+    
+    @staticmethod
+    def print_usage(usage):
+        """Print the token usage and cost of a video's AI requests"""
+        cost = f"${usage['cost']:.4f}" if not usage['unpriced_requests'] else "unknown cost"
+        estimated = " (estimated)" if usage['estimated_requests'] else ""
+        print(f"AI usage: {usage['requests']} requests, {usage['prompt_tokens']} prompt + "
+              f"{usage['completion_tokens']} completion tokens{estimated}, {cost}")
+    
+    def segment_transcript(self, video_name, transcript_text, word_timings=None):
+        """Segment a transcript by theme and save the processed content"""
+        try:
+            # Use segment_by_theme instead of create_shorts
+            with track_usage() as usage:
+                segments = self.processor.segment_by_theme(transcript_text, word_timings)
             
-            transcript_path = self.get_transcript_path(video_name)
-            processed_path = self.get_processed_path(video_name)
-            timing_path = os.path.join('transcripts', f"{video_name}_timings.json")
+            if not segments:
+                print("Error: No segments were created")
+                return None
             
-            # Check if already processed
-            if os.path.exists(processed_path):
-                print(f"Found existing processed content for {video_name}")
-                try:
-                    with open(processed_path, 'r', encoding='utf-8') as file:
-                        return json.load(file)
-                except Exception as e:
-                    print(f"Error reading existing processed content: {e}")
+            # Add metadata about the source
+            processed_content = self.build_processed_content(video_name, segments['segments'], word_timings,
+                                                             usage.report())
+            self.print_usage(processed_content['metadata']['ai_usage'])
             
-            # Check for existing transcript
-            if os.path.exists(transcript_path):
-                print(f"Found existing transcript for {video_name}")
-                transcript_text = self.read_transcript(transcript_path)
-            else:
-                print(f"No transcript found for {video_name}")
-                print("Attempting to create transcript from video...")
-                # Pass the full video path for transcription
-                transcript_text = self.extract_and_transcribe(video_path)
+            # Save the processed content
+            self.save_processed_content(video_name, processed_content)
             
-            if transcript_text:
-                # Process the transcript into segments
-                try:
-                    
-                    # Read word timings if available
-                    word_timings = None
-                    if os.path.exists(timing_path):
-                        with open(timing_path, 'r', encoding='utf-8') as f:
-                            word_timings = json.load(f)
-                    
-                    # Use segment_by_theme instead of create_shorts
-                    segments = self.processor.segment_by_theme(transcript_text, word_timings)
-                    
-                    if not segments:
-                        print("Error: No segments were created")
-                        return None
-                    
-                    # Add metadata about the source
-                    processed_content = {
-                        'video_name': video_name,
-                        'segments': segments['segments'],  # Note: segments now includes timing data
-                        'metadata': {
-                            'total_segments': len(segments['segments']),
-                            'total_characters': sum(len(seg['content']) for seg in segments['segments']),
-                            'has_timing_data': word_timings is not None
-                        }
-                    }
-                    
-                    # Save the processed content
-                    self.save_processed_content(video_name, processed_content)
-                    
-                    return processed_content
-                    
-                except Exception as e:
-                    print(f"Error processing transcript: {str(e)}")
-                    import traceback
-                    print(traceback.format_exc())
-                    return None
+            return processed_content
             
+        except Exception as e:
+            print(f"Error processing transcript: {str(e)}")
+            import traceback
+            print(traceback.format_exc())
             return None
+    
+    def process_video(self, video_path, instrumentation=None):
+        """
+        Process video content, checking for existing files
+        
+        Args:
+            video_path: Path to the input video file
+            instrumentation: Optional Instrumentation recording 'transcribe' and 'segment' spans
+        """
+        try:
+            video_name = Path(video_path).stem
+            with span(instrumentation, 'transcribe', video_name=video_name):
+                job = self.load_transcript(video_path)
+            if not job:
+                return None
+            if 'processed' in job:
+                return job['processed']
+            
+            with span(instrumentation, 'segment', video_name=video_name):
+                return self.segment_transcript(job['video_name'], job['transcript_text'], job['word_timings'])
             
         except Exception as e:
             print(f"Error in process_video: {str(e)}")
             import traceback
             print(traceback.format_exc())
             return None
+    
+    def stream_video(self, video_path, instrumentation=None):
+        """
+        Process video content, streaming segments from the AI provider
+        
+        Transcription (or loading the cached results) happens before this returns;
+        segmentation happens while the returned segments are consumed, so the
+        first segment can be rendered while the AI provider is still writing
+        the rest.
+        
+        Args:
+            video_path: Path to the input video file
+            instrumentation: Optional Instrumentation recording 'transcribe' and 'segment' spans
+        
+        Returns:
+            dict: Processed content whose 'segments' is an iterator of segments; its
+                'metadata' is filled in, and the content saved, once the iterator is
+                exhausted. None on failure
+        """
+        try:
+            video_name = Path(video_path).stem
+            with span(instrumentation, 'transcribe', video_name=video_name):
+                job = self.load_transcript(video_path)
+            if not job:
+                return None
+            if 'processed' in job:
+                return dict(job['processed'], segments=iter(job['processed']['segments']))
+        except Exception as e:
+            print(f"Error in stream_video: {str(e)}")
+            import traceback
+            print(traceback.format_exc())
+            return None
+        
+        result = {'video_name': video_name, 'segments': None, 'metadata': {}}
+        
+        def segments():
+            received = []
+            with span(instrumentation, 'segment', video_name=video_name), track_usage() as usage:
+                for segment in self.processor.iter_segment_by_theme(job['transcript_text'], job['word_timings']):
+                    received.append(segment)
+                    yield segment
+            
+            processed_content = self.build_processed_content(video_name, received, job['word_timings'],
+                                                             usage.report())
+            self.print_usage(processed_content['metadata']['ai_usage'])
+            result['metadata'].update(processed_content['metadata'])
+            self.save_processed_content(video_name, processed_content)
+        
+        result['segments'] = segments()
+        return result
 
 def ensure_video_directories():
     """Ensure video processing directories exist"""
@@ -0,0 +1,352 @@
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+
+class ProviderError(Exception):
+    """A failed AI provider request"""
+
+    def __init__(self, message, status_code=None, retry_after=None, retryable=True):
+        """
+        Args:
+            message (str): Error description
+            status_code (int): HTTP status of the response, if any
+            retry_after (float): Seconds the provider asked us to wait, if any
+            retryable (bool): Whether repeating the request may succeed
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+class CircuitOpenError(ProviderError):
+    """Raised without calling the provider while its circuit breaker is open"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message, retry_after=retry_after, retryable=False)
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable_status(status_code):
+    """Rate limiting, timeouts and server errors are worth retrying; other 4xx are not"""
+    return status_code in (408, 409, 425, 429) or status_code >= 500
+
+
+def check_status(response):
+    """
+    Raise a ProviderError for a requests response with a non-2xx status
+
+    Does not read the body of successful responses, so it can be used on streams.
+    """
+    if response.status_code >= 400:
+        raise ProviderError(
+            f"HTTP {response.status_code}: {response.text[:200]}",
+            status_code=response.status_code,
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            retryable=is_retryable_status(response.status_code)
+        )
+
+
+def check_response(response):
+    """
+    Check the HTTP status of a requests response before parsing its JSON body
+
+    Returns:
+        dict: The decoded JSON body
+
+    Raises:
+        ProviderError: On a non-2xx status or a body that is not JSON
+    """
+    check_status(response)
+    try:
+        return response.json()
+    except ValueError:
+        raise ProviderError(f"Invalid JSON response: {response.text[:200]}")
+
+
+def as_provider_error(error):
+    """
+    Convert an exception from requests or a provider SDK into a ProviderError
+
+    SDK errors (OpenAI, Anthropic) expose the HTTP status and response headers
+    under a few different names, which are all checked here.
+    """
+    if isinstance(error, ProviderError):
+        return error
+
+    status_code = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    response = getattr(error, "response", None)
+    if status_code is None and response is not None:
+        status_code = getattr(response, "status_code", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    retry_after = parse_retry_after(headers.get("Retry-After") if hasattr(headers, "get") else None)
+
+    retryable = True if status_code is None else is_retryable_status(status_code)
+    return ProviderError(str(error) or type(error).__name__, status_code, retry_after, retryable)
+
+
+# Cancellation event of the request running on the current thread, see cancel_scope
+_active = threading.local()
+
+
+def current_cancel_event():
+    """The cancellation event active on this thread, or None"""
+    return getattr(_active, 'cancel_event', None)
+
+
+@contextmanager
+def cancel_scope(event):
+    """Stop the retries of requests made on this thread once an event is set, e.g. a lost hedge"""
+    previous = current_cancel_event()
+    _active.cancel_event = event
+    try:
+        yield event
+    finally:
+        _active.cancel_event = previous
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the request rate"""
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Maximum burst size (default: one second of tokens, at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Take tokens, waiting for the bucket to refill if needed
+
+        Args:
+            tokens (float): Tokens to take
+            timeout (float): Maximum seconds to wait; None waits as long as needed
+
+        Returns:
+            bool: True if the tokens were taken, False if the wait would exceed the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Stop calling a failing provider for a while instead of queueing more doomed requests"""
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            recovery_timeout (float): Seconds the circuit stays open before one trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Current state: closed, open or half_open"""
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a request may be sent now"""
+        with self.lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self.trial_running:
+                self.trial_running = True
+                return
+            retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError("Circuit breaker is open; provider is failing", retry_after=retry_after)
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+# Rate limiters and circuit breakers shared by every provider instance using the same key and settings
+_shared_limiters = {}
+_shared_breakers = {}
+_shared_lock = threading.Lock()
+
+
+def _shared(registry, key, factory):
+    with _shared_lock:
+        if key not in registry:
+            registry[key] = factory()
+        return registry[key]
+
+
+class ResiliencePolicy:
+    """Timeouts, backoff with jitter, rate limiting and a circuit breaker around provider requests"""
+
+    def __init__(self,
+                 timeout: float = 60.0,
+                 base_delay: float = 0.5,
+                 max_delay: float = 20.0,
+                 rate_limit: float = None,
+                 burst: float = None,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0,
+                 key: str = None):
+        """
+        Initialize the policy
+
+        Args:
+            timeout (float): Seconds allowed per request attempt
+            base_delay (float): Backoff before the first retry; doubles with every attempt
+            max_delay (float): Longest single wait, including Retry-After and rate limiting;
+                a provider asking for longer fails the request instead of blocking the worker
+            rate_limit (float): Requests per second allowed for the key; None disables limiting
+            burst (float): Requests allowed at once before rate limiting applies
+            failure_threshold (int): Consecutive failures that open the circuit breaker
+            recovery_timeout (float): Seconds before an open circuit lets a trial request through
+            key (str): Identity, such as provider name and API key, whose rate limiter and
+                circuit breaker are shared across instances with the same settings; None keeps
+                them per policy
+        """
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.random = random.Random()
+
+        if key is not None:
+            # Never keep raw API keys around as dictionary keys
+            key = hashlib.sha256(key.encode('utf-8')).hexdigest()
+            # Policies with other settings for the same key get limiters and breakers of their own
+            self.limiter = _shared(_shared_limiters, (key, rate_limit, burst),
+                                   lambda: TokenBucket(rate_limit, burst)) if rate_limit else None
+            self.breaker = _shared(_shared_breakers, (key, failure_threshold, recovery_timeout),
+                                   lambda: CircuitBreaker(failure_threshold, recovery_timeout))
+        else:
+            self.limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+            self.breaker = CircuitBreaker(failure_threshold, recovery_timeout)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retrying after a failed attempt (0-based)
+
+        Uses "full jitter" so workers that failed together do not retry together.
+
+        Returns:
+            float: Delay in seconds, or None if the provider asked to wait longer than max_delay
+        """
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            return retry_after + self.random.uniform(0, self.base_delay)
+        return self.random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, request, retry_count=3):
+        """
+        Run a request with retries
+
+        Args:
+            request (callable): Takes the per-attempt timeout in seconds and returns the result
+            retry_count (int): Maximum number of attempts
+
+        Returns:
+            The request's result
+
+        Raises:
+            ProviderError: When every attempt failed, the error is not retryable,
+                the circuit breaker is open, or the request was cancelled (see cancel_scope)
+        """
+        cancelled = current_cancel_event()
+        for attempt in range(retry_count):
+            if cancelled is not None and cancelled.is_set():
+                raise ProviderError("Request cancelled", retryable=False)
+            self.breaker.before_call()
+            if self.limiter and not self.limiter.acquire(timeout=self.max_delay):
+                raise ProviderError("Rate limit wait exceeded max_delay", retryable=False)
+
+            try:
+                result = request(self.timeout)
+                self.breaker.record_success()
+                return result
+
+            except Exception as e:
+                error = as_provider_error(e)
+                if error.retryable:
+                    self.breaker.record_failure()
+                else:
+                    # The provider answered; it is the request that was rejected
+                    self.breaker.record_success()
+                if not error.retryable or attempt == retry_count - 1:
+                    if error is e:
+                        raise
+                    raise error from e
+
+                delay = self.backoff(attempt, error.retry_after)
+                if delay is None:
+                    raise ProviderError(
+                        f"Provider asked to retry after {error.retry_after:.0f}s: {error}",
+                        status_code=error.status_code,
+                        retry_after=error.retry_after,
+                        retryable=False
+                    ) from e
+                print(f"AI request failed ({error}); retrying in {delay:.1f}s")
+                if cancelled is not None:
+                    cancelled.wait(delay)
+                else:
+                    time.sleep(delay)
@@ -0,0 +1,65 @@
+# Schema of one segment in the AI provider's segmentation answer
+SEGMENT_SCHEMA = {
+    "type": "object",
+    "required": ["title", "content"],
+    "properties": {
+        "title": {"type": "string", "minLength": 1},
+        "content": {"type": "string", "minLength": 1},
+        "keywords": {"type": "array", "items": {"type": "string"}}
+    }
+}
+
+SEGMENTS_SCHEMA = {
+    "type": "object",
+    "required": ["segments"],
+    "properties": {
+        "segments": {"type": "array", "items": SEGMENT_SCHEMA}
+    }
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+}
+
+
+def validate(instance, schema, path="$"):
+    """
+    Validate a decoded JSON value against a schema
+
+    Only the JSON Schema keywords used by the segment schemas are supported.
+
+    Args:
+        instance: Decoded JSON value
+        schema (dict): Schema using type, required, properties, items and minLength
+        path (str): Location of the instance, used in error messages
+
+    Returns:
+        list: Error messages; empty if the instance is valid
+    """
+    expected = schema.get("type")
+    if expected and (not isinstance(instance, _TYPES[expected])
+                     or (expected in ("number", "integer") and isinstance(instance, bool))):
+        return [f"{path}: expected {expected}, got {type(instance).__name__}"]
+
+    errors = []
+    if isinstance(instance, str) and len(instance.strip()) < schema.get("minLength", 0):
+        errors.append(f"{path}: must not be empty")
+
+    if isinstance(instance, dict):
+        for key in schema.get("required", ()):
+            if key not in instance:
+                errors.append(f"{path}: missing '{key}'")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in instance:
+                errors.extend(validate(instance[key], subschema, f"{path}.{key}"))
+
+    if isinstance(instance, list) and "items" in schema:
+        for index, item in enumerate(instance):
+            errors.extend(validate(item, schema["items"], f"{path}[{index}]"))
+
+    return errors
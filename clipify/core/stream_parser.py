@@ -0,0 +1,85 @@
+import json
+import re
+
+
+class SegmentStreamParser:
+    """Incrementally parse a streamed {"segments": [...]} JSON response"""
+
+    def __init__(self, key="segments"):
+        """
+        Initialize the parser
+
+        Args:
+            key (str): Name of the array whose objects are emitted
+        """
+        self.key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self.buffer = ""
+        self.position = 0
+        self.in_array = False
+        self.done = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.object_start = None
+
+    def feed(self, text):
+        """
+        Add streamed text
+
+        Text before the array (such as a ```json fence) and after it is ignored.
+
+        Args:
+            text (str): Next chunk of the response
+
+        Returns:
+            list: Segment dicts whose closing brace arrived with this chunk
+        """
+        self.buffer += text
+        segments = []
+        if self.done:
+            return segments
+
+        if not self.in_array:
+            match = self.key_pattern.search(self.buffer)
+            if not match:
+                return segments
+            self.in_array = True
+            self.position = match.end()
+
+        while self.position < len(self.buffer) and not self.done:
+            char = self.buffer[self.position]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                if self.depth == 0 and char == '{':
+                    self.object_start = self.position
+                self.depth += 1
+            elif char in '}]':
+                if self.depth == 0:
+                    # End of the segments array
+                    self.done = True
+                else:
+                    self.depth -= 1
+                    if self.depth == 0 and self.object_start is not None:
+                        segment = self.buffer[self.object_start:self.position + 1]
+                        try:
+                            segments.append(json.loads(segment))
+                        except ValueError as e:
+                            print(f"Skipping unparsable streamed segment: {e}")
+                        self.object_start = None
+            self.position += 1
+
+        # Keep only the unfinished segment in the buffer
+        keep = self.object_start if self.object_start is not None else self.position
+        self.buffer = self.buffer[keep:]
+        self.position -= keep
+        if self.object_start is not None:
+            self.object_start = 0
+        return segments
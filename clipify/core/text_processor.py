@@ -1,6 +1,9 @@
 import re
 from textblob import TextBlob
 import json
+from .stream_parser import SegmentStreamParser
+from .schema import SEGMENT_SCHEMA, validate
+from .tokens import TokenBudget, estimate_tokens
 
 
 class SmartTextProcessor:
@@ -23,6 +26,14 @@ class SmartTextProcessor:
         self.MIN_SEGMENT_LENGTH = 50
         self.MAX_SEGMENT_LENGTH = 1000
         
+        # Follow-up prompts allowed for segmenting text left over by cut-off responses
+        self.MAX_REPAIR_ROUNDS = 3
+        
+        # Transcript windows sized so each segmentation response fits the provider's max_tokens
+        self.token_budget = TokenBudget.for_provider(
+            ai_provider, prompt_tokens=estimate_tokens(self.get_segmentation_prompt(""))
+        )
+        
         # Common English stop words
         self.stop_words = {
             'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 
@@ -32,9 +43,9 @@ class SmartTextProcessor:
             'can', 'could', 'should', 'would', 'may', 'might', 'must', 'shall'
         }
 
-    def get_ai_response(self, prompt, retry_count=3):
+    def get_ai_response(self, prompt, retry_count=3, json_mode=False):
         """Get AI response using the configured provider"""
-        return self.ai_provider.get_response(prompt, retry_count)
+        return self.ai_provider.get_response(prompt, retry_count, json_mode=json_mode)
 
     def analyze_sentiment(self, text):
         """Analyze the sentiment of text to help with title generation"""
@@ -86,26 +97,7 @@ class SmartTextProcessor:
             if word_timings:
                 # Process each segment to add timing information
                 for segment in segments['segments']:
-                    # Get word timings for this specific segment
-                    segment_timings = self.get_segment_timings(
-                        segment['content'], 
-                        word_timings,
-                        start_pos=0
-                    )
-                    
-                    # Update segment with timing information
-                    if segment_timings['start'] is not None and segment_timings['end'] is not None:
-                        segment['start_time'] = segment_timings['start']
-                        segment['end_time'] = segment_timings['end']
-                        segment['word_timings'] = segment_timings['words']
-                        segment['operation_status'] = 'success'
-                    else:
-                        print(f"Warning: Could not find timing for segment: {segment['title']}")
-                        # Set to None instead of 0 to indicate missing timing data
-                        segment['start_time'] = None
-                        segment['end_time'] = None
-                        segment['word_timings'] = []
-                        segment['operation_status'] = 'failed'
+                    self.add_segment_timings(segment, word_timings)
             
             return segments
             
@@ -115,6 +107,48 @@ class SmartTextProcessor:
             print(traceback.format_exc())
             return None
 
+    def iter_segment_by_theme(self, text, word_timings=None):
+        """
+        Segment text by theme, yielding each segment with its timing information
+        as soon as the AI provider has finished writing it
+        
+        Args:
+            text (str): Transcript text
+            word_timings: Word timings dict or list, as for segment_by_theme
+        
+        Yields:
+            dict: Segment with 'title', 'content', 'keywords' and, with word timings,
+                'start_time', 'end_time', 'word_timings' and 'operation_status'
+        """
+        for segment in self.iter_thematic_segments(text):
+            if word_timings:
+                self.add_segment_timings(segment, word_timings)
+            yield segment
+
+    def add_segment_timings(self, segment, word_timings):
+        """Add start/end times and word timings of its content to a segment"""
+        # Get word timings for this specific segment
+        segment_timings = self.get_segment_timings(
+            segment['content'], 
+            word_timings,
+            start_pos=0
+        )
+        
+        # Update segment with timing information
+        if segment_timings['start'] is not None and segment_timings['end'] is not None:
+            segment['start_time'] = segment_timings['start']
+            segment['end_time'] = segment_timings['end']
+            segment['word_timings'] = segment_timings['words']
+            segment['operation_status'] = 'success'
+        else:
+            print(f"Warning: Could not find timing for segment: {segment['title']}")
+            # Set to None instead of 0 to indicate missing timing data
+            segment['start_time'] = None
+            segment['end_time'] = None
+            segment['word_timings'] = []
+            segment['operation_status'] = 'failed'
+        return segment
+
     def get_segment_timings(self, segment_text, word_timings, start_pos=0):
         """Extract timing information for a segment based on word timings"""
         try:
@@ -264,8 +298,8 @@ class SmartTextProcessor:
                 'word_timings': []
             }]
 
-    def get_thematic_segments(self, text):
-        """Get thematic segments using AI assistance"""
+    def get_segmentation_prompt(self, text):
+        """Build the prompt asking the AI provider to segment text by theme"""
         json_template = '''
 {
     "segments": [
@@ -299,47 +333,240 @@ class SmartTextProcessor:
         - Keywords should be relevant to the segment's specific content
         - Return ONLY the JSON, no additional text or formatting
         """
+        return prompt
+
+    def get_windows(self, text):
+        """Split text into windows whose segmentation requests fit the token budget"""
+        windows = self.token_budget.windows(text)
+        if len(windows) > 1:
+            estimate = self.token_budget.estimate(text)
+            print(f"Transcript needs about {estimate['completion_tokens']} response tokens; "
+                  f"segmenting it in {len(windows)} windows")
+        return windows
+
+    def get_thematic_segments(self, text):
+        """Get thematic segments using AI assistance, one request per window of the text"""
+        segments = []
+        for window in self.get_windows(text):
+            segments.extend(self._get_window_segments(window)['segments'])
+        return {'segments': segments}
+
+    def _get_window_segments(self, text):
+        """Get thematic segments of a text that fits a single request"""
+        prompt = self.get_segmentation_prompt(text)
 
         try:
-            response = self.get_ai_response(prompt)
+            response = self.get_ai_response(prompt, json_mode=True)
             if not response or 'choices' not in response:
                 print("Error: Invalid AI response")
                 return self._create_fallback_segment(text)
 
             # Extract the content from the response
-            response_text = response['choices'][0]['message']['content'].strip()
+            response_text = response['choices'][0]['message']['content']
+            segments, complete = self.parse_segments(response_text)
+            segments = self.repair_segments(text, segments, complete)
             
-            # Find the JSON content between triple backticks if present
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1)
-            
-            try:
-                segments_data = json.loads(response_text)
-                
-                # Ensure each segment has keywords, fallback to extracted keywords if missing
-                for segment in segments_data['segments']:
-                    if 'keywords' not in segment or not segment['keywords']:
-                        segment['keywords'] = self.extract_keywords(segment['content'])
-                    # Limit to 5 keywords if more were provided
-                    segment['keywords'] = segment['keywords'][:5]
-                
-                # Validate segments structure
-                if not isinstance(segments_data, dict) or 'segments' not in segments_data:
-                    print("Error: Invalid segments structure")
-                    return self._create_fallback_segment(text)
-                
-                return segments_data
-
-            except json.JSONDecodeError as e:
-                print(f"Error parsing JSON response: {e}")
+            if not segments:
+                print("Error: No valid segments in AI response")
                 print(f"Response text was: {response_text}")
                 return self._create_fallback_segment(text)
+            
+            # Ensure each segment has keywords, fallback to extracted keywords if missing
+            for segment in segments:
+                self._complete_keywords(segment)
+            return {'segments': segments}
 
         except Exception as e:
             print(f"Error in get_thematic_segments: {str(e)}")
             return self._create_fallback_segment(text)
 
+    def iter_thematic_segments(self, text):
+        """
+        Yield thematic segments one at a time while the AI response is streamed
+        
+        Each segment is parsed and validated as soon as its closing brace arrives.
+        Invalid segments, and the text left over when the response is cut off,
+        are repaired once the stream has ended. If the stream fails before any
+        segment was received, this falls back to a non-streamed request. Long
+        texts are streamed one window after another.
+        
+        Args:
+            text (str): Transcript text
+        
+        Yields:
+            dict: Segment with 'title', 'content' and 'keywords'
+        """
+        for window in self.get_windows(text):
+            yield from self._iter_window_segments(window)
+
+    def _iter_window_segments(self, text):
+        """Stream the thematic segments of a text that fits a single request"""
+        prompt = self.get_segmentation_prompt(text)
+        parser = SegmentStreamParser()
+        received = []
+        try:
+            for chunk in self.ai_provider.stream_response(prompt, json_mode=True):
+                for segment in parser.feed(chunk):
+                    received.append(segment)
+                    if not validate(segment, SEGMENT_SCHEMA):
+                        yield self._complete_keywords(segment)
+        except Exception as e:
+            print(f"Error streaming thematic segments: {str(e)}")
+            if not received:
+                yield from self._get_window_segments(text)['segments']
+                return
+        
+        if not received:
+            yield from self._get_window_segments(text)['segments']
+            return
+        
+        # Valid segments were already yielded; only the repairs remain
+        yielded = {id(segment) for segment in received if not validate(segment, SEGMENT_SCHEMA)}
+        for segment in self.repair_segments(text, received, parser.done):
+            if id(segment) not in yielded:
+                yield self._complete_keywords(segment)
+
+    @staticmethod
+    def parse_segments(response_text):
+        """
+        Parse the segment objects of an AI response, salvaging what precedes a JSON error
+        
+        Args:
+            response_text (str): Response content, optionally inside triple backticks
+        
+        Returns:
+            tuple: (list of segment objects, not yet validated; whether the whole
+                segments array was received)
+        """
+        response_text = response_text.strip()
+        
+        # Find the JSON content between triple backticks if present
+        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
+        if json_match:
+            response_text = json_match.group(1)
+        
+        try:
+            data = json.loads(response_text)
+            if isinstance(data, dict) and isinstance(data.get('segments'), list):
+                return data['segments'], True
+            print("Error: Invalid segments structure")
+            return [], False
+        except json.JSONDecodeError as e:
+            print(f"Error parsing JSON response: {e}")
+        
+        # Keep every segment object that was complete before the error
+        parser = SegmentStreamParser()
+        segments = parser.feed(response_text)
+        return segments, parser.done
+
+    def get_repair_prompt(self, invalid):
+        """
+        Build a short prompt asking the AI provider to fix segments that failed validation
+        
+        Args:
+            invalid (list): (segment object, list of error messages) pairs
+        """
+        listing = json.dumps([{'segment': segment, 'errors': errors} for segment, errors in invalid], indent=2)
+        return f"""
+        These segment objects do not match the required structure:
+{listing}
+
+        Fix each segment so it has a non-empty string "title", the non-empty string "content"
+        (keep the original text exactly) and a "keywords" list of 5 strings.
+        Return ONLY JSON of the form {{"segments": [...]}} with exactly {len(invalid)} segments, in the same order.
+        """
+
+    def repair_segments(self, text, segments, complete=True):
+        """
+        Keep the valid segments and repair only the rest with short follow-up prompts
+        
+        Invalid segments are sent back with their validation errors. When the
+        response was cut off, only the transcript text after the last valid
+        segment is segmented again.
+        
+        Args:
+            text (str): Transcript text
+            segments (list): Parsed segment objects in response order
+            complete (bool): Whether the whole segments array was received
+        
+        Returns:
+            list: Valid segments in transcript order
+        """
+        errors = [validate(segment, SEGMENT_SCHEMA) for segment in segments]
+        invalid = [index for index, segment_errors in enumerate(errors) if segment_errors]
+        
+        repaired = {}
+        if invalid:
+            print(f"Repairing {len(invalid)} invalid segments")
+            fixed, _ = self._request_segments(self.get_repair_prompt([(segments[i], errors[i]) for i in invalid]))
+            if len(fixed) == len(invalid):
+                repaired = dict(zip(invalid, fixed))
+            else:
+                print(f"Error: Repair returned {len(fixed)} valid segments for {len(invalid)} invalid ones")
+        
+        result = []
+        for index, segment in enumerate(segments):
+            if not errors[index]:
+                result.append(segment)
+            elif index in repaired:
+                result.append(repaired[index])
+            else:
+                print(f"Dropping invalid segment {index + 1}: {'; '.join(errors[index])}")
+        
+        for _ in range(self.MAX_REPAIR_ROUNDS):
+            if complete:
+                break
+            remaining = self._uncovered_text(text, result)
+            if not remaining:
+                break
+            print(f"AI response was cut off; segmenting the remaining {self.count_words(remaining)} words")
+            more, complete = self._request_segments(self.get_segmentation_prompt(remaining))
+            if not more:
+                break
+            result.extend(more)
+        return result
+
+    def _request_segments(self, prompt):
+        """
+        Send a follow-up prompt
+        
+        Returns:
+            tuple: (valid segments of the answer, whether the answer was complete)
+        """
+        try:
+            response = self.get_ai_response(prompt, json_mode=True)
+            segments, complete = self.parse_segments(response['choices'][0]['message']['content'])
+        except Exception as e:
+            print(f"Error in follow-up AI request: {str(e)}")
+            return [], True
+        return [segment for segment in segments if not validate(segment, SEGMENT_SCHEMA)], complete
+
+    def _uncovered_text(self, text, segments, min_words=20):
+        """Transcript text after the last of the segments, or "" if too short or not found"""
+        if not segments:
+            return text
+        
+        position = None
+        for segment in segments:
+            # Locate each segment by its last words, which the model copies verbatim
+            tail = segment['content'].strip()[-80:]
+            index = text.find(tail, position or 0)
+            if index >= 0:
+                position = index + len(tail)
+        if position is None:
+            return ""
+        
+        remaining = text[position:].strip()
+        return remaining if self.count_words(remaining) >= min_words else ""
+
+    def _complete_keywords(self, segment):
+        """Fill in missing keywords from the segment's content and keep at most 5"""
+        if 'keywords' not in segment or not segment['keywords']:
+            segment['keywords'] = self.extract_keywords(segment['content'])
+        # Limit to 5 keywords if more were provided
+        segment['keywords'] = segment['keywords'][:5]
+        return segment
+
     def _create_fallback_segment(self, text):
         """Create a fallback segment when processing fails"""
         return {
@@ -0,0 +1,245 @@
+import math
+import re
+import threading
+from contextlib import contextmanager
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional
+    _encoding = None
+
+
+# USD per million (input, output) tokens; extend or override through UsageMeter(prices=...)
+PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo-preview": (10.0, 30.0),
+    "gpt-3.5-turbo": (0.5, 1.5),
+    "claude-3-opus-20240229": (15.0, 75.0),
+    "claude-3-sonnet-20240229": (3.0, 15.0),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+}
+
+# Context window (prompt plus response) in tokens, where it limits the window size
+CONTEXT_WINDOWS = {
+    "gpt-4": 8192,
+    "gpt-4-turbo-preview": 128000,
+    "gpt-3.5-turbo": 16385,
+    "claude-3-opus-20240229": 200000,
+    "claude-3-sonnet-20240229": 200000,
+    "claude-3-haiku-20240307": 200000,
+}
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens of a text
+
+    Uses tiktoken's cl100k_base encoding when tiktoken is installed, otherwise the
+    larger of four characters per token and 1.3 tokens per word.
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(math.ceil(len(text) / 4), math.ceil(len(text.split()) * 1.3))
+
+
+def model_name(provider):
+    """Full model name of a provider, resolving aliases such as 'default'"""
+    model = getattr(provider, 'model', None) or "default"
+    return getattr(provider, 'AVAILABLE_MODELS', {}).get(model, model)
+
+
+class TokenBudget:
+    """Predict the tokens of segmentation requests and split transcripts into windows that fit"""
+
+    def __init__(self, max_tokens, context_window=None, prompt_tokens=400, output_ratio=1.15,
+                 segment_tokens=60, words_per_segment=225, safety=0.85):
+        """
+        Initialize the budget
+
+        Segmentation answers repeat the transcript text, so the response grows with
+        the window: about output_ratio tokens per transcript token, plus title and
+        keywords for every segment.
+
+        Args:
+            max_tokens (int): Maximum tokens of the response
+            context_window (int): Maximum tokens of prompt plus response; None if not limiting
+            prompt_tokens (int): Tokens of the prompt around the transcript text
+            output_ratio (float): Response tokens per transcript token
+            segment_tokens (int): Response tokens per segment besides its content
+            words_per_segment (int): Expected transcript words per segment
+            safety (float): Fraction of max_tokens a window's predicted response may use
+        """
+        self.max_tokens = max_tokens
+        self.context_window = context_window
+        self.prompt_tokens = prompt_tokens
+        self.output_ratio = output_ratio
+        self.segment_tokens = segment_tokens
+        self.words_per_segment = words_per_segment
+        self.safety = safety
+
+    @classmethod
+    def for_provider(cls, provider, **options):
+        """Budget for a provider's max_tokens and its model's context window"""
+        options.setdefault('context_window', CONTEXT_WINDOWS.get(model_name(provider)))
+        return cls(getattr(provider, 'max_tokens', None) or 4096, **options)
+
+    def estimate(self, text):
+        """
+        Predict the tokens of a segmentation request for a transcript text
+
+        Returns:
+            dict: 'prompt_tokens' and 'completion_tokens'
+        """
+        text_tokens = estimate_tokens(text)
+        segments = max(1, math.ceil(len(text.split()) / self.words_per_segment))
+        return {
+            'prompt_tokens': self.prompt_tokens + text_tokens,
+            'completion_tokens': int(text_tokens * self.output_ratio) + segments * self.segment_tokens + 20
+        }
+
+    def fits(self, text):
+        """Whether the predicted request for a text fits max_tokens and the context window"""
+        estimate = self.estimate(text)
+        if estimate['completion_tokens'] > self.max_tokens * self.safety:
+            return False
+        if self.context_window and estimate['prompt_tokens'] + self.max_tokens > self.context_window:
+            return False
+        return True
+
+    def windows(self, text):
+        """
+        Split a transcript at sentence ends into windows whose requests fit the budget
+
+        A single sentence too long for the budget becomes a window of its own.
+
+        Returns:
+            list: Window texts in order
+        """
+        if self.fits(text):
+            return [text]
+
+        sentences = [sentence for sentence in re.split(r'(?<=[.!?])\s+', text.strip()) if sentence]
+        windows = []
+        current = []
+        for sentence in sentences:
+            if current and not self.fits(" ".join(current + [sentence])):
+                windows.append(" ".join(current))
+                current = []
+            current.append(sentence)
+        if current:
+            windows.append(" ".join(current))
+        return windows
+
+
+class UsageMeter:
+    """Thread-safe totals of tokens used and their cost"""
+
+    def __init__(self, prices=None):
+        """
+        Args:
+            prices (dict): Model name -> (USD per million input tokens, per million output tokens),
+                added to PRICES
+        """
+        self.prices = dict(PRICES, **(prices or {}))
+        self.lock = threading.Lock()
+        self.models = {}
+
+    def cost(self, model, prompt_tokens, completion_tokens, free=False):
+        """Cost of a request in USD, or None if the model's price is unknown"""
+        if free:
+            return 0.0
+        price = self.prices.get(model)
+        if price is None:
+            return None
+        return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+    def record(self, model, prompt_tokens, completion_tokens, estimated=False, free=False):
+        """
+        Record the usage of one request
+
+        Args:
+            model (str): Full model name
+            prompt_tokens (int): Input tokens
+            completion_tokens (int): Output tokens
+            estimated (bool): Whether the counts are estimates rather than reported by the provider
+            free (bool): Whether the provider costs nothing per token
+        """
+        cost = self.cost(model, prompt_tokens, completion_tokens, free)
+        with self.lock:
+            totals = self.models.setdefault(model, {
+                'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'cost': 0.0,
+                'estimated_requests': 0, 'unpriced_requests': 0
+            })
+            totals['requests'] += 1
+            totals['prompt_tokens'] += prompt_tokens
+            totals['completion_tokens'] += completion_tokens
+            totals['estimated_requests'] += estimated
+            if cost is None:
+                totals['unpriced_requests'] += 1
+            else:
+                totals['cost'] += cost
+
+    def report(self):
+        """
+        Summarise the recorded usage
+
+        Returns:
+            dict: 'requests', 'prompt_tokens', 'completion_tokens', 'cost' (USD, for priced
+                models only) and 'models' with the same totals per model
+        """
+        with self.lock:
+            models = {model: dict(totals) for model, totals in self.models.items()}
+        report = {key: sum(totals[key] for totals in models.values())
+                  for key in ('requests', 'prompt_tokens', 'completion_tokens', 'estimated_requests',
+                              'unpriced_requests')}
+        report['cost'] = round(sum(totals['cost'] for totals in models.values()), 6)
+        report['models'] = models
+        return report
+
+
+# Meter of the video being processed on the current thread, see track_usage
+_active = threading.local()
+
+
+def current_meter():
+    """The UsageMeter active on this thread, or None"""
+    return getattr(_active, 'meter', None)
+
+
+@contextmanager
+def use_meter(meter):
+    """Record AI usage on this thread into a meter, e.g. from a worker thread of the caller"""
+    previous = current_meter()
+    _active.meter = meter
+    try:
+        yield meter
+    finally:
+        _active.meter = previous
+
+
+def track_usage(prices=None):
+    """Context manager recording the AI usage of this thread into a new UsageMeter"""
+    return use_meter(UsageMeter(prices))
+
+
+def record_usage(provider, usage, prompt, content):
+    """
+    Record a provider request in the provider's own meter and in the thread's active meter
+
+    Args:
+        provider: AIProvider that answered
+        usage (dict): 'prompt_tokens' and 'completion_tokens' reported by the provider, or None
+        prompt (str): Prompt text, used to estimate usage when it was not reported
+        content (str): Response text, used to estimate usage when it was not reported
+    """
+    estimated = not usage
+    if estimated:
+        usage = {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(content)}
+    free = not getattr(provider, 'charges_per_token', True)
+    for meter in (getattr(provider, 'usage', None), current_meter()):
+        if meter is not None:
+            meter.record(model_name(provider), usage.get('prompt_tokens') or 0,
+                         usage.get('completion_tokens') or 0, estimated, free)
@@ -2,5 +2,11 @@ from .processor import VideoProcessor
 from .converter import VideoConverter
 from .cutter import VideoCutter
 from .converterStretch import VideoConverterStretch
+from .encoding import EncodingProfile, get_encoding_profile
+from .smart_crop import SmartCropAnalyzer
+from .scene_index import SceneIndex
+from .captions import CaptionRenderer, SpriteCache
+from .subtitles import write_captions, mux_subtitles
+from .libass import LibassRenderer
 
-__all__ = ['VideoProcessor', 'VideoConverter', 'VideoCutter', 'VideoConverterStretch'] 
\ No newline at end of file
+__all__ = ['VideoProcessor', 'VideoConverter', 'VideoCutter', 'VideoConverterStretch', 'EncodingProfile', 'get_encoding_profile', 'SmartCropAnalyzer', 'SceneIndex', 'CaptionRenderer', 'SpriteCache', 'write_captions', 'mux_subtitles', 'LibassRenderer']
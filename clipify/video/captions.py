@@ -0,0 +1,364 @@
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from moviepy.editor import VideoFileClip
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from .encoding import get_encoding_profile
+
+
+class SpriteCache:
+    """Thread-safe LRU cache of rendered caption sprites, bounded by entries and bytes"""
+
+    def __init__(self, max_entries=4096, max_bytes=256 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Composed caption blocks are float32 arrays of a few MB each, so the byte
+        limit is usually the one that applies.
+
+        Args:
+            max_entries (int): Number of sprites kept before the least recently used is evicted
+            max_bytes (int): Total size of the cached sprites before the least recently used
+                are evicted; a single sprite larger than this is rendered but not cached
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def size_of(value):
+        """Approximate memory used by a sprite: an image, an array or a tuple of them"""
+        if isinstance(value, tuple):
+            return sum(SpriteCache.size_of(item) for item in value)
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, Image.Image):
+            return value.width * value.height * len(value.getbands())
+        return 0
+
+    def get(self, key, factory):
+        """Return the cached sprite for a key, rendering it with factory() on a miss"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = factory()
+        size = self.size_of(value)
+        if size > self.max_bytes:
+            return value
+
+        with self.lock:
+            if key in self.entries:
+                # Another thread rendered the same sprite meanwhile
+                self.bytes -= self.sizes[key]
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            self.sizes[key] = size
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                evicted, _ = self.entries.popitem(last=False)
+                self.bytes -= self.sizes.pop(evicted)
+        return value
+
+    def clear(self):
+        """Drop every cached sprite"""
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.bytes = 0
+
+
+# Shared across renderers so sprites are reused between segments and videos
+_shared_cache = SpriteCache()
+
+
+def find_font(font):
+    """Locate a font file by path, falling back to the fonts shipped with captacity"""
+    if os.path.isfile(font):
+        return font
+
+    spec = importlib.util.find_spec("captacity_clipify")
+    if spec and spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            for root, _, files in os.walk(location):
+                if os.path.basename(font) in files:
+                    return os.path.join(root, os.path.basename(font))
+    return None
+
+
+class CaptionRenderer:
+    """Burn word-highlighted captions into a video from pre-rendered sprites"""
+
+    def __init__(self,
+                 font: str = "Bangers-Regular.ttf",
+                 font_size: int = 60,
+                 font_color: str = "white",
+                 stroke_width: int = 2,
+                 stroke_color: str = "black",
+                 highlight_current_word: bool = True,
+                 word_highlight_color: str = "red",
+                 shadow_strength: float = 0.8,
+                 shadow_blur: float = 0.08,
+                 line_count: int = 1,
+                 padding: int = 50,
+                 position: str = "bottom",
+                 cache: SpriteCache = None,
+                 encoding_profile=None):
+        """
+        Initialize the caption renderer
+
+        Styling arguments match VideoProcessor.
+
+        Args:
+            cache (SpriteCache): Sprite cache to use (default: shared process-wide cache)
+            encoding_profile: EncodingProfile, profile name or dict of encoder settings
+        """
+        self.font = font
+        self.font_size = font_size
+        self.font_color = font_color
+        self.stroke_width = stroke_width
+        self.stroke_color = stroke_color
+        self.highlight_current_word = highlight_current_word
+        self.word_highlight_color = word_highlight_color
+        self.shadow_strength = shadow_strength
+        self.shadow_blur = shadow_blur
+        self.line_count = line_count
+        self.padding = padding
+        self.position = position
+        self.cache = cache if cache is not None else _shared_cache
+        self.encoding_profile = get_encoding_profile(encoding_profile)
+
+        self.image_font = self._load_font(font, font_size)
+        self.style_key = (
+            font, font_size, font_color, stroke_width, stroke_color,
+            word_highlight_color, shadow_strength, shadow_blur
+        )
+        self.ascent, self.descent = self.image_font.getmetrics()
+        self.space_width = self.image_font.getlength(" ")
+        self.margin = int(stroke_width + 2 * shadow_blur * font_size + 2)
+        self.line_height = self.ascent + self.descent + 2 * stroke_width
+
+    @staticmethod
+    def _load_font(font, font_size):
+        """Load a TrueType font by path, falling back to the fonts shipped with captacity"""
+        try:
+            return ImageFont.truetype(font, font_size)
+        except OSError:
+            pass
+
+        font_path = find_font(font)
+        if font_path:
+            return ImageFont.truetype(font_path, font_size)
+
+        print(f"Warning: Font not found: {font}. Using the default font")
+        return ImageFont.load_default()
+
+    def render_word(self, text, highlighted=False):
+        """
+        Rasterise a word with stroke and shadow, once per (word, style, highlight state)
+
+        Returns:
+            PIL.Image: RGBA sprite including a margin of self.margin pixels
+        """
+        key = ('word', self.style_key, text, highlighted)
+        return self.cache.get(key, lambda: self._rasterize(text, highlighted))
+
+    def _rasterize(self, text, highlighted):
+        color = self.word_highlight_color if highlighted else self.font_color
+        left, _, right, _ = self.image_font.getbbox(text, stroke_width=self.stroke_width)
+        size = (int(right - left) + 2 * self.margin, self.line_height + 2 * self.margin)
+
+        text_layer = Image.new('RGBA', size, (0, 0, 0, 0))
+        ImageDraw.Draw(text_layer).text(
+            (self.margin - left, self.margin + self.stroke_width),
+            text,
+            font=self.image_font,
+            fill=color,
+            stroke_width=self.stroke_width,
+            stroke_fill=self.stroke_color
+        )
+
+        if self.shadow_strength <= 0:
+            return text_layer
+
+        shadow_alpha = text_layer.getchannel('A').filter(
+            ImageFilter.GaussianBlur(self.shadow_blur * self.font_size)
+        ).point(lambda value: int(value * self.shadow_strength))
+        shadow = Image.new('RGBA', size, (0, 0, 0, 0))
+        shadow.putalpha(shadow_alpha)
+        return Image.alpha_composite(shadow, text_layer)
+
+    def word_width(self, text):
+        """Advance width of a word without the sprite margin"""
+        return self.render_word(text).width - 2 * self.margin
+
+    def layout(self, word_timings, frame_width):
+        """
+        Group timed words into captions that fit the frame width
+
+        Args:
+            word_timings (list): Dicts with 'text', 'start' and 'end' relative to the video
+            frame_width (int): Width of the video frames
+
+        Returns:
+            list: Captions with 'start', 'end' and 'lines' (lists of word timing dicts)
+        """
+        max_width = frame_width - 2 * self.padding
+        lines = []
+        current = []
+        current_width = 0
+        for word in word_timings:
+            text = word['text'].strip()
+            if not text:
+                continue
+            width = self.word_width(text)
+            added = width if not current else current_width + self.space_width + width
+            if current and added > max_width:
+                lines.append(current)
+                current = []
+                added = width
+            current.append(dict(word, text=text))
+            current_width = added
+        if current:
+            lines.append(current)
+
+        captions = []
+        for i in range(0, len(lines), self.line_count):
+            caption_lines = lines[i:i + self.line_count]
+            captions.append({
+                'start': caption_lines[0][0]['start'],
+                'end': caption_lines[-1][-1]['end'],
+                'lines': caption_lines
+            })
+        return captions
+
+    def render_caption(self, caption, highlight):
+        """
+        Compose a caption block with one highlighted word into blend-ready arrays
+
+        Returns:
+            tuple: (premultiplied RGB float32, inverse alpha float32) of the block
+        """
+        key = (
+            'caption',
+            self.style_key,
+            tuple(tuple(word['text'] for word in line) for line in caption['lines']),
+            highlight
+        )
+
+        def compose():
+            widths = [
+                sum(self.word_width(word['text']) for word in line) + self.space_width * (len(line) - 1)
+                for line in caption['lines']
+            ]
+            block_width = int(max(widths)) + 2 * self.margin
+            block_height = self.line_height * len(caption['lines']) + 2 * self.margin
+            block = Image.new('RGBA', (block_width, block_height), (0, 0, 0, 0))
+
+            word_index = 0
+            for line_index, line in enumerate(caption['lines']):
+                x = (block_width - 2 * self.margin - widths[line_index]) / 2
+                y = line_index * self.line_height
+                for word in line:
+                    sprite = self.render_word(word['text'], word_index == highlight)
+                    block.alpha_composite(sprite, dest=(int(x), int(y)))
+                    x += self.word_width(word['text']) + self.space_width
+                    word_index += 1
+
+            rgba = np.asarray(block, dtype=np.float32) / 255.0
+            alpha = rgba[:, :, 3:4]
+            return rgba[:, :, :3] * alpha * 255.0, 1.0 - alpha
+
+        return self.cache.get(key, compose)
+
+    def _placement(self, frame_width, frame_height, block_shape):
+        block_height, block_width = block_shape[:2]
+        x = (frame_width - block_width) // 2
+        if self.position == "top":
+            y = self.padding - self.margin
+        elif self.position == "center":
+            y = (frame_height - block_height) // 2
+        else:
+            y = frame_height - self.padding - block_height + self.margin
+        return x, y
+
+    def make_frame_processor(self, captions):
+        """Build the function compositing the active caption onto a frame at time t"""
+        starts = [caption['start'] for caption in captions]
+
+        def process_frame(get_frame, t):
+            frame = get_frame(t)
+            index = int(np.searchsorted(starts, t, side='right')) - 1
+            if index < 0 or t > captions[index]['end']:
+                return frame
+            caption = captions[index]
+
+            highlight = -1
+            if self.highlight_current_word:
+                words = [word for line in caption['lines'] for word in line]
+                for word_index, word in enumerate(words):
+                    if word['start'] <= t:
+                        highlight = word_index
+                    else:
+                        break
+
+            premultiplied, inverse_alpha = self.render_caption(caption, highlight)
+            frame_height, frame_width = frame.shape[:2]
+            x, y = self._placement(frame_width, frame_height, premultiplied.shape)
+
+            # Clip the block to the frame
+            top, left = max(0, y), max(0, x)
+            bottom = min(frame_height, y + premultiplied.shape[0])
+            right = min(frame_width, x + premultiplied.shape[1])
+            if bottom <= top or right <= left:
+                return frame
+
+            frame = frame.copy()
+            region = frame[top:bottom, left:right]
+            block = (slice(top - y, bottom - y), slice(left - x, right - x))
+            frame[top:bottom, left:right] = (
+                region * inverse_alpha[block] + premultiplied[block]
+            ).astype(np.uint8)
+            return frame
+
+        return process_frame
+
+    def burn(self, input_video, output_video, word_timings):
+        """
+        Burn captions into a video
+
+        Args:
+            input_video (str): Path to input video
+            output_video (str): Path to save the captioned video
+            word_timings (list): Dicts with 'text', 'start' and 'end' relative to the video
+
+        Returns:
+            bool: Success status
+        """
+        clip = None
+        try:
+            clip = VideoFileClip(input_video)
+            captions = self.layout(word_timings, clip.w)
+            final = clip.fl(self.make_frame_processor(captions)) if captions else clip
+            final.write_videofile(output_video, **self.encoding_profile.write_kwargs(audio_source=input_video))
+            return True
+
+        except Exception as e:
+            print(f"Error rendering captions: {e}")
+            return False
+
+        finally:
+            if clip is not None:
+                clip.close()
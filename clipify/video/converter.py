@@ -1,16 +1,128 @@
 from moviepy.editor import VideoFileClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+from moviepy.tools import find_extension
 import cv2
 import numpy as np
 import os
+from .encoding import get_encoding_profile
 
 class VideoConverter:
-    def __init__(self):
+    def __init__(self, encoding_profile=None, max_height=1920, background_scale=0.25):
+        """
+        Initialize the video converter
+        
+        Args:
+            encoding_profile: EncodingProfile, profile name or dict of encoder settings
+            max_height (int): Maximum output height; larger sources are scaled down at
+                decode time (None keeps the source resolution)
+            background_scale (float): Scale of the proxy frame the blurred background
+                is computed from, relative to the output size
+        """
         self.supported_ratios = ["1:1", "4:5", "9:16"]
+        self.encoding_profile = get_encoding_profile(encoding_profile)
+        self.max_height = max_height
+        self.background_scale = background_scale
 
     def blur_frame(self, image, blur_amount=30):
         """Apply Gaussian blur to an image"""
         return cv2.GaussianBlur(image, (blur_amount * 2 + 1, blur_amount * 2 + 1), 0)
 
+    def get_output_size(self, source_width, source_height, target_ratio):
+        """
+        Calculate the output canvas and main frame size for a source video
+        
+        Returns:
+            tuple: (width, height, main_size) with even dimensions for the encoder
+        """
+        target_w, target_h = map(int, target_ratio.split(":"))
+        target_ratio_float = target_w / target_h
+        
+        # Calculate the dimensions for the final video
+        if source_width / source_height > target_ratio_float:  # wider than target
+            new_height = source_height
+            new_width = new_height * target_ratio_float
+        else:  # taller than target
+            new_width = source_width
+            new_height = new_width / target_ratio_float
+        
+        # Cap the canvas so high-resolution sources are never decoded in full
+        if self.max_height and new_height > self.max_height:
+            new_width = new_width * self.max_height / new_height
+            new_height = self.max_height
+        
+        new_width = max(2, int(new_width) // 2 * 2)
+        new_height = max(2, int(new_height) // 2 * 2)
+        
+        # The main video is a square using the smaller dimension so it always fits
+        return new_width, new_height, min(new_width, new_height)
+
+    def make_frame_processor(self, new_width, new_height, main_size, blur_amount=30):
+        """Build the per-frame function that centers the main video on a blurred background"""
+        # The background is blurred heavily, so it is built from a small proxy
+        # frame and scaled up rather than resized and blurred at full size
+        proxy_width = max(1, int(new_width * self.background_scale))
+        proxy_height = max(1, int(new_height * self.background_scale))
+        proxy_blur = max(1, int(blur_amount * self.background_scale))
+        
+        # Calculate the position to center the main video
+        x_offset = (new_width - main_size) // 2
+        y_offset = (new_height - main_size) // 2
+        
+        def process_frame(current_frame):
+            # Frames are normally decoded at the main size already
+            if current_frame.shape[0] != main_size or current_frame.shape[1] != main_size:
+                main_frame = cv2.resize(current_frame, (main_size, main_size))
+            else:
+                main_frame = current_frame
+            
+            # Create blurred background by scaling the frame to fill the target size
+            background = cv2.resize(main_frame, (proxy_width, proxy_height), interpolation=cv2.INTER_AREA)
+            background = self.blur_frame(background, proxy_blur)
+            final_frame = cv2.resize(background, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+            
+            # Overlay the square main video in the center
+            final_frame[y_offset:y_offset + main_size,
+                        x_offset:x_offset + main_size] = main_frame
+            
+            return final_frame
+        
+        return process_frame
+
+    def build_filtergraph(self, input_video, target_ratio="9:16", blur_amount=30):
+        """
+        Build the ffmpeg equivalent of the blurred-background reframe for a video
+        
+        The graph reads [0:v] and ends unlabelled, so further filters such as
+        caption burn-in can be chained onto it within the same ffmpeg process.
+        
+        Args:
+            input_video (str): Path to input video
+            target_ratio (str): Target aspect ratio (default: "9:16")
+            blur_amount (int): Background blur, as in make_frame_processor
+        
+        Returns:
+            tuple: (filtergraph, (width, height)) of the reframed video
+        """
+        if target_ratio not in self.supported_ratios:
+            raise ValueError(f"Unsupported ratio. Supported ratios: {self.supported_ratios}")
+        
+        source_width, source_height = ffmpeg_parse_infos(input_video)['video_size']
+        new_width, new_height, main_size = self.get_output_size(source_width, source_height, target_ratio)
+        proxy_width = max(2, int(new_width * self.background_scale) // 2 * 2)
+        proxy_height = max(2, int(new_height * self.background_scale) // 2 * 2)
+        proxy_blur = max(1, int(blur_amount * self.background_scale))
+        # Same sigma OpenCV derives for a (2 * blur + 1) Gaussian kernel
+        sigma = 0.3 * (proxy_blur - 1) + 0.8
+        
+        filtergraph = (
+            f"[0:v]scale={main_size}:{main_size},setsar=1,split[main][background];"
+            f"[background]scale={proxy_width}:{proxy_height},gblur=sigma={sigma:.2f},"
+            f"scale={new_width}:{new_height}[blurred];"
+            f"[blurred][main]overlay={(new_width - main_size) // 2}:{(new_height - main_size) // 2}"
+        )
+        return filtergraph, (new_width, new_height)
+
     def convert_to_mobile(self, input_video, output_video, target_ratio="9:16"):
         """
         Convert video to mobile-friendly format with blurred background
@@ -27,54 +139,19 @@ class VideoConverter:
             if target_ratio not in self.supported_ratios:
                 raise ValueError(f"Unsupported ratio. Supported ratios: {self.supported_ratios}")
 
-            clip = VideoFileClip(input_video)
-            
-            # Calculate target dimensions while maintaining aspect ratio
-            target_w, target_h = map(int, target_ratio.split(":"))
-            target_ratio_float = target_w / target_h
-            
-            # Calculate the dimensions for the final video
-            if clip.w/clip.h > target_ratio_float:  # wider than target
-                new_height = int(clip.h)
-                new_width = int(new_height * target_ratio_float)
-            else:  # taller than target
-                new_width = int(clip.w)
-                new_height = int(new_width / target_ratio_float)
-
-            def process_frame(current_frame):
-                # First, create a black canvas of the target size
-                final_frame = np.zeros((new_height, new_width, 3), dtype=np.uint8)
-                
-                # Calculate the size for the square (1:1) main video
-                # Use the smaller dimension to ensure it fits
-                main_size = min(new_width, new_height)
-                
-                # Resize the current frame to 1:1 square
-                main_frame = cv2.resize(current_frame, (main_size, main_size))
-                
-                # Create blurred background by scaling the frame to fill the target size
-                background = cv2.resize(current_frame, (new_width, new_height))
-                background = self.blur_frame(background)
-                
-                # Calculate the position to center the main video
-                x_offset = (new_width - main_size) // 2
-                y_offset = (new_height - main_size) // 2
-                
-                # Copy the blurred background
-                final_frame[:] = background
-                
-                # Overlay the square main video in the center
-                final_frame[y_offset:y_offset + main_size, 
-                           x_offset:x_offset + main_size] = main_frame
-                
-                return final_frame
+            # Read the source size without decoding any frames
+            source_width, source_height = ffmpeg_parse_infos(input_video)['video_size']
+            new_width, new_height, main_size = self.get_output_size(source_width, source_height, target_ratio)
+            
+            # Let ffmpeg scale frames straight to the main video size while decoding
+            clip = VideoFileClip(input_video, target_resolution=(main_size, main_size))
 
             # Create the final clip
-            final = clip.fl_image(process_frame)
+            final = clip.fl_image(self.make_frame_processor(new_width, new_height, main_size))
             final = final.set_duration(clip.duration)
             
             # Write output
-            final.write_videofile(output_video)
+            final.write_videofile(output_video, **self.encoding_profile.write_kwargs(audio_source=input_video))
             
             # Clean up
             clip.close()
@@ -86,6 +163,86 @@ class VideoConverter:
             print(f"Error converting video: {e}")
             return False
 
+    def convert_to_mobile_multi(self, input_video, outputs):
+        """
+        Convert video to several mobile formats from a single decode
+        
+        Each source frame is decoded once and fanned out to one reframe kernel
+        and encoder per target ratio.
+        
+        Args:
+            input_video (str): Path to input video
+            outputs (dict): Mapping of target ratio (e.g. "9:16") to output video path
+            
+        Returns:
+            bool: Success status
+        """
+        clip = None
+        writers = []
+        temp_audio = None
+        try:
+            unsupported = [ratio for ratio in outputs if ratio not in self.supported_ratios]
+            if unsupported:
+                raise ValueError(f"Unsupported ratio {unsupported}. Supported ratios: {self.supported_ratios}")
+            
+            source_width, source_height = ffmpeg_parse_infos(input_video)['video_size']
+            sizes = {
+                ratio: self.get_output_size(source_width, source_height, ratio)
+                for ratio in outputs
+            }
+            
+            # Decode once at the largest main size any output needs
+            decode_size = max(main_size for _, _, main_size in sizes.values())
+            clip = VideoFileClip(input_video, target_resolution=(decode_size, decode_size))
+            
+            # Every output shares one audio track: the source itself when copying,
+            # otherwise a single re-encoded temp file
+            audiofile = None
+            if clip.audio is not None:
+                if self.encoding_profile.audio == "copy":
+                    audiofile = input_video
+                else:
+                    audio_codec = self.encoding_profile.audio_codec or "libmp3lame"
+                    first_output = next(iter(outputs.values()))
+                    temp_audio = f"{os.path.splitext(first_output)[0]}_TEMP_audio.{find_extension(audio_codec)}"
+                    clip.audio.write_audiofile(
+                        temp_audio,
+                        codec=audio_codec,
+                        bitrate=self.encoding_profile.audio_bitrate,
+                        logger=None
+                    )
+                    audiofile = temp_audio
+            
+            kernels = []
+            for ratio, output_video in outputs.items():
+                new_width, new_height, main_size = sizes[ratio]
+                kernels.append(self.make_frame_processor(new_width, new_height, main_size))
+                writers.append(FFMPEG_VideoWriter(
+                    output_video,
+                    (new_width, new_height),
+                    clip.fps,
+                    **self.encoding_profile.writer_kwargs(audiofile=audiofile)
+                ))
+            
+            for frame in clip.iter_frames(fps=clip.fps, dtype="uint8"):
+                for kernel, writer in zip(kernels, writers):
+                    writer.write_frame(kernel(frame))
+            
+            return True
+            
+        except Exception as e:
+            print(f"Error converting video: {e}")
+            return False
+        
+        finally:
+            # Clean up
+            for writer in writers:
+                writer.close()
+            if clip is not None:
+                clip.close()
+            if temp_audio and os.path.exists(temp_audio):
+                os.remove(temp_audio)
+
 if __name__ == "__main__":
     import argparse
     
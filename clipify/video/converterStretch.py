@@ -1,11 +1,30 @@
 from moviepy.editor import VideoFileClip
 import os
+from .encoding import get_encoding_profile
+from .smart_crop import SmartCropAnalyzer
 
 class VideoConverterStretch:
-    def __init__(self):
+    def __init__(self, encoding_profile=None, crop_mode="center", analyzer=None):
+        """
+        Initialize the stretch converter
+        
+        Args:
+            encoding_profile: EncodingProfile, profile name or dict of encoder settings
+            crop_mode (str): "center" for a fixed center crop, or "smart" to follow the
+                detected subject along a smoothed per-shot crop path
+            analyzer (SmartCropAnalyzer): Analyzer used in smart mode (optional)
+        """
+        if crop_mode not in ("center", "smart"):
+            raise ValueError(f"Unsupported crop mode: {crop_mode}. Use 'center' or 'smart'")
+        
         self.supported_ratios = ["1:1", "4:5", "9:16"]
+        self.encoding_profile = get_encoding_profile(encoding_profile)
+        self.crop_mode = crop_mode
+        self.analyzer = analyzer if analyzer is not None else (
+            SmartCropAnalyzer() if crop_mode == "smart" else None
+        )
 
-    def convert_to_mobile(self, input_video, output_video, target_ratio="9:16"):
+    def convert_to_mobile(self, input_video, output_video, target_ratio="9:16", shot_boundaries=None):
         """
         Convert video to mobile-friendly format
         
@@ -13,6 +32,8 @@ class VideoConverterStretch:
             input_video (str): Path to input video
             output_video (str): Path to save converted video
             target_ratio (str): Target aspect ratio (default: "9:16")
+            shot_boundaries (list): Known shot start times within the input, e.g. from
+                SceneIndex.boundaries_between; used by smart crop instead of its own detection
             
         Returns:
             bool: Success status
@@ -36,11 +57,14 @@ class VideoConverterStretch:
             
             # Resize and crop video
             resized = clip.resize(width=new_width, height=new_height)
-            final = resized.crop(x_center=resized.w/2, y_center=resized.h/2, 
-                               width=new_width, height=new_height)
+            if self.crop_mode == "smart":
+                final = self.smart_crop(resized, input_video, new_width, new_height, shot_boundaries)
+            else:
+                final = resized.crop(x_center=resized.w/2, y_center=resized.h/2, 
+                                   width=new_width, height=new_height)
             
             # Write output
-            final.write_videofile(output_video)
+            final.write_videofile(output_video, **self.encoding_profile.write_kwargs(audio_source=input_video))
             
             # Clean up
             clip.close()
@@ -53,6 +77,21 @@ class VideoConverterStretch:
             print(f"Error converting video: {e}")
             return False
 
+    def smart_crop(self, clip, input_video, width, height, shot_boundaries=None):
+        """Crop a clip to the given size, following the subject's cached crop path"""
+        crop_path = self.analyzer.analyze(input_video, shot_boundaries=shot_boundaries)
+        max_x = max(0, clip.w - width)
+        max_y = max(0, clip.h - height)
+        
+        def crop_frame(get_frame, t):
+            frame = get_frame(t)
+            center_x, center_y = SmartCropAnalyzer.get_center(crop_path, t)
+            x1 = int(min(max(center_x * clip.w - width / 2, 0), max_x))
+            y1 = int(min(max(center_y * clip.h - height / 2, 0), max_y))
+            return frame[y1:y1 + height, x1:x1 + width]
+        
+        return clip.fl(crop_frame)
+
 if __name__ == "__main__":
     import argparse
     
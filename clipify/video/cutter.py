@@ -2,14 +2,20 @@ from moviepy.editor import VideoFileClip
 import os
 from pathlib import Path
 import logging
+from .encoding import get_encoding_profile
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class VideoCutter:
-    def __init__(self):
-        """Initialize the video cutter"""
-        pass
+    def __init__(self, encoding_profile=None):
+        """
+        Initialize the video cutter
+        
+        Args:
+            encoding_profile: EncodingProfile, profile name or dict of encoder settings
+        """
+        self.encoding_profile = get_encoding_profile(encoding_profile)
 
     def cut_video(self, input_video: str, output_video: str, start_time: float, end_time: float) -> bool:
         """
@@ -40,8 +46,8 @@ class VideoCutter:
                 
             segment = video.subclip(start_time, end_time)
             
-            # Write output
-            segment.write_videofile(output_video)
+            # Write output; the cut shifts the timeline, so audio is always re-encoded
+            segment.write_videofile(output_video, **self.encoding_profile.write_kwargs())
             
             # Clean up
             video.close()
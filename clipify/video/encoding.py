@@ -0,0 +1,188 @@
+import os
+
+
+class EncodingProfile:
+    """Encoder settings shared by every component that writes video files"""
+
+    def __init__(self,
+                 name: str = "custom",
+                 codec: str = "libx264",
+                 preset: str = "medium",
+                 crf: int = None,
+                 threads: int = None,
+                 pixel_format: str = None,
+                 audio: str = "reencode",
+                 audio_codec: str = None,
+                 audio_bitrate: str = None,
+                 faststart: bool = False):
+        """
+        Initialize an encoding profile
+
+        Args:
+            name (str): Profile name, used in logs and job manifests
+            codec (str): Video codec passed to ffmpeg (default: "libx264")
+            preset (str): Encoder speed/quality preset, "ultrafast" to "veryslow" (default: "medium")
+            crf (int): Constant rate factor; None keeps the encoder default
+            threads (int): Encoder thread count; None lets ffmpeg decide
+            pixel_format (str): Output pixel format, e.g. "yuv420p"; MoviePy already
+                forces yuv420p for libx264 output with even dimensions
+            audio (str): "copy" to stream-copy the source audio when the output keeps
+                the source timeline, or "reencode" (default: "reencode")
+            audio_codec (str): Audio codec used when re-encoding; None keeps MoviePy's default
+            audio_bitrate (str): Audio bitrate used when re-encoding, e.g. "192k"
+            faststart (bool): Move the mp4 index to the front for progressive playback
+        """
+        if audio not in ("copy", "reencode"):
+            raise ValueError(f"Unsupported audio mode: {audio}. Use 'copy' or 'reencode'")
+
+        self.name = name
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.pixel_format = pixel_format
+        self.audio = audio
+        self.audio_codec = audio_codec
+        self.audio_bitrate = audio_bitrate
+        self.faststart = faststart
+
+    def to_dict(self):
+        """Return the profile settings as a plain dictionary"""
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"EncodingProfile({self.to_dict()})"
+
+    def ffmpeg_params(self):
+        """Extra ffmpeg output arguments for this profile"""
+        params = []
+        if self.crf is not None:
+            params += ['-crf', str(self.crf)]
+        if self.pixel_format:
+            params += ['-pix_fmt', self.pixel_format]
+        if self.faststart:
+            params += ['-movflags', '+faststart']
+        return params
+
+    def write_kwargs(self, audio_source=None):
+        """
+        Keyword arguments for MoviePy's write_videofile
+
+        Args:
+            audio_source (str): Optional file whose audio track lines up with the clip
+                being written; used as-is when the profile copies audio
+
+        Returns:
+            dict: Arguments to pass to write_videofile
+        """
+        params = self.ffmpeg_params()
+        kwargs = {
+            'codec': self.codec,
+            'preset': self.preset,
+            'threads': self.threads
+        }
+
+        if self.audio == "copy" and audio_source:
+            # MoviePy stream-copies an audio file given by name; map streams
+            # explicitly so ffmpeg never picks the source's video stream
+            kwargs['audio'] = audio_source
+            params += ['-map', '0:v:0', '-map', '1:a:0?']
+        else:
+            if self.audio_codec:
+                kwargs['audio_codec'] = self.audio_codec
+            if self.audio_bitrate:
+                kwargs['audio_bitrate'] = self.audio_bitrate
+
+        kwargs['ffmpeg_params'] = params or None
+        return kwargs
+
+    def writer_kwargs(self, audiofile=None):
+        """
+        Keyword arguments for MoviePy's FFMPEG_VideoWriter
+
+        Args:
+            audiofile (str): Optional audio file to stream-copy into the output
+
+        Returns:
+            dict: Arguments to pass to FFMPEG_VideoWriter
+        """
+        params = self.ffmpeg_params()
+        if audiofile:
+            params += ['-map', '0:v:0', '-map', '1:a:0?']
+
+        return {
+            'codec': self.codec,
+            'preset': self.preset,
+            'threads': self.threads,
+            'audiofile': audiofile,
+            'ffmpeg_params': params or None
+        }
+
+    def ffmpeg_output_args(self):
+        """
+        Output arguments for running the ffmpeg binary directly on a source file
+
+        The source audio is stream-copied when the profile copies audio.
+
+        Returns:
+            list: Codec, preset, thread and audio arguments for ffmpeg
+        """
+        args = ['-c:v', self.codec, '-preset', self.preset]
+        if self.threads:
+            args += ['-threads', str(self.threads)]
+        args += self.ffmpeg_params()
+
+        if self.audio == "copy":
+            args += ['-c:a', 'copy']
+        else:
+            args += ['-c:a', self.audio_codec or 'aac']
+            if self.audio_bitrate:
+                args += ['-b:a', self.audio_bitrate]
+        return args
+
+
+ENCODING_PROFILES = {
+    "default": EncodingProfile(name="default"),
+    "draft-fast": EncodingProfile(
+        name="draft-fast",
+        preset="ultrafast",
+        crf=28,
+        threads=os.cpu_count(),
+        audio="copy",
+        faststart=True
+    ),
+    "publish-quality": EncodingProfile(
+        name="publish-quality",
+        preset="slow",
+        crf=18,
+        threads=os.cpu_count(),
+        pixel_format="yuv420p",
+        audio_codec="aac",
+        audio_bitrate="192k",
+        faststart=True
+    ),
+}
+
+
+def get_encoding_profile(profile=None) -> EncodingProfile:
+    """
+    Resolve an encoding profile
+
+    Args:
+        profile: None for the default profile, the name of a built-in profile
+            ("default", "draft-fast", "publish-quality"), a dict of EncodingProfile
+            arguments, or an EncodingProfile instance
+    """
+    if profile is None:
+        return ENCODING_PROFILES["default"]
+    if isinstance(profile, EncodingProfile):
+        return profile
+    if isinstance(profile, dict):
+        return EncodingProfile(**profile)
+
+    encoding_profile = ENCODING_PROFILES.get(str(profile).lower())
+    if not encoding_profile:
+        raise ValueError(
+            f"Unknown encoding profile: {profile}. Available profiles: {', '.join(ENCODING_PROFILES.keys())}"
+        )
+    return encoding_profile
@@ -0,0 +1,102 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from .captions import find_font
+from .encoding import get_encoding_profile
+from .subtitles import write_captions
+
+
+class LibassRenderer:
+    """Burn word-highlighted captions with ffmpeg's libass filter, without per-frame Python"""
+
+    def __init__(self, style=None, encoding_profile=None, max_chars=32):
+        """
+        Initialize the libass renderer
+
+        Args:
+            style (dict): VideoProcessor styling fields (font, font_size, font_color,
+                stroke_width, stroke_color, highlight_current_word, word_highlight_color,
+                shadow_strength, padding, position)
+            encoding_profile: EncodingProfile, profile name or dict of encoder settings
+            max_chars (int): Maximum characters per caption line
+        """
+        self.style = dict(style or {})
+        self.encoding_profile = get_encoding_profile(encoding_profile)
+        self.max_chars = max_chars
+
+    def build_command(self, input_video, output_video, video_filter=None):
+        """
+        Build the ffmpeg command, run from a directory holding captions.ass and fonts/
+
+        Args:
+            input_video (str): Path to input video
+            output_video (str): Path to save the captioned video
+            video_filter (str): Optional filtergraph reading [0:v] and ending unlabelled,
+                such as VideoConverter.build_filtergraph; captions are burned onto its output
+
+        Returns:
+            list: ffmpeg arguments
+        """
+        burn = "ass=captions.ass:fontsdir=fonts"
+        filtergraph = f"{video_filter},{burn}[video]" if video_filter else f"[0:v]{burn}[video]"
+        return [
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-i", os.path.abspath(input_video),
+            "-filter_complex", filtergraph,
+            "-map", "[video]", "-map", "0:a?",
+            *self.encoding_profile.ffmpeg_output_args(),
+            os.path.abspath(output_video)
+        ]
+
+    def burn(self, input_video, output_video, word_timings, video_filter=None, output_size=None):
+        """
+        Burn captions into a video in a single ffmpeg pass
+
+        Args:
+            input_video (str): Path to input video
+            output_video (str): Path to save the captioned video
+            word_timings (list): Dicts with 'text', 'start' and 'end' relative to the video
+            video_filter (str): Optional filtergraph applied before the captions
+            output_size (tuple): (width, height) produced by video_filter; defaults to the
+                size of the input video
+
+        Returns:
+            bool: Success status
+        """
+        try:
+            if output_size is None:
+                output_size = tuple(ffmpeg_parse_infos(input_video)['video_size'])
+
+            # Run from a scratch directory so no path has to be escaped inside the filtergraph
+            with tempfile.TemporaryDirectory() as work_dir:
+                write_captions(
+                    word_timings,
+                    os.path.join(work_dir, "captions.ass"),
+                    style=self.style,
+                    video_size=output_size,
+                    max_chars=self.max_chars
+                )
+                os.makedirs(os.path.join(work_dir, "fonts"))
+                font_path = find_font(self.style.get('font', "Bangers-Regular.ttf"))
+                if font_path:
+                    shutil.copy(font_path, os.path.join(work_dir, "fonts"))
+
+                process = subprocess.run(
+                    self.build_command(input_video, output_video, video_filter),
+                    cwd=work_dir,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE
+                )
+
+            if process.returncode != 0:
+                raise RuntimeError(process.stderr.decode('utf-8', errors='replace')[-500:])
+            return True
+
+        except Exception as e:
+            print(f"Error rendering captions with libass: {e}")
+            return False
@@ -1,6 +1,12 @@
 import os
 from captacity_clipify import add_captions
 from typing import Optional, Dict, Any
+from .captions import CaptionRenderer
+from .libass import LibassRenderer
+from .subtitles import SUBTITLE_FORMATS, write_captions, mux_subtitles
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+CAPTION_MODES = ("burn",) + SUBTITLE_FORMATS + ("soft",)
 
 class VideoProcessor:
     def __init__(self, 
@@ -18,7 +24,10 @@ class VideoProcessor:
                  padding: int = 50,
                  position: str = "bottom",
                  print_info: bool = False,
-                 initial_prompt: Optional[str] = None):
+                 initial_prompt: Optional[str] = None,
+                 renderer: str = "captacity",
+                 encoding_profile=None,
+                 caption_mode: str = "burn"):
         """
         Initialize the video processor with caption styling options
 
@@ -38,7 +47,20 @@ class VideoProcessor:
             position (str): Position of captions ("bottom", "top", or "center") (default: "bottom")
             print_info (bool): Whether to print processing info (default: False)
             initial_prompt (str): Initial prompt for whisper transcription
+            renderer (str): "captacity" to caption through Captacity, "sprite" to composite
+                cached word sprites, or "ffmpeg" to burn an ASS script with ffmpeg's libass
+                filter; "sprite" and "ffmpeg" need word timings and otherwise fall back to
+                Captacity (default: "captacity")
+            encoding_profile: Encoder settings for the sprite and ffmpeg renderers' output
+            caption_mode (str): "burn" to render captions into the frames, "srt", "vtt" or
+                "ass" to write a sidecar caption file next to the output instead, or "soft"
+                to mux a subtitle track into a stream-copied output (default: "burn")
         """
+        if renderer not in ("captacity", "sprite", "ffmpeg"):
+            raise ValueError(f"Unsupported caption renderer: {renderer}. Use 'captacity', 'sprite' or 'ffmpeg'")
+        if caption_mode not in CAPTION_MODES:
+            raise ValueError(f"Unsupported caption mode: {caption_mode}. Supported modes: {CAPTION_MODES}")
+
         self.font = font
         self.font_size = font_size
         self.font_color = font_color
@@ -54,12 +76,91 @@ class VideoProcessor:
         self.position = position
         self.print_info = print_info
         self.initial_prompt = initial_prompt
+        self.renderer = renderer
+        self.caption_mode = caption_mode
+        self.caption_renderer = None
+        if renderer == "sprite":
+            self.caption_renderer = CaptionRenderer(
+                font=font,
+                font_size=font_size,
+                font_color=font_color,
+                stroke_width=stroke_width,
+                stroke_color=stroke_color,
+                highlight_current_word=highlight_current_word,
+                word_highlight_color=word_highlight_color,
+                shadow_strength=shadow_strength,
+                shadow_blur=shadow_blur,
+                line_count=line_count,
+                padding=padding,
+                position=position,
+                encoding_profile=encoding_profile
+            )
+        elif renderer == "ffmpeg":
+            self.caption_renderer = LibassRenderer(style=self.get_style(), encoding_profile=encoding_profile)
+
+    def get_output_path(self, output_video: str) -> str:
+        """Get the file process_video writes for a requested output: the video itself,
+        or the sidecar caption file next to it in srt/vtt/ass mode"""
+        if self.caption_mode in SUBTITLE_FORMATS:
+            return f"{os.path.splitext(output_video)[0]}.{self.caption_mode}"
+        return output_video
+
+    def get_style(self) -> Dict[str, Any]:
+        """Styling fields used when writing ASS captions"""
+        return {
+            'font': self.font,
+            'font_size': self.font_size,
+            'font_color': self.font_color,
+            'stroke_width': self.stroke_width,
+            'stroke_color': self.stroke_color,
+            'highlight_current_word': self.highlight_current_word,
+            'word_highlight_color': self.word_highlight_color,
+            'shadow_strength': self.shadow_strength,
+            'padding': self.padding,
+            'position': self.position
+        }
+
+    def export_captions(self, input_video: str, output_video: str, word_timings: list) -> bool:
+        """
+        Write captions as a sidecar file or soft subtitle track, without re-encoding the video
+
+        Args:
+            input_video: Path to input video file
+            output_video: Path of the captioned video; sidecar files are written next to it
+            word_timings: Word timings ('text', 'start', 'end') relative to the input video
+
+        Returns:
+            True if the captions were written, False otherwise
+        """
+        if not word_timings:
+            print(f"Error exporting captions: word timings are required for caption mode '{self.caption_mode}'")
+            return False
+
+        video_size = tuple(ffmpeg_parse_infos(input_video)['video_size'])
+
+        if self.caption_mode in SUBTITLE_FORMATS:
+            write_captions(word_timings, self.get_output_path(output_video),
+                           style=self.get_style(), video_size=video_size)
+            return True
+
+        # Soft subtitles: MKV keeps the ASS styling, other containers take plain SRT
+        extension = "ass" if output_video.lower().endswith(".mkv") else "srt"
+        subtitle_path = f"{os.path.splitext(output_video)[0]}.{extension}"
+        try:
+            write_captions(word_timings, subtitle_path, style=self.get_style(), video_size=video_size)
+            return mux_subtitles(input_video, subtitle_path, output_video)
+        finally:
+            if os.path.exists(subtitle_path):
+                os.remove(subtitle_path)
 
     def process_video(self,
                      input_video: str,
                      output_video: str,
                      custom_segments: Optional[Dict[str, Any]] = None,
-                     use_local_whisper: str = "auto") -> bool:
+                     use_local_whisper: str = "auto",
+                     word_timings: Optional[list] = None,
+                     video_filter: Optional[str] = None,
+                     output_size: Optional[tuple] = None) -> bool:
         """
         Process a video file by adding captions using Captacity
         
@@ -68,6 +169,12 @@ class VideoProcessor:
             output_video: Path to save output video with captions
             custom_segments: Optional custom whisper segments to use
             use_local_whisper: Whether to use local whisper ("auto", True, or False)
+            word_timings: Optional word timings ('text', 'start', 'end') relative to the
+                input video; required by the sprite renderer, which otherwise falls
+                back to Captacity, and by the caption export modes
+            video_filter: Optional ffmpeg filtergraph run before the captions in the same
+                pass (ffmpeg renderer only), e.g. from VideoConverter.build_filtergraph
+            output_size: (width, height) produced by video_filter
             
         Returns:
             True if processing is successful, False otherwise
@@ -82,6 +189,16 @@ class VideoProcessor:
             if output_dir and not os.path.exists(output_dir):
                 os.makedirs(output_dir)
 
+            if self.caption_mode != "burn":
+                return self.export_captions(input_video, output_video, word_timings)
+
+            if self.renderer == "ffmpeg" and word_timings:
+                return self.caption_renderer.burn(input_video, output_video, word_timings,
+                                                  video_filter=video_filter, output_size=output_size)
+
+            if self.caption_renderer and word_timings:
+                return self.caption_renderer.burn(input_video, output_video, word_timings)
+
             # Add captions to video using Captacity
             add_captions(
                 video_file=input_video,
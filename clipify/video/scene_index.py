@@ -0,0 +1,155 @@
+import bisect
+import json
+import os
+import re
+import subprocess
+from pathlib import Path
+
+from moviepy.config import get_setting
+
+
+class SceneIndex:
+    """Shot boundaries and keyframe timestamps of a source video"""
+
+    # showinfo lines look like "[Parsed_showinfo_1 @ 0x...] n: 12 pts: 6144 pts_time:0.48 ... iskey:1 ..."
+    SHOWINFO_PATTERN = re.compile(r"\[Parsed_showinfo_(\d+) @ [^\]]*\].*?pts_time:\s*([\d.]+).*?iskey:\s*(\d)")
+
+    def __init__(self, shot_boundaries, keyframes, duration, source=None):
+        """
+        Initialize a scene index
+
+        Args:
+            shot_boundaries (list): Start times in seconds of every shot after the first
+            keyframes (list): Keyframe timestamps in seconds
+            duration (float): Duration of the indexed video in seconds
+            source (list): Fingerprint of the indexed file, used to detect stale caches
+        """
+        self.shot_boundaries = sorted(shot_boundaries)
+        self.keyframes = sorted(keyframes)
+        self.duration = duration
+        self.source = source
+
+    @staticmethod
+    def get_index_path(video_path, cache_dir="transcripts"):
+        """Get the path of the cached index for a video"""
+        return os.path.join(cache_dir, f"{Path(video_path).stem}_scenes.json")
+
+    @staticmethod
+    def fingerprint(video_path):
+        """Identity of a video file: path, size and modification time"""
+        stat = os.stat(video_path)
+        return [os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def build(cls, video_path, threshold=0.3, analysis_width=160):
+        """
+        Analyse a video in one downscaled ffmpeg pass
+
+        Args:
+            video_path (str): Path to the video file
+            threshold (float): ffmpeg scene score (0-1) above which a frame starts a new shot
+            analysis_width (int): Width frames are scaled to before scene detection
+
+        Returns:
+            SceneIndex: The index of the video
+        """
+        # showinfo #1 reports every (downscaled) frame with its keyframe flag,
+        # showinfo #3 only the frames the scene filter selects
+        video_filter = (
+            f"scale={analysis_width}:-2,showinfo,"
+            f"select='gt(scene,{threshold})',showinfo"
+        )
+        command = [
+            get_setting("FFMPEG_BINARY"), "-hide_banner", "-nostats",
+            "-i", video_path,
+            "-an", "-vf", video_filter,
+            "-f", "null", "-"
+        ]
+        process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        output = process.stderr.decode('utf-8', errors='replace')
+        if process.returncode != 0:
+            raise RuntimeError(f"Scene detection failed for {video_path}: {output[-500:]}")
+
+        shot_boundaries = []
+        keyframes = []
+        duration = 0.0
+        for filter_index, pts_time, is_key in cls.SHOWINFO_PATTERN.findall(output):
+            time = float(pts_time)
+            if filter_index == "1":
+                duration = max(duration, time)
+                if is_key == "1":
+                    keyframes.append(time)
+            elif time > 0:
+                shot_boundaries.append(time)
+
+        return cls(shot_boundaries, keyframes, duration, source=cls.fingerprint(video_path))
+
+    @classmethod
+    def load_or_build(cls, video_path, cache_dir="transcripts", **build_options):
+        """Load the cached index for a video, building and saving it if missing or stale"""
+        index_path = cls.get_index_path(video_path, cache_dir)
+        if os.path.exists(index_path):
+            try:
+                index = cls.load(index_path)
+                if index.source == cls.fingerprint(video_path):
+                    return index
+            except Exception as e:
+                print(f"Error reading scene index: {e}")
+
+        print(f"Building scene index for: {video_path}")
+        index = cls.build(video_path, **build_options)
+        index.save(index_path)
+        return index
+
+    @classmethod
+    def load(cls, index_path):
+        """Load an index from a JSON file"""
+        with open(index_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        return cls(data['shot_boundaries'], data['keyframes'], data['duration'], data.get('source'))
+
+    def save(self, index_path):
+        """Save the index to a JSON file"""
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        with open(index_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'shot_boundaries': self.shot_boundaries,
+                'keyframes': self.keyframes,
+                'duration': self.duration,
+                'source': self.source
+            }, file)
+
+    def get_shots(self):
+        """List of (start, end) times for every shot"""
+        edges = [0.0] + self.shot_boundaries + [self.duration]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def shot_at(self, time):
+        """Get the (start, end) of the shot containing a time"""
+        return self.get_shots()[bisect.bisect_right(self.shot_boundaries, time)]
+
+    def boundaries_between(self, start, end):
+        """Shot boundaries inside a time range, relative to its start"""
+        return [boundary - start for boundary in self.shot_boundaries if start < boundary < end]
+
+    def nearest_cut(self, time, tolerance=1.0):
+        """Get the shot boundary closest to a time within a tolerance, or None"""
+        return self._nearest(self.shot_boundaries, time, tolerance)
+
+    def nearest_keyframe(self, time, tolerance=1.0):
+        """Get the keyframe closest to a time within a tolerance, or None"""
+        return self._nearest(self.keyframes, time, tolerance)
+
+    def keyframe_before(self, time):
+        """Get the last keyframe at or before a time"""
+        position = bisect.bisect_right(self.keyframes, time)
+        return self.keyframes[position - 1] if position else 0.0
+
+    @staticmethod
+    def _nearest(times, time, tolerance):
+        position = bisect.bisect_left(times, time)
+        candidates = times[max(0, position - 1):position + 1]
+        if not candidates:
+            return None
+        nearest = min(candidates, key=lambda candidate: abs(candidate - time))
+        return nearest if abs(nearest - time) <= tolerance else None
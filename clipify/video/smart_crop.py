@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import subprocess
+from pathlib import Path
+
+import cv2
+import numpy as np
+from moviepy.config import get_setting
+
+
+class SmartCropAnalyzer:
+    """Track the main subject of a video at low frequency and build smoothed per-shot crop paths"""
+
+    def __init__(self,
+                 sample_fps: float = 2.0,
+                 analysis_width: int = 320,
+                 shot_threshold: float = 0.5,
+                 smoothing: float = 0.3,
+                 cache_dir: str = os.path.join("processed_content", "crop_paths")):
+        """
+        Initialize the smart crop analyzer
+
+        Args:
+            sample_fps (float): Frames analysed per second of video (default: 2.0)
+            analysis_width (int): Width frames are downscaled to before analysis (default: 320)
+            shot_threshold (float): Histogram distance (0-1) above which two samples are
+                treated as different shots (default: 0.5)
+            smoothing (float): Exponential smoothing factor for the crop path; lower is
+                smoother (default: 0.3)
+            cache_dir (str): Directory for cached crop paths, or None to disable caching
+        """
+        self.sample_fps = sample_fps
+        self.analysis_width = analysis_width
+        self.shot_threshold = shot_threshold
+        self.smoothing = smoothing
+        self.cache_dir = cache_dir
+        self.face_detector = cv2.CascadeClassifier(
+            os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        )
+
+    def get_cache_key(self, video_path):
+        """Hash the video contents and analysis settings"""
+        digest = hashlib.sha256()
+        with open(video_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest.update(json.dumps([
+            self.sample_fps, self.analysis_width, self.shot_threshold, self.smoothing
+        ]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def analyze(self, video_path, shot_boundaries=None):
+        """
+        Build the crop path for a video, reusing a cached path when available
+
+        Args:
+            video_path (str): Path to the video to analyse
+            shot_boundaries (list): Optional known shot start times in seconds; when
+                omitted, shot changes are detected from the sampled frames
+
+        Returns:
+            dict: 'duration' and 'shots', each shot with 'start', 'end' and a 'path'
+                of [time, center_x, center_y] points normalised to 0-1
+        """
+        cache_path = None
+        if self.cache_dir:
+            cache_key = self.get_cache_key(video_path)
+            if shot_boundaries is not None:
+                cache_key = hashlib.sha256(
+                    (cache_key + json.dumps(list(shot_boundaries))).encode('utf-8')
+                ).hexdigest()
+            cache_path = Path(self.cache_dir) / f"{cache_key}.json"
+            if cache_path.exists():
+                try:
+                    with open(cache_path, 'r', encoding='utf-8') as file:
+                        return json.load(file)
+                except Exception as e:
+                    print(f"Error reading cached crop path: {e}")
+
+        samples, duration = self._sample(video_path)
+        crop_path = {
+            'duration': duration,
+            'shots': self._build_shots(samples, duration, shot_boundaries)
+        }
+
+        if cache_path:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as file:
+                    json.dump(crop_path, file)
+            except Exception as e:
+                print(f"Error saving crop path: {e}")
+
+        return crop_path
+
+    def _sample(self, video_path):
+        """Detect the subject center and a color histogram on frames sampled at sample_fps"""
+        # Only the container header is read here; frames come from ffmpeg below
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+            frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            capture.release()
+        if not width or not height:
+            raise ValueError(f"Could not read the frame size of: {video_path}")
+
+        # ffmpeg drops the unsampled frames and downscales inside its (threaded)
+        # decoder, so only small sampled frames are converted and piped to Python
+        out_width = max(2, min(self.analysis_width, width) // 2 * 2)
+        out_height = max(2, int(round(height * out_width / width / 2)) * 2)
+        command = [
+            get_setting("FFMPEG_BINARY"), "-hide_banner", "-nostats", "-loglevel", "error",
+            "-i", video_path,
+            "-an", "-vf", f"fps={self.sample_fps},scale={out_width}:{out_height}",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-"
+        ]
+        frame_size = out_width * out_height * 3
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        samples = []
+        try:
+            while True:
+                data = process.stdout.read(frame_size)
+                if len(data) < frame_size:
+                    break
+                frame = np.frombuffer(data, dtype=np.uint8).reshape(out_height, out_width, 3)
+                samples.append(self._analyze_frame(len(samples) / self.sample_fps, frame))
+        finally:
+            process.stdout.close()
+            errors = process.stderr.read().decode('utf-8', errors='replace')
+            process.wait()
+        if process.returncode != 0 and not samples:
+            raise RuntimeError(f"Frame sampling failed for {video_path}: {errors[-500:]}")
+
+        duration = frame_count / fps if frame_count else len(samples) / self.sample_fps
+        return samples, duration
+
+    def _analyze_frame(self, time, frame):
+        """Find the largest face in a downscaled frame"""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.analysis_width / width)
+        small = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        histogram = cv2.calcHist([hsv], [0, 1], None, [16, 16], [0, 180, 0, 256])
+        cv2.normalize(histogram, histogram)
+
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        faces = self.face_detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(16, 16))
+
+        center = None
+        if len(faces):
+            x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+            center = ((x + w / 2) / small.shape[1], (y + h / 2) / small.shape[0])
+
+        return {'time': time, 'center': center, 'histogram': histogram}
+
+    def _build_shots(self, samples, duration, shot_boundaries=None):
+        """Split samples into shots and smooth the subject path within each shot"""
+        if not samples:
+            return [{'start': 0.0, 'end': duration, 'path': [[0.0, 0.5, 0.5]]}]
+
+        # Group samples into shots
+        groups = [[samples[0]]]
+        for previous, sample in zip(samples, samples[1:]):
+            if shot_boundaries is not None:
+                new_shot = any(previous['time'] < boundary <= sample['time'] for boundary in shot_boundaries)
+            else:
+                distance = cv2.compareHist(previous['histogram'], sample['histogram'],
+                                           cv2.HISTCMP_BHATTACHARYYA)
+                new_shot = distance > self.shot_threshold
+            if new_shot:
+                groups.append([])
+            groups[-1].append(sample)
+
+        shots = []
+        for index, group in enumerate(groups):
+            start = 0.0 if index == 0 else group[0]['time']
+            end = groups[index + 1][0]['time'] if index + 1 < len(groups) else duration
+            shots.append({'start': start, 'end': end, 'path': self._smooth_path(group)})
+        return shots
+
+    def _smooth_path(self, samples):
+        """Fill missed detections and smooth the path in both directions to avoid lag"""
+        detected = [sample['center'] for sample in samples if sample['center'] is not None]
+        fallback = np.median(np.array(detected), axis=0) if detected else np.array([0.5, 0.5])
+
+        centers = np.array([
+            sample['center'] if sample['center'] is not None else fallback
+            for sample in samples
+        ], dtype=np.float64)
+
+        forward = centers.copy()
+        for i in range(1, len(forward)):
+            forward[i] = self.smoothing * centers[i] + (1 - self.smoothing) * forward[i - 1]
+        smoothed = forward.copy()
+        for i in range(len(smoothed) - 2, -1, -1):
+            smoothed[i] = self.smoothing * forward[i] + (1 - self.smoothing) * smoothed[i + 1]
+
+        return [
+            [sample['time'], float(center[0]), float(center[1])]
+            for sample, center in zip(samples, smoothed)
+        ]
+
+    @staticmethod
+    def get_center(crop_path, time):
+        """
+        Interpolate the normalised subject center at a given time
+
+        Returns:
+            tuple: (center_x, center_y) in the 0-1 range
+        """
+        shots = crop_path['shots']
+        shot = shots[-1]
+        for candidate in shots:
+            if time < candidate['end']:
+                shot = candidate
+                break
+
+        path = shot['path']
+        times = [point[0] for point in path]
+        center_x = float(np.interp(time, times, [point[1] for point in path]))
+        center_y = float(np.interp(time, times, [point[2] for point in path]))
+        return center_x, center_y
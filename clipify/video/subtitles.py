@@ -0,0 +1,248 @@
+import os
+import subprocess
+from pathlib import Path
+
+from moviepy.config import get_setting
+from PIL import ImageColor, ImageFont
+
+from .captions import find_font
+
+
+SUBTITLE_FORMATS = ("srt", "vtt", "ass")
+
+ASS_ALIGNMENT = {"bottom": 2, "center": 5, "top": 8}
+
+
+def group_words(word_timings, max_chars=32):
+    """
+    Group timed words into caption lines
+
+    Args:
+        word_timings (list): Dicts with 'text', 'start' and 'end' in seconds
+        max_chars (int): Maximum characters per caption line
+
+    Returns:
+        list: Captions with 'start', 'end' and 'words'
+    """
+    captions = []
+    current = []
+    length = 0
+    for word in word_timings:
+        text = word['text'].strip()
+        if not text:
+            continue
+        if current and length + 1 + len(text) > max_chars:
+            captions.append(current)
+            current = []
+            length = 0
+        length += len(text) + (1 if current else 0)
+        current.append(dict(word, text=text))
+    if current:
+        captions.append(current)
+
+    return [
+        {'start': words[0]['start'], 'end': words[-1]['end'], 'words': words}
+        for words in captions
+    ]
+
+
+def _timestamp(seconds, separator, hour_digits=2, fraction_digits=3):
+    units = int(round(max(0.0, seconds) * 10 ** fraction_digits))
+    whole, fraction = divmod(units, 10 ** fraction_digits)
+    minutes, whole = divmod(whole, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:0{hour_digits}d}:{minutes:02d}:{whole:02d}{separator}{fraction:0{fraction_digits}d}"
+
+
+def format_srt(captions):
+    """Format captions as SubRip"""
+    blocks = []
+    for index, caption in enumerate(captions, 1):
+        text = " ".join(word['text'] for word in caption['words'])
+        blocks.append(
+            f"{index}\n{_timestamp(caption['start'], ',')} --> {_timestamp(caption['end'], ',')}\n{text}\n"
+        )
+    return "\n".join(blocks)
+
+
+def format_vtt(captions):
+    """Format captions as WebVTT"""
+    blocks = ["WEBVTT\n"]
+    for caption in captions:
+        text = " ".join(word['text'] for word in caption['words'])
+        blocks.append(f"{_timestamp(caption['start'], '.')} --> {_timestamp(caption['end'], '.')}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def ass_color(color, opacity=1.0):
+    """Convert a color name or hex string to an ASS style color (&HAABBGGRR)"""
+    red, green, blue = ImageColor.getrgb(color)[:3]
+    alpha = int(round((1.0 - opacity) * 255))
+    return f"&H{alpha:02X}{blue:02X}{green:02X}{red:02X}"
+
+
+def ass_override_color(color):
+    """Convert a color name or hex string to an ASS override tag color (&HBBGGRR&)"""
+    red, green, blue = ImageColor.getrgb(color)[:3]
+    return f"&H{blue:02X}{green:02X}{red:02X}&"
+
+
+def font_family(font):
+    """Family name of a font file, as ASS and libass expect it"""
+    try:
+        return ImageFont.truetype(find_font(font) or font, 10).getname()[0]
+    except OSError:
+        return Path(font).stem.split("-")[0]
+
+
+def _ass_escape(text):
+    # ASS has no escape for a backslash; a word joiner after it keeps "\N", "\h" or "\{"
+    # in the text from being read as a tag while looking the same
+    return text.replace("\\", "\\\u2060").replace("{", "\\{").replace("}", "\\}")
+
+
+def format_ass(captions, style=None, video_size=(1080, 1920)):
+    """
+    Format captions as Advanced SubStation Alpha
+
+    When highlighting is enabled, every word gets its own event showing the whole
+    line with that word in the highlight color, like the burned-in captions.
+
+    Args:
+        captions (list): Captions from group_words
+        style (dict): VideoProcessor styling fields (font, font_size, font_color,
+            stroke_width, stroke_color, highlight_current_word, word_highlight_color,
+            shadow_strength, padding, position)
+        video_size (tuple): (width, height) of the video the captions are made for
+    """
+    style = dict({
+        'font': "Bangers-Regular.ttf",
+        'font_size': 60,
+        'font_color': "white",
+        'stroke_width': 2,
+        'stroke_color': "black",
+        'highlight_current_word': True,
+        'word_highlight_color': "red",
+        'shadow_strength': 0.8,
+        'padding': 50,
+        'position': "bottom"
+    }, **(style or {}))
+
+    width, height = video_size
+    shadow = 2 if style['shadow_strength'] > 0 else 0
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 2",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+        "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        "Style: Default,{font},{size},{primary},{primary},{outline},{back},0,0,0,0,100,100,0,0,1,"
+        "{stroke},{shadow},{alignment},{padding},{padding},{padding},1".format(
+            font=font_family(style['font']),
+            size=style['font_size'],
+            primary=ass_color(style['font_color']),
+            outline=ass_color(style['stroke_color']),
+            back=ass_color("black", style['shadow_strength']),
+            stroke=style['stroke_width'],
+            shadow=shadow,
+            alignment=ASS_ALIGNMENT.get(style['position'], 2),
+            padding=style['padding']
+        ),
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+
+    highlight = ass_override_color(style['word_highlight_color'])
+    for caption in captions:
+        words = [_ass_escape(word['text']) for word in caption['words']]
+        if not style['highlight_current_word']:
+            events = [(caption['start'], caption['end'], " ".join(words))]
+        else:
+            events = []
+            for index, word in enumerate(caption['words']):
+                end = caption['words'][index + 1]['start'] if index + 1 < len(words) else caption['end']
+                text = " ".join(
+                    f"{{\\c{highlight}}}{text}{{\\r}}" if position == index else text
+                    for position, text in enumerate(words)
+                )
+                events.append((word['start'] if index else caption['start'], end, text))
+
+        for start, end, text in events:
+            lines.append(
+                f"Dialogue: 0,{_timestamp(start, '.', 1, 2)},{_timestamp(end, '.', 1, 2)},Default,,0,0,0,,{text}"
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+def write_captions(word_timings, output_path, caption_format=None, style=None, video_size=(1080, 1920),
+                   max_chars=32):
+    """
+    Write a caption file from word timings
+
+    Args:
+        word_timings (list): Dicts with 'text', 'start' and 'end' in seconds
+        output_path (str): Path of the caption file
+        caption_format (str): "srt", "vtt" or "ass"; defaults to the file extension
+        style (dict): Styling fields used by the ASS format
+        video_size (tuple): (width, height) used by the ASS format
+        max_chars (int): Maximum characters per caption line
+
+    Returns:
+        str: Path of the written file
+    """
+    caption_format = (caption_format or Path(output_path).suffix.lstrip(".")).lower()
+    if caption_format not in SUBTITLE_FORMATS:
+        raise ValueError(f"Unsupported caption format: {caption_format}. Supported formats: {SUBTITLE_FORMATS}")
+
+    captions = group_words(word_timings, max_chars=max_chars)
+    if caption_format == "srt":
+        content = format_srt(captions)
+    elif caption_format == "vtt":
+        content = format_vtt(captions)
+    else:
+        content = format_ass(captions, style, video_size)
+
+    with open(output_path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    return output_path
+
+
+def mux_subtitles(input_video, subtitle_path, output_video):
+    """
+    Add a caption file to a video as a soft subtitle track without re-encoding
+
+    Audio and video are stream-copied; MP4/MOV outputs store the track as mov_text,
+    WebM as WebVTT and MKV keeps the caption file's own format (including ASS styling).
+
+    Returns:
+        bool: Success status
+    """
+    extension = Path(output_video).suffix.lower()
+    if extension in (".mp4", ".mov", ".m4v"):
+        subtitle_codec = "mov_text"
+    elif extension == ".webm":
+        subtitle_codec = "webvtt"
+    else:
+        subtitle_codec = "copy"
+
+    command = [
+        get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+        "-i", input_video,
+        "-i", subtitle_path,
+        "-map", "0:v", "-map", "0:a?", "-map", "1:0",
+        "-c", "copy", "-c:s", subtitle_codec,
+        output_video
+    ]
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        print(f"Error muxing subtitles: {process.stderr.decode('utf-8', errors='replace')}")
+        return False
+    return os.path.exists(output_video)
@@ -0,0 +1,62 @@
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from clipify.core.ai_providers import OpenAIProvider
+from clipify.core.tokens import track_usage
+
+
+class FakeCompletions:
+    """chat.completions of the openai>=1.0 client"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, model, messages, temperature, max_tokens, timeout, stream=False, **options):
+        self.calls.append(dict(options, model=model, timeout=timeout, stream=stream))
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=3)
+        if not stream:
+            message = SimpleNamespace(content='{"segments": []}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+        return iter([
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+            for text in ('{"segm', 'ents": ', None, '[]}')
+        ] + [SimpleNamespace(choices=[], usage=usage)])
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    completions = FakeCompletions()
+    openai = types.ModuleType("openai")
+    openai.OpenAI = lambda api_key, max_retries: SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setitem(sys.modules, "openai", openai)
+    return completions
+
+
+def test_openai_request_uses_the_v1_client(completions):
+    provider = OpenAIProvider("key", model="gpt-4-turbo")
+
+    with track_usage() as usage:
+        response = provider.get_response("prompt", json_mode=True)
+
+    assert response['choices'][0]['message']['content'] == '{"segments": []}'
+    assert usage.report()['prompt_tokens'] == 12
+    call = completions.calls[0]
+    assert call['model'] == "gpt-4-turbo-preview"
+    assert call['timeout'] == provider.resilience.timeout
+    assert call['response_format'] == {"type": "json_object"}
+
+
+def test_openai_stream_reads_delta_content_and_usage(completions):
+    provider = OpenAIProvider("key")
+
+    with track_usage() as usage:
+        chunks = list(provider.stream_response("prompt"))
+
+    assert chunks == ['{"segm', 'ents": ', '[]}']
+    assert completions.calls[0]['model'] == "gpt-4"
+    assert completions.calls[0]['stream_options'] == {"include_usage": True}
+    assert usage.report()['completion_tokens'] == 3
+    assert usage.report()['estimated_requests'] == 0
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from clipify.core.async_processor import AsyncContentProcessor
+from clipify.core.processor import ContentProcessor
+
+
+class FakeProcessor(AsyncContentProcessor):
+    def load_transcript(self, video_path):
+        if video_path == 'missing.mp4':
+            return None
+        return {'video_name': video_path, 'transcript_text': "text", 'word_timings': None}
+
+    def segment_transcript(self, video_name, transcript_text, word_timings=None):
+        return {'video_name': video_name, 'segments': []}
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    # Skip the real components; only the executors are exercised
+    monkeypatch.setattr(ContentProcessor, '__init__', lambda self, *args: None)
+    return FakeProcessor(ai_provider=None, segment_concurrency=2)
+
+
+def test_process_video_stays_synchronous_next_to_the_coroutines(processor):
+    assert not asyncio.iscoroutinefunction(AsyncContentProcessor.process_video)
+    assert asyncio.iscoroutinefunction(AsyncContentProcessor.aprocess_video)
+    assert asyncio.iscoroutinefunction(AsyncContentProcessor.aprocess_videos)
+    processor.close()
+
+
+def test_async_context_manager_processes_videos_and_shuts_down_the_executors(processor):
+    async def main():
+        async with processor:
+            single = await processor.aprocess_video('a.mp4')
+            results = await processor.aprocess_videos(['b.mp4', 'missing.mp4', 'c.mp4'])
+        return single, results
+
+    single, results = asyncio.run(main())
+
+    assert single == {'video_name': 'a.mp4', 'segments': []}
+    assert results == {'b.mp4': {'video_name': 'b.mp4', 'segments': []}, 'missing.mp4': None,
+                       'c.mp4': {'video_name': 'c.mp4', 'segments': []}}
+    with pytest.raises(RuntimeError):
+        processor.transcribe_executor.submit(lambda: None)
+    with pytest.raises(RuntimeError):
+        processor.segment_executor.submit(lambda: None)
+
+
+def test_context_manager_closes_the_executors(processor):
+    with processor:
+        pass
+    with pytest.raises(RuntimeError):
+        processor.segment_executor.submit(lambda: None)
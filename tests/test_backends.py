@@ -0,0 +1,158 @@
+import inspect
+import wave
+
+import numpy as np
+import pytest
+
+from clipify.audio.backends import SAMPLE_RATE, TranscriptionBackend, WhisperBackend, load_wav, pack_windows
+
+
+class LevelBackend(TranscriptionBackend):
+    """Transcribes every loud run of samples as one word named after its level"""
+
+    def __init__(self, tail=0.0):
+        self.tail = tail
+        self.calls = []
+
+    def transcribe(self, audio_path, options=None):
+        audio = np.asarray(audio_path)
+        self.calls.append(len(audio) / SAMPLE_RATE)
+        edges = np.diff(np.concatenate(([0], (np.abs(audio) > 0).astype(np.int8), [0])))
+        words = [self.word_timing(f"level{audio[start]:.1f}", start / SAMPLE_RATE, end / SAMPLE_RATE + self.tail)
+                 for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))]
+        return {'text': " ".join(word['text'] for word in words), 'word_timings': words}
+
+
+def clip(level, duration, start, end):
+    """Clip of silence with a constant level between start and end seconds"""
+    samples = np.zeros(int(duration * SAMPLE_RATE), dtype=np.float32)
+    samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = level
+    return samples
+
+
+def test_pack_windows_fills_windows_in_order():
+    assert pack_windows([10, 10, 8, 5, 40, 2], window=30, gap=1) == [[0, 1, 2], [3], [4], [5]]
+    assert pack_windows([14.5, 14.5], window=30, gap=1) == [[0, 1]]
+    assert pack_windows([]) == []
+
+
+def test_batch_splits_words_back_per_clip():
+    audios = [clip(0.1 * (i + 1), 5.0, 1.0, 3.0) for i in range(7)]
+    backend = LevelBackend()
+
+    results = backend.transcribe_batch(audios, window=30, gap=1)
+
+    # 5 clips plus 4 gaps fill the first window, 2 clips the second
+    assert backend.calls == pytest.approx([29.0, 11.0])
+    for i, result in enumerate(results):
+        assert result['text'] == f"level{0.1 * (i + 1):.1f}"
+        assert result['word_timings'] == [pytest.approx({'text': result['text'], 'start': 1.0, 'end': 3.0},
+                                                        abs=1e-3)]
+
+
+def test_batch_clamps_words_to_their_clip():
+    audios = [clip(0.5, 4.0, 3.0, 4.0), clip(0.7, 4.0, 0.0, 2.0)]
+
+    results = LevelBackend(tail=0.4).transcribe_batch(audios, window=30, gap=1)
+
+    assert results[0]['word_timings'] == [pytest.approx({'text': "level0.5", 'start': 3.0, 'end': 4.0}, abs=1e-3)]
+    assert results[1]['word_timings'] == [pytest.approx({'text': "level0.7", 'start': 0.0, 'end': 2.4}, abs=1e-3)]
+
+
+def test_batch_transcribes_long_clips_alone():
+    backend = LevelBackend()
+    results = backend.transcribe_batch([clip(0.2, 40.0, 1.0, 2.0), clip(0.3, 2.0, 0.5, 1.0)], window=30)
+
+    assert backend.calls == pytest.approx([40.0, 2.0])
+    assert [result['text'] for result in results] == ["level0.2", "level0.3"]
+
+
+def test_load_wav_mixes_down_and_resamples(tmp_path):
+    rate = 8000
+    left = np.full(rate, 0.5)
+    right = np.full(rate, -0.25)
+    path = str(tmp_path / "stereo.wav")
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((np.column_stack([left, right]) * 32768).astype(np.int16).tobytes())
+
+    samples = load_wav(path)
+
+    assert samples.dtype == np.float32
+    assert len(samples) == SAMPLE_RATE
+    assert samples == pytest.approx(np.full(SAMPLE_RATE, 0.125), abs=1e-4)
+
+
+# DecodingOptions fields of the pinned openai-whisper==20231117
+DECODING_OPTIONS = {'task', 'language', 'temperature', 'sample_len', 'best_of', 'beam_size', 'patience',
+                    'length_penalty', 'prompt', 'prefix', 'suppress_tokens', 'suppress_blank',
+                    'without_timestamps', 'max_initial_timestamp', 'fp16'}
+
+
+class PinnedWhisperModel:
+    """Model whose transcribe takes the arguments of openai-whisper==20231117's transcribe"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def transcribe(self, audio, *, verbose=None, temperature=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+                   compression_ratio_threshold=2.4, logprob_threshold=-1.0, no_speech_threshold=0.6,
+                   condition_on_previous_text=True, initial_prompt=None, word_timestamps=False,
+                   prepend_punctuations="\"'“¿([{-", append_punctuations="\"'.。,，!！?？:：”)]}、",
+                   **decode_options):
+        unknown = set(decode_options) - DECODING_OPTIONS
+        if unknown:
+            raise TypeError(f"DecodingOptions got unexpected keyword arguments {sorted(unknown)}")
+        self.inputs.append(audio)
+        # One word spanning the input's loud samples
+        loud = np.flatnonzero(np.abs(audio) > 0.01)
+        start, end = loud[0] / SAMPLE_RATE, (loud[-1] + 1) / SAMPLE_RATE
+        return {'text': " speech", 'segments': [{'words': [{'word': " speech", 'start': start, 'end': end}]}]}
+
+
+def write_wav(path, samples):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype(np.int16).tobytes())
+
+
+def whisper_backend(model):
+    backend = WhisperBackend.__new__(WhisperBackend)
+    backend.model = model
+    return backend
+
+
+def test_whisper_vad_decodes_speech_regions_with_the_pinned_arguments(tmp_path):
+    path = str(tmp_path / "speech.wav")
+    samples = clip(0.5, 12.0, 1.0, 3.0) + clip(0.5, 12.0, 7.0, 9.0)
+    write_wav(path, samples)
+    model = PinnedWhisperModel()
+
+    result = whisper_backend(model).transcribe(path, "accurate")
+
+    assert len(model.inputs) == 2
+    assert result['text'] == "speech speech"
+    assert result['word_timings'] == [
+        pytest.approx({'text': "speech", 'start': 1.0, 'end': 3.0}, abs=0.02),
+        pytest.approx({'text': "speech", 'start': 7.0, 'end': 9.0}, abs=0.02),
+    ]
+
+
+def test_whisper_arguments_match_the_installed_whisper(tmp_path):
+    whisper = pytest.importorskip("whisper")
+    path = str(tmp_path / "speech.wav")
+    write_wav(path, clip(0.5, 12.0, 1.0, 3.0) + clip(0.5, 12.0, 7.0, 9.0))
+    signature = inspect.signature(whisper.transcribe)
+
+    class CheckedModel(PinnedWhisperModel):
+        def transcribe(self, audio, **kwargs):
+            arguments = signature.bind(None, audio, **kwargs).arguments
+            whisper.DecodingOptions(**arguments.get('decode_options', {}))
+            return super().transcribe(audio)
+
+    for profile in ("default", "fast", "accurate"):
+        assert whisper_backend(CheckedModel()).transcribe(path, profile)['word_timings']
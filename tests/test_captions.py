@@ -0,0 +1,53 @@
+import numpy as np
+from PIL import Image
+
+from clipify.video.captions import SpriteCache
+
+
+def block(megabytes):
+    return np.zeros(megabytes * 1024 * 1024 // 4, dtype=np.float32)
+
+
+def test_cache_hits_and_misses():
+    cache = SpriteCache()
+    renders = []
+
+    def factory():
+        renders.append(1)
+        return Image.new('RGBA', (10, 4))
+
+    first = cache.get('word', factory)
+    assert cache.get('word', factory) is first
+    assert (cache.hits, cache.misses, len(renders)) == (1, 1, 1)
+    assert cache.bytes == 10 * 4 * 4
+
+
+def test_cache_is_bounded_by_bytes_in_lru_order():
+    cache = SpriteCache(max_bytes=5 * 1024 * 1024)
+    for key in "abc":
+        cache.get(key, lambda: (block(2), block(0)))
+    assert list(cache.entries) == ['b', 'c']
+
+    cache.get('b', lambda: None)
+    cache.get('d', lambda: block(2))
+
+    assert list(cache.entries) == ['b', 'd']
+    assert cache.bytes == 4 * 1024 * 1024
+
+
+def test_cache_is_bounded_by_entries():
+    cache = SpriteCache(max_entries=2)
+    for key in range(5):
+        cache.get(key, lambda: block(1))
+    assert list(cache.entries) == [3, 4]
+    assert cache.bytes == 2 * 1024 * 1024
+
+
+def test_oversized_sprites_are_not_cached():
+    cache = SpriteCache(max_bytes=1024 * 1024)
+    value = cache.get('huge', lambda: block(2))
+
+    assert value.nbytes == 2 * 1024 * 1024
+    assert cache.bytes == 0 and not cache.entries
+    cache.clear()
+    assert cache.bytes == 0
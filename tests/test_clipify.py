@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+
+from clipify.core.clipify import Clipify
+from clipify.video.encoding import get_encoding_profile
+
+
+class FakeConverter:
+    def __init__(self, succeeds=True):
+        self.succeeds = succeeds
+        self.converted = []
+
+    def build_filtergraph(self, input_video, ratio):
+        return f"reframe={ratio}", (1080, 1920)
+
+    def convert_to_mobile(self, input_video, output_video, target_ratio="9:16", **options):
+        self.converted.append((input_video, output_video, target_ratio))
+        return self.succeeds
+
+    def convert_to_mobile_multi(self, input_video, outputs):
+        self.converted.extend((input_video, path, ratio) for ratio, path in outputs.items())
+        return self.succeeds
+
+
+class FakeCaptioner:
+    renderer = "ffmpeg"
+    caption_mode = "burn"
+
+    def __init__(self, succeeds):
+        self.succeeds = succeeds
+        self.calls = []
+
+    def get_output_path(self, output_video):
+        return output_video
+
+    def process_video(self, input_video, output_video, word_timings, video_filter=None, output_size=None):
+        self.calls.append((input_video, output_video, video_filter))
+        return self.succeeds
+
+
+def fused_clipify(captions_succeed, mobile_ratios=("9:16",), conversion_succeeds=True):
+    clipify = Clipify.__new__(Clipify)
+    clipify.video_converter = FakeConverter(conversion_succeeds)
+    clipify.video_processor = FakeCaptioner(captions_succeed)
+    clipify.crop_mode = "blur"
+    clipify.mobile_ratios = list(mobile_ratios)
+    clipify.caption_options = {}
+    clipify.encoding_profile = get_encoding_profile()
+    return clipify
+
+
+def segment_job(tmp_path):
+    return {
+        'segment_number': 1,
+        'clean_title': "intro",
+        'video_dirs': {'segmented': tmp_path / "segmented", 'processed': tmp_path / "processed"},
+        'segment': {'word_timings': [{'text': "hello", 'start': 10.5, 'end': 11.0}]},
+        'segment_info': {'start_time': 10.0},
+        'cut_video': str(tmp_path / "segment_1_intro.mp4"),
+    }
+
+
+def run_mobile_and_caption(clipify, job):
+    job = clipify._convert_segment(job)
+    assert job['reframe_ratios'] == clipify.mobile_ratios
+    assert 'mobile_video' not in job
+    return clipify._caption_segment(job)
+
+
+def test_fused_caption_pass_outputs_are_the_mobile_videos(tmp_path):
+    clipify = fused_clipify(captions_succeed=True)
+
+    job = run_mobile_and_caption(clipify, segment_job(tmp_path))
+
+    assert clipify.video_processor.calls == [(job['cut_video'], job['captioned_video'], "reframe=9:16")]
+    assert clipify.video_converter.converted == []
+    assert job['segment_info']['mobile_video'] == job['captioned_video']
+
+
+@pytest.mark.parametrize('mobile_ratios', [("9:16",), ("9:16", "4:5")])
+def test_failed_fused_caption_pass_falls_back_to_mobile_conversion(tmp_path, mobile_ratios):
+    clipify = fused_clipify(captions_succeed=False, mobile_ratios=mobile_ratios)
+
+    job = run_mobile_and_caption(clipify, segment_job(tmp_path))
+
+    assert 'captioned_video' not in job['segment_info']
+    assert 'reframe_ratios' not in job
+    assert [ratio for _, _, ratio in clipify.video_converter.converted] == list(mobile_ratios)
+    assert job['segment_info']['mobile_video'] != job['cut_video']
+    assert Path(job['segment_info']['mobile_video']).parent == tmp_path / "segmented"
+
+
+def test_segment_is_dropped_when_the_fallback_conversion_fails(tmp_path):
+    clipify = fused_clipify(captions_succeed=False, conversion_succeeds=False)
+
+    assert run_mobile_and_caption(clipify, segment_job(tmp_path)) is None
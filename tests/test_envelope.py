@@ -0,0 +1,72 @@
+import wave
+
+import numpy as np
+import pytest
+
+from clipify.audio.envelope import AudioEnvelope
+
+
+def envelope_with_gaps(gaps, duration=10.0, window=0.01):
+    """Envelope of a steady tone with silent (start, end) gaps"""
+    rms = np.full(int(duration / window), 0.5, dtype=np.float32)
+    for start, end in gaps:
+        rms[int(start / window):int(end / window)] = 0.0
+    return AudioEnvelope(rms, window=window)
+
+
+def test_from_wav_matches_the_signal_level(tmp_path):
+    rate = 8000
+    tone = 0.5 * np.sin(2 * np.pi * 440 * np.arange(rate) / rate)
+    samples = np.concatenate([tone, np.zeros(rate)])
+    path = str(tmp_path / "tone.wav")
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        stereo = np.repeat((samples * 32767).astype(np.int16), 2)
+        wav.writeframes(stereo.tobytes())
+
+    envelope = AudioEnvelope.from_wav(path, chunk_seconds=0.25)
+
+    assert len(envelope.rms) == 200
+    assert envelope.rms[:100].mean() == pytest.approx(0.5 / np.sqrt(2), rel=0.02)
+    assert envelope.quiet[100:].all()
+    assert not envelope.quiet[:100].any()
+
+
+def test_refine_moves_boundaries_outward_into_quiet_gaps():
+    envelope = envelope_with_gaps([(1.8, 2.0), (6.2, 6.4)])
+
+    start, end = envelope.refine(2.1, 6.1, tolerance=0.3)
+
+    assert start == pytest.approx(1.99)
+    assert end == pytest.approx(6.21)
+
+
+def test_refine_keeps_boundaries_without_a_nearby_gap():
+    envelope = envelope_with_gaps([(1.0, 1.2)])
+
+    assert envelope.refine(3.0, 5.0, tolerance=0.3) == (3.0, 5.0)
+
+
+def test_quiet_threshold_has_an_absolute_floor():
+    # Mostly silence with a little noise: relative to the median, the noise would count as speech
+    rms = np.full(1000, 0.001, dtype=np.float32)
+    rms[400:500] = 0.3
+    envelope = AudioEnvelope(rms)
+
+    assert envelope.threshold == pytest.approx(10 ** (-50 / 20))
+    assert envelope.quiet[:400].all() and envelope.quiet[500:].all()
+    assert not envelope.quiet[400:500].any()
+    assert envelope.speech_regions(min_silence=1.0, padding=0.3) == [
+        pytest.approx((3.7, 5.3))
+    ]
+
+
+def test_speech_regions_skip_long_gaps_only():
+    envelope = envelope_with_gaps([(0.0, 2.0), (4.0, 4.5), (6.0, 8.0)])
+
+    regions = envelope.speech_regions(min_silence=1.0, padding=0.2)
+
+    assert regions == [pytest.approx((1.8, 6.2)), pytest.approx((7.8, 10.0))]
+    assert envelope_with_gaps([(0.0, 10.0)]).speech_regions() == []
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from clipify.core.ai_providers import AIProvider, FailoverProvider
+from clipify.core.resilience import ProviderError, ResiliencePolicy, cancel_scope
+from clipify.core.tokens import track_usage
+
+
+class FakeProvider(AIProvider):
+    requires_api_key = False
+    charges_per_token = False
+
+    def __init__(self, model, delay=0.0, failures=0):
+        self.model = model
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self.cache = {}
+        self.configure_resilience(base_delay=0.01, max_delay=1.0)
+
+    def _request(self, prompt, timeout, json_mode=False):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise ProviderError("temporarily unavailable", retry_after=0.2)
+        return {'choices': [{'message': {'content': self.model}}],
+                'usage': {'prompt_tokens': 10, 'completion_tokens': 5}}
+
+
+def answer(response):
+    return response['choices'][0]['message']['content']
+
+
+def test_hedged_request_wins_and_the_loser_is_not_metered():
+    slow, fast = FakeProvider('slow', delay=0.3), FakeProvider('fast')
+    with FailoverProvider([slow, fast], hedge_delay=0.05, validate=lambda response: True) as provider:
+        with track_usage() as usage:
+            assert answer(provider.get_response("prompt")) == 'fast'
+        time.sleep(0.4)
+
+    assert usage.report()['requests'] == 1
+    assert provider.stats[provider.names[1]]['hedges'] == 1
+    assert provider.stats[provider.names[1]]['wins'] == 1
+
+
+def test_losing_request_stops_retrying():
+    # Fails once, then would retry 0.2s later unless cancelled
+    failing = FakeProvider('failing', delay=0.1, failures=1)
+    fast = FakeProvider('fast', delay=0.15)
+    with FailoverProvider([failing, fast], hedge_delay=0.01, validate=lambda response: True) as provider:
+        assert answer(provider.get_response("prompt")) == 'fast'
+        time.sleep(0.5)
+
+    assert failing.calls == 1
+    # A cancelled request says nothing about the provider's health
+    assert provider.stats[provider.names[0]]['errors'] == 0
+
+
+def test_close_shuts_down_the_executor():
+    provider = FailoverProvider([FakeProvider('a')], validate=lambda response: True)
+    assert answer(provider.get_response("prompt")) == 'a'
+    provider.close()
+
+    with pytest.raises(RuntimeError):
+        provider.executor.submit(lambda: None)
+
+
+def test_cancel_scope_stops_retries():
+    cancelled = threading.Event()
+    attempts = []
+
+    def request(timeout):
+        attempts.append(timeout)
+        cancelled.set()
+        raise ProviderError("unavailable")
+
+    with cancel_scope(cancelled), pytest.raises(ProviderError, match="cancelled"):
+        ResiliencePolicy(base_delay=0.01).call(request, retry_count=3)
+    assert len(attempts) == 1
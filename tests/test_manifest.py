@@ -0,0 +1,47 @@
+import json
+
+from clipify.core.manifest import JobManifest
+
+
+def test_hash_is_stable_and_input_sensitive():
+    assert JobManifest.compute_hash(1, 'cut', {'b': 2, 'a': 1}) == JobManifest.compute_hash(1, 'cut', {'a': 1, 'b': 2})
+    assert JobManifest.compute_hash(1, 'cut', 2.0) != JobManifest.compute_hash(1, 'cut', 2.5)
+
+
+def test_recorded_outputs_are_fresh_across_instances(tmp_path):
+    output = tmp_path / "segment_1.mp4"
+    output.write_bytes(b"video")
+    manifest_path = tmp_path / "manifest.json"
+
+    JobManifest(manifest_path).record(1, 'cut', "hash", str(output))
+    manifest = JobManifest(manifest_path)
+
+    assert manifest.is_fresh(1, 'cut', "hash", str(output))
+    assert not manifest.is_fresh(1, 'cut', "other hash", str(output))
+    assert not manifest.is_fresh(1, 'mobile', "hash", str(output))
+    assert not manifest.is_fresh(2, 'cut', "hash", str(output))
+
+
+def test_missing_output_is_not_fresh(tmp_path):
+    manifest = JobManifest(tmp_path / "manifest.json")
+    outputs = [str(tmp_path / "a.mp4"), str(tmp_path / "b.mp4")]
+    (tmp_path / "a.mp4").write_bytes(b"video")
+
+    manifest.record(1, 'mobile', "hash", outputs)
+
+    assert not manifest.is_fresh(1, 'mobile', "hash", outputs)
+    (tmp_path / "b.mp4").write_bytes(b"video")
+    assert manifest.is_fresh(1, 'mobile', "hash", outputs)
+
+
+def test_corrupt_manifest_starts_fresh(tmp_path, capsys):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{not json")
+
+    manifest = JobManifest(manifest_path)
+
+    assert manifest.data == {'segments': {}}
+    assert "starting fresh" in capsys.readouterr().out
+    manifest.record(3, 'cut', "hash", "out.mp4")
+    assert json.loads(manifest_path.read_text())['segments']['3']['cut'] == {'hash': "hash", 'output': "out.mp4"}
+    assert not (tmp_path / "manifest.json.tmp").exists()
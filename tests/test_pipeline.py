@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from clipify.core.pipeline import Pipeline, Stage
+
+
+def add(key, value):
+    def stage(job):
+        job[key] = value(job)
+        return job
+    return stage
+
+
+def test_stages_are_ordered_by_required_keys():
+    pipeline = Pipeline([
+        Stage('caption', add('captioned', lambda job: job['mobile'] + "+captions"), requires=('mobile',),
+              provides=('captioned',)),
+        Stage('cut', add('cut', lambda job: f"cut{job['index']}"), requires=('index',), provides=('cut',)),
+        Stage('mobile', add('mobile', lambda job: job['cut'] + "+mobile"), requires=('cut',), provides=('mobile',)),
+    ])
+
+    assert [stage.name for stage in pipeline.stages] == ['cut', 'mobile', 'caption']
+    results = list(pipeline.run({'index': i} for i in range(5)))
+    assert sorted(job['captioned'] for job in results) == [f"cut{i}+mobile+captions" for i in range(5)]
+
+
+def test_invalid_stage_graphs_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        Pipeline([
+            Stage('a', lambda job: job, requires=('b',), provides=('a',)),
+            Stage('b', lambda job: job, requires=('a',), provides=('b',)),
+        ])
+    with pytest.raises(ValueError, match="provided by both"):
+        Pipeline([Stage('a', lambda job: job, provides=('x',)), Stage('b', lambda job: job, provides=('x',))])
+    with pytest.raises(ValueError, match="Duplicate"):
+        Pipeline([Stage('a', lambda job: job), Stage('a', lambda job: job)])
+    with pytest.raises(ValueError):
+        Stage('a', lambda job: job, workers=0)
+
+
+def test_failed_and_dropped_jobs_do_not_stop_the_pipeline(capsys):
+    def check(job):
+        if job['index'] == 1:
+            raise RuntimeError("broken segment")
+        return None if job['index'] == 2 else job
+
+    results = list(Pipeline([Stage('check', check)]).run({'index': i} for i in range(4)))
+
+    assert sorted(job['index'] for job in results) == [0, 3]
+    assert "broken segment" in capsys.readouterr().out
+
+
+def test_workers_run_jobs_concurrently():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(job):
+        with lock:
+            active.append(job)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(job)
+        return job
+
+    results = list(Pipeline([Stage('slow', slow, workers=4)]).run({'index': i} for i in range(8)))
+
+    assert len(results) == 8
+    assert max(peak) > 1
+
+
+def test_lazy_source_errors_are_raised_after_the_jobs_already_fed():
+    def jobs():
+        yield {'index': 0}
+        raise RuntimeError("source failed")
+
+    run = Pipeline([Stage('pass', lambda job: job)]).run(jobs())
+    assert next(run) == {'index': 0}
+    with pytest.raises(RuntimeError, match="source failed"):
+        next(run)
+
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from clipify.audio.options import get_transcription_options
+from clipify.core.processor import ContentProcessor
+
+
+class FakeSpeechToText:
+    def __init__(self, options=None):
+        self.options = get_transcription_options(options)
+        self.calls = 0
+
+    def settings(self):
+        options = self.options.to_dict()
+        options.pop('name')
+        return {'backend': 'whisper', 'model_size': 'base', 'options': options}
+
+    def convert_to_text(self, audio_path, options=None):
+        self.calls += 1
+        return {'text': f"transcript {self.calls}", 'word_timings': [{'text': "transcript", 'start': 0, 'end': 1}]}
+
+
+class FakeExtractor:
+    def extract_audio(self, video_path):
+        return video_path + ".wav"
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setattr(ContentProcessor, '__init__', lambda self: None)
+    processor = ContentProcessor()
+    processor.transcripts_dir = str(tmp_path / "transcripts")
+    processor.processed_dir = str(tmp_path / "processed_content")
+    processor.audio_extractor = FakeExtractor()
+    processor.speech_to_text = FakeSpeechToText("fast")
+    video_path = tmp_path / "talk.mp4"
+    video_path.write_bytes(b"")
+    return processor, str(video_path)
+
+
+def test_transcripts_are_reused_with_the_same_settings(processor):
+    processor, video_path = processor
+
+    first = processor.load_transcript(video_path)
+    second = processor.load_transcript(video_path)
+
+    assert first['transcript_text'] == second['transcript_text'] == "transcript 1"
+    assert processor.speech_to_text.calls == 1
+    assert second['word_timings']['transcription']['options']['beam_size'] == 1
+
+
+def test_transcripts_made_with_other_options_are_redone(processor):
+    processor, video_path = processor
+    processor.load_transcript(video_path)
+    with open(processor.get_processed_path("talk"), 'w', encoding='utf-8') as f:
+        json.dump({'segments': []}, f)
+
+    processor.speech_to_text.options = get_transcription_options("accurate")
+    job = processor.load_transcript(video_path)
+
+    assert 'processed' not in job
+    assert job['transcript_text'] == "transcript 2"
+    assert processor.speech_to_text.calls == 2
+    # The profile name alone does not invalidate the cache
+    processor.speech_to_text.options = get_transcription_options("accurate").replace(name="custom")
+    assert processor.load_transcript(video_path)['transcript_text'] == "transcript 2"
+
+
+def test_transcripts_without_saved_settings_are_reused(processor):
+    processor, video_path = processor
+    processor.ensure_directories()
+    with open(processor.get_transcript_path("talk"), 'w', encoding='utf-8') as f:
+        f.write("old transcript")
+    with open(processor.get_timing_path("talk"), 'w', encoding='utf-8') as f:
+        json.dump({'transcript': "old transcript", 'word_timings': []}, f)
+
+    assert processor.load_transcript(video_path)['transcript_text'] == "old transcript"
+    assert processor.speech_to_text.calls == 0
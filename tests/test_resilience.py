@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+from clipify.core.resilience import (
+    CircuitBreaker, CircuitOpenError, ProviderError, ResiliencePolicy, TokenBucket, as_provider_error,
+    parse_retry_after
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_as_provider_error_reads_status_and_retry_after():
+    error = as_provider_error(FakeHTTPError(429, {"Retry-After": "2"}))
+    assert (error.status_code, error.retry_after, error.retryable) == (429, 2.0, True)
+
+    assert not as_provider_error(FakeHTTPError(400)).retryable
+    assert as_provider_error(FakeHTTPError(503)).retryable
+    assert as_provider_error(TimeoutError()).retryable
+
+
+def test_token_bucket_limits_bursts():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0.01)
+    assert bucket.acquire(timeout=0.2)
+
+
+def test_circuit_breaker_opens_and_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_policy_retries_retryable_errors(capsys):
+    policy = ResiliencePolicy(timeout=5, base_delay=0.001, max_delay=0.01)
+    attempts = []
+
+    def request(timeout):
+        attempts.append(timeout)
+        if len(attempts) < 3:
+            raise ProviderError("busy", status_code=503)
+        return "ok"
+
+    assert policy.call(request, retry_count=3) == "ok"
+    assert attempts == [5, 5, 5]
+    assert "retrying" in capsys.readouterr().out
+
+
+def test_policy_does_not_retry_rejected_requests():
+    policy = ResiliencePolicy(base_delay=0.001)
+    attempts = []
+
+    def request(timeout):
+        attempts.append(timeout)
+        raise FakeHTTPError(401)
+
+    with pytest.raises(ProviderError) as raised:
+        policy.call(request, retry_count=3)
+    assert raised.value.status_code == 401
+    assert len(attempts) == 1
+    assert policy.breaker.state == "closed"
+
+
+def test_policy_refuses_long_retry_after():
+    policy = ResiliencePolicy(base_delay=0.001, max_delay=1)
+
+    def request(timeout):
+        raise ProviderError("slow down", status_code=429, retry_after=60)
+
+    with pytest.raises(ProviderError, match="retry after 60s") as raised:
+        policy.call(request, retry_count=3)
+    assert not raised.value.retryable
+
+
+def test_policies_with_the_same_key_share_the_breaker():
+    first = ResiliencePolicy(failure_threshold=1, key="test-provider:shared-key")
+    second = ResiliencePolicy(failure_threshold=1, key="test-provider:shared-key")
+    assert first.breaker is second.breaker
+    assert ResiliencePolicy(key="test-provider:other-key").breaker is not first.breaker
+
+    def failing(timeout):
+        raise ProviderError("down", status_code=500)
+
+    with pytest.raises(ProviderError):
+        first.call(failing, retry_count=1)
+    with pytest.raises(CircuitOpenError):
+        second.call(lambda timeout: "ok")
+
+
+def test_shared_limiters_and_breakers_follow_their_settings():
+    key = "test-provider:settings-key"
+    unlimited = ResiliencePolicy(key=key)
+    limited = ResiliencePolicy(rate_limit=2.0, key=key)
+    assert unlimited.limiter is None
+    assert limited.limiter.rate == 2.0
+    assert ResiliencePolicy(rate_limit=2.0, key=key).limiter is limited.limiter
+    assert ResiliencePolicy(rate_limit=5.0, burst=10, key=key).limiter.capacity == 10
+
+    strict = ResiliencePolicy(failure_threshold=1, recovery_timeout=5.0, key=key)
+    assert strict.breaker is not unlimited.breaker
+    assert (strict.breaker.failure_threshold, strict.breaker.recovery_timeout) == (1, 5.0)
+    assert ResiliencePolicy(rate_limit=2.0, key=key).breaker is unlimited.breaker
@@ -0,0 +1,38 @@
+from clipify.core.schema import SEGMENT_SCHEMA, SEGMENTS_SCHEMA, validate
+
+
+def test_valid_segments_have_no_errors():
+    answer = {'segments': [
+        {'title': 'Intro', 'content': 'Hello', 'keywords': ['greeting']},
+        {'title': 'Outro', 'content': 'Bye', 'extra': 1},
+    ]}
+    assert validate(answer, SEGMENTS_SCHEMA) == []
+
+
+def test_missing_keys_and_wrong_types_are_reported_with_their_path():
+    assert validate({}, SEGMENTS_SCHEMA) == ["$: missing 'segments'"]
+    assert validate([], SEGMENTS_SCHEMA) == ["$: expected object, got list"]
+    assert validate({'segments': {}}, SEGMENTS_SCHEMA) == ["$.segments: expected array, got dict"]
+
+    errors = validate({'segments': [{'title': 'A', 'content': 'x'}, {'content': 3, 'keywords': ['a', 4]}]},
+                      SEGMENTS_SCHEMA)
+    assert errors == [
+        "$.segments[1]: missing 'title'",
+        "$.segments[1].content: expected string, got int",
+        "$.segments[1].keywords[1]: expected string, got int",
+    ]
+
+
+def test_blank_strings_are_empty():
+    assert validate({'title': '  ', 'content': ''}, SEGMENT_SCHEMA) == [
+        "$.title: must not be empty",
+        "$.content: must not be empty",
+    ]
+
+
+def test_booleans_are_not_numbers():
+    assert validate(True, {'type': 'number'}) == ["$: expected number, got bool"]
+    assert validate(False, {'type': 'integer'}) == ["$: expected integer, got bool"]
+    assert validate(True, {'type': 'boolean'}) == []
+    assert validate(1.5, {'type': 'number'}) == []
+    assert validate(1.5, {'type': 'integer'}) == ["$: expected integer, got float"]
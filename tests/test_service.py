@@ -0,0 +1,149 @@
+import os
+import queue
+import stat
+import threading
+import time
+import wave
+
+import pytest
+
+from clipify.audio import service
+from clipify.audio.backends import SAMPLE_RATE, TranscriptionBackend
+from clipify.audio.options import get_transcription_options
+from clipify.audio.service import (AUTHKEY_ENV, TranscriptionClient, TranscriptionServer, default_address,
+                                   load_authkey, runtime_dir)
+
+
+@pytest.fixture(autouse=True)
+def private_runtime_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.delenv(AUTHKEY_ENV, raising=False)
+    return tmp_path / "clipify"
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_runtime_dir_is_private(private_runtime_dir):
+    assert runtime_dir() == str(private_runtime_dir)
+    assert mode(private_runtime_dir) == 0o700
+    assert default_address() == str(private_runtime_dir / "transcription.sock")
+
+    os.chmod(private_runtime_dir, 0o755)
+    with pytest.raises(RuntimeError, match="0700"):
+        runtime_dir()
+
+
+def test_key_file_is_generated_once_with_mode_0600(private_runtime_dir, monkeypatch):
+    assert load_authkey() is None
+
+    key = load_authkey(create=True)
+    assert len(key) == 64
+    assert mode(private_runtime_dir / "transcription.key") == 0o600
+    assert load_authkey(create=True) == key
+
+    monkeypatch.setenv(AUTHKEY_ENV, "from-env")
+    assert load_authkey() == b"from-env"
+
+
+def test_readable_key_files_are_refused(tmp_path):
+    key_file = tmp_path / "key"
+    key_file.write_text("secret")
+    os.chmod(key_file, 0o644)
+    with pytest.raises(RuntimeError, match="0600"):
+        load_authkey(str(key_file))
+
+    os.chmod(key_file, 0o600)
+    assert load_authkey(str(key_file)) == b"secret"
+
+
+def test_tcp_and_clients_need_a_key():
+    with pytest.raises(ValueError, match="TCP"):
+        TranscriptionServer(("127.0.0.1", 0))
+    with pytest.raises(ValueError, match="key"):
+        TranscriptionClient()
+
+    server = TranscriptionServer(("127.0.0.1", 0), authkey=b"secret")
+    assert server.authkey == b"secret"
+
+
+def test_only_clients_with_the_key_are_served(monkeypatch):
+    monkeypatch.setattr(service, 'get_transcription_backend', lambda *args, **kwargs: object())
+    server = TranscriptionServer(model_size="tiny")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if os.path.exists(server.address):
+            break
+        time.sleep(0.01)
+
+    try:
+        assert TranscriptionClient().info()['model_size'] == "tiny"
+        assert TranscriptionClient(authkey=b"wrong").info() is None
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+class CountingBackend(TranscriptionBackend):
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio_path, options=None):
+        name = audio_path if isinstance(audio_path, str) else f"{len(audio_path) / SAMPLE_RATE:.0f}s"
+        self.calls.append(name)
+        return {'text': name, 'word_timings': []}
+
+
+def write_silence(path, seconds):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(b"\0\0" * int(seconds * SAMPLE_RATE))
+    return str(path)
+
+
+def test_queued_short_jobs_share_one_batch(tmp_path):
+    server = TranscriptionServer(authkey=b"secret")
+    backend = CountingBackend()
+    english = get_transcription_options({'language': "en"}).to_dict()
+    jobs = [
+        ({'op': 'transcribe', 'audio_path': write_silence(tmp_path / f"short{i}.wav", 4), 'options': english})
+        for i in range(3)
+    ] + [
+        ({'op': 'transcribe', 'audio_path': write_silence(tmp_path / "long.wav", 20), 'options': english}),
+        ({'op': 'transcribe', 'audio_path': write_silence(tmp_path / "any.wav", 4),
+          'options': get_transcription_options().to_dict()}),
+    ]
+    replies = [queue.Queue(maxsize=1) for _ in jobs]
+    for request, reply in zip(jobs, replies):
+        server.jobs.put((request, reply))
+
+    worker = threading.Thread(target=server._work, args=(backend,), daemon=True)
+    worker.start()
+    results = [reply.get(timeout=5) for reply in replies]
+    server.stopped.set()
+    worker.join(timeout=5)
+
+    # Three 4s clips and two 1s gaps make one 14s window; the rest run alone
+    assert backend.calls == ["14s", jobs[3]['audio_path'], jobs[4]['audio_path']]
+    assert all('result' in result for result in results)
+    assert [len(result['result']['word_timings']) for result in results] == [0] * 5
+
+
+def test_batch_errors_reach_every_caller(tmp_path):
+    server = TranscriptionServer(authkey=b"secret")
+    english = get_transcription_options({'language': "en"}).to_dict()
+    batch = [({'op': 'transcribe', 'audio_path': write_silence(tmp_path / f"short{i}.wav", 2), 'options': english},
+              queue.Queue(maxsize=1)) for i in range(2)]
+
+    class BrokenBackend(CountingBackend):
+        def transcribe_batch(self, audios, options=None, window=30.0, gap=1.0):
+            raise RuntimeError("out of memory")
+
+    server._run_batch(BrokenBackend(), batch)
+
+    assert [reply.get_nowait() for _, reply in batch] == [{'error': "RuntimeError: out of memory"}] * 2
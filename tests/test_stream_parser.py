@@ -0,0 +1,49 @@
+import json
+
+from clipify.core.stream_parser import SegmentStreamParser
+
+
+SEGMENTS = [
+    {'title': 'Intro', 'content': 'Hello {world}', 'keywords': ['a', 'b']},
+    {'title': 'Quote "inside"', 'content': 'Back\\slash } and ]'},
+    {'title': 'End', 'content': 'Bye', 'nested': {'list': [1, {'x': 2}]}},
+]
+RESPONSE = '```json\n' + json.dumps({'segments': SEGMENTS, 'summary': {'ignored': True}}) + '\n```'
+
+
+def feed_in_chunks(text, size):
+    parser = SegmentStreamParser()
+    segments = []
+    for start in range(0, len(text), size):
+        segments.extend(parser.feed(text[start:start + size]))
+    return parser, segments
+
+
+def test_segments_are_parsed_whatever_the_chunk_size():
+    for size in (1, 2, 7, 64, len(RESPONSE)):
+        parser, segments = feed_in_chunks(RESPONSE, size)
+        assert segments == SEGMENTS
+        assert parser.done
+
+
+def test_segments_are_emitted_when_their_closing_brace_arrives():
+    parser = SegmentStreamParser()
+    assert parser.feed('{"segments": [{"title": "A", "content": "x"') == []
+    assert parser.feed('}, {"title": "B",') == [{'title': 'A', 'content': 'x'}]
+    assert not parser.done
+    assert parser.feed(' "content": "y"}]}') == [{'title': 'B', 'content': 'y'}]
+    assert parser.done
+    assert parser.feed('{"title": "C"}') == []
+
+
+def test_text_before_the_array_is_ignored_and_other_keys_can_be_used():
+    parser = SegmentStreamParser(key='items')
+    assert parser.feed('{"segments": [{"title": "skip"}], "items"') == []
+    assert parser.feed(': [{"n": 1}]}') == [{'n': 1}]
+
+
+def test_unparsable_segments_are_skipped(capsys):
+    parser = SegmentStreamParser()
+    segments = parser.feed('{"segments": [{"title": oops}, {"title": "ok"}]}')
+    assert segments == [{'title': 'ok'}]
+    assert "Skipping unparsable" in capsys.readouterr().out
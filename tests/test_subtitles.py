@@ -0,0 +1,44 @@
+from clipify.video.subtitles import _ass_escape, format_ass, format_srt, format_vtt, group_words
+
+WORDS = [
+    {'text': " Hello", 'start': 0.0, 'end': 0.4},
+    {'text': "world", 'start': 0.5, 'end': 0.9},
+    {'text': "", 'start': 0.9, 'end': 0.9},
+    {'text': "again", 'start': 3661.25, 'end': 3662.0},
+]
+
+
+def test_group_words_splits_lines_at_max_chars():
+    captions = group_words(WORDS, max_chars=11)
+
+    assert [[word['text'] for word in caption['words']] for caption in captions] == [["Hello", "world"], ["again"]]
+    assert (captions[0]['start'], captions[0]['end']) == (0.0, 0.9)
+
+
+def test_srt_and_vtt_timestamps():
+    captions = group_words(WORDS, max_chars=11)
+
+    assert format_srt(captions) == (
+        "1\n00:00:00,000 --> 00:00:00,900\nHello world\n\n"
+        "2\n01:01:01,250 --> 01:01:02,000\nagain\n"
+    )
+    assert format_vtt(captions).startswith("WEBVTT\n\n00:00:00.000 --> 00:00:00.900\nHello world\n")
+
+
+def test_ass_highlights_one_word_per_event():
+    ass = format_ass(group_words(WORDS[:2]), style={'word_highlight_color': "#FF0000"})
+    events = [line for line in ass.splitlines() if line.startswith("Dialogue:")]
+
+    assert events == [
+        "Dialogue: 0,0:00:00.00,0:00:00.50,Default,,0,0,0,,{\\c&H0000FF&}Hello{\\r} world",
+        "Dialogue: 0,0:00:00.50,0:00:00.90,Default,,0,0,0,,Hello {\\c&H0000FF&}world{\\r}",
+    ]
+
+
+def test_ass_escape_keeps_backslashes_and_braces_literal():
+    escaped = _ass_escape("a\\Nb {\\b1}")
+
+    assert escaped == "a\\\u2060Nb \\{\\\u2060b1\\}"
+    # No backslash is directly followed by a tag letter, and no brace opens an override block
+    assert "\\N" not in escaped and "\\b" not in escaped
+    assert escaped.replace("\\{", "").replace("\\}", "").count("{") == 0
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from clipify.core import tokens
+from clipify.core.tokens import (TokenBudget, UsageMeter, current_meter, estimate_tokens, record_usage,
+                                 track_usage, use_meter)
+
+
+class Provider:
+    model = "gpt-4"
+    max_tokens = 2048
+    charges_per_token = True
+
+    def __init__(self):
+        self.usage = UsageMeter()
+
+
+def test_estimate_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(tokens, '_encoding', None)
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * 40) == 10
+    # Many short words: 1.3 tokens per word wins over 4 characters per token
+    assert estimate_tokens("a b c d e f g h i j") == 13
+
+
+def test_budget_fits_max_tokens_and_context_window(monkeypatch):
+    monkeypatch.setattr(tokens, '_encoding', None)
+    text = "word " * 200
+    assert TokenBudget(max_tokens=4096).fits(text)
+    assert not TokenBudget(max_tokens=200).fits(text)
+    assert not TokenBudget(max_tokens=4096, context_window=4096).fits(text)
+
+
+def test_windows_split_at_sentence_ends(monkeypatch):
+    monkeypatch.setattr(tokens, '_encoding', None)
+    sentences = [f"Sentence {i} has a few more words in it." for i in range(40)]
+    budget = TokenBudget(max_tokens=300, prompt_tokens=0, segment_tokens=0)
+
+    windows = budget.windows(" ".join(sentences))
+
+    assert len(windows) > 1
+    assert " ".join(windows) == " ".join(sentences)
+    assert all(window.endswith(".") and budget.fits(window) for window in windows)
+    assert budget.windows("Short text.") == ["Short text."]
+
+
+def test_budget_for_provider_uses_its_context_window():
+    budget = TokenBudget.for_provider(Provider())
+    assert (budget.max_tokens, budget.context_window) == (2048, 8192)
+
+    provider = Provider()
+    provider.model, provider.max_tokens = "local-model", None
+    budget = TokenBudget.for_provider(provider)
+    assert (budget.max_tokens, budget.context_window) == (4096, None)
+
+
+def test_meter_costs_free_and_unpriced_requests():
+    meter = UsageMeter(prices={"custom": (1.0, 2.0)})
+    meter.record("gpt-4", 1000, 500)
+    meter.record("custom", 1_000_000, 1_000_000, estimated=True)
+    meter.record("local", 100, 100, free=True)
+    meter.record("unknown", 100, 100)
+
+    report = meter.report()
+    assert report['requests'] == 4
+    assert report['prompt_tokens'] == 1_001_200
+    assert report['estimated_requests'] == 1
+    assert report['unpriced_requests'] == 1
+    assert report['cost'] == pytest.approx(0.03 + 0.03 + 3.0)
+    assert report['models']['local']['cost'] == 0.0
+
+
+def test_usage_is_recorded_in_the_provider_and_active_meter():
+    provider = Provider()
+    with track_usage() as usage:
+        record_usage(provider, {'prompt_tokens': 10, 'completion_tokens': 5}, "prompt", "answer")
+        record_usage(provider, None, "some prompt text", "answer")
+    record_usage(provider, {'prompt_tokens': 1, 'completion_tokens': 1}, "prompt", "answer")
+
+    assert current_meter() is None
+    assert usage.report()['requests'] == 2
+    assert usage.report()['estimated_requests'] == 1
+    assert provider.usage.report()['requests'] == 3
+
+
+def test_use_meter_carries_a_meter_to_worker_threads():
+    provider = Provider()
+    with track_usage() as usage:
+        meter = current_meter()
+
+        def work():
+            assert current_meter() is None
+            with use_meter(meter):
+                record_usage(provider, {'prompt_tokens': 1, 'completion_tokens': 1}, "prompt", "answer")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert usage.report()['requests'] == 4